@@ -0,0 +1,166 @@
+"""
+Generate synthetic Smart Search CSV exports for benchmarking.
+
+Senders follow a Zipf distribution: a few applications send most of the mail and there is a long
+tail of people. Besides plain application and human senders, the pool contains the senders the
+normalization options exist for: SRS rewritten forwarders, PRVS tagged addresses, VERP style bounce
+addresses and high entropy per-message local parts. Applications use templated subjects, people
+write free-form ones with replies and forwards.
+
+    python benchmarks/generate_smart_search.py -o smart_search.csv --rows 1000000
+"""
+import argparse
+import csv
+import random
+import string
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, List, Tuple
+
+HEADERS = ["Date", "Sender", "Header_From", "Header_Return-Path", "Recipients", "Message_ID", "Message_Size",
+           "Subject", "Sender_IP_Address"]
+
+# Share of the sender pool per kind, the Zipf ranks are shuffled over the kinds
+SENDER_KINDS = [("app", 0.25), ("human", 0.55), ("srs", 0.05), ("prvs", 0.05), ("bounce", 0.05), ("entropy", 0.05)]
+
+APP_LOCAL_PARTS = ["noreply", "no-reply", "notifications", "billing", "alerts", "info", "support", "marketing",
+                   "orders", "accounts"]
+FIRST_NAMES = ["james", "mary", "robert", "patricia", "john", "jennifer", "michael", "linda", "david", "elizabeth",
+               "william", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah", "chris", "karen"]
+LAST_NAMES = ["smith", "johnson", "williams", "brown", "jones", "garcia", "miller", "davis", "rodriguez", "martinez",
+              "hernandez", "lopez", "gonzalez", "wilson", "anderson", "thomas", "taylor", "moore", "jackson", "martin"]
+TEMPLATES = [
+    "Your invoice #{n} is ready",
+    "Order {n} has shipped",
+    "Password reset request for {user}",
+    "[JIRA] (PROJ-{n}) Build failed on branch release/{v}",
+    "Your statement for {month} is available",
+    "Alert: CPU usage {pct}% on host{h}.example.com",
+    "Reminder: appointment on {date} at {time}",
+    "Welcome to Brand{h}, {user}!",
+    "Your verification code is {n}",
+    "Weekly report {date}",
+]
+TOPICS = ["lunch tomorrow", "Q3 numbers", "the proposal", "budget review", "offsite agenda", "contract draft",
+          "hiring plan", "customer escalation", "release notes", "travel plans", "board deck", "status update"]
+HUMAN_FORMS = ["{topic}", "RE: {topic}", "RE: RE: {topic}", "FW: {topic}", "Quick question about {topic}",
+               "Re: {topic}", "Fwd: {topic}", ""]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+
+
+def _hex(rnd: random.Random, digits: int) -> str:
+    return f"{rnd.getrandbits(4 * digits):0{digits}x}"
+
+
+class Sender:
+    """One entry of the sender pool, renders the envelope sender and message details per message."""
+
+    def __init__(self, rnd: random.Random, kind: str, index: int, domains: int):
+        self.kind = kind
+        self.domain = f"brand{rnd.randrange(domains)}.com"
+        if kind == "human":
+            first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+            self.domain = f"corp{rnd.randrange(max(1, domains // 10))}.com"
+            self.local = f"{first}.{last}{index}"
+            self.display = f"{first.title()} {last.title()}"
+        else:
+            self.local = f"{rnd.choice(APP_LOCAL_PARTS)}{index}"
+            self.display = f"Brand {self.domain.split('.')[0][5:]} {self.local.rstrip(string.digits).title()}"
+        self.address = f"{self.local}@{self.domain}"
+        self.templates = rnd.sample(TEMPLATES, 2)
+        self.ip = f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(1, 255)}"
+
+    def envelope(self, rnd: random.Random, rcpt: str) -> str:
+        if self.kind == "srs":
+            return f"SRS0={_hex(rnd, 4)}={rnd.choice(string.ascii_uppercase)}{rnd.randrange(10)}={self.domain}={self.local}@forwarder.example.net"
+        if self.kind == "prvs":
+            return f"prvs={rnd.randrange(10)}{_hex(rnd, 9)}={self.address}"
+        if self.kind == "bounce":
+            rcpt_local, rcpt_domain = rcpt.split("@")
+            return f"bounce-{rnd.randrange(10 ** 6)}-{rcpt_local}={rcpt_domain}@bounces.{self.domain}"
+        if self.kind == "entropy":
+            return f"{_hex(rnd, 16)}@em.{self.domain}"
+        return self.address
+
+    def subject(self, rnd: random.Random) -> str:
+        if self.kind == "human":
+            return rnd.choice(HUMAN_FORMS).format(topic=rnd.choice(TOPICS))
+        return rnd.choice(self.templates).format(
+            n=rnd.randrange(10 ** 6), user=rnd.choice(FIRST_NAMES), v=f"{rnd.randrange(10)}.{rnd.randrange(20)}",
+            month=rnd.choice(MONTHS), pct=rnd.randrange(80, 100), h=rnd.randrange(50),
+            date=f"2024-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}",
+            time=f"{rnd.randrange(8, 18)}:{rnd.choice(['00', '15', '30', '45'])}")
+
+    def message_id(self, rnd: random.Random, timestamp: int) -> str:
+        if self.kind == "human":
+            return f"<CA+{_hex(rnd, 24)}@mail.gmail.com>"
+        if rnd.random() < 0.5:
+            return f"<{_hex(rnd, 16)}.{timestamp}@mail{rnd.randrange(4)}.{self.domain}>"
+        return f"<{_hex(rnd, 8)}-{_hex(rnd, 4)}-{_hex(rnd, 4)}-{_hex(rnd, 4)}-{_hex(rnd, 12)}@{self.domain}>"
+
+
+def zipf_picker(rnd: random.Random, size: int, exponent: float) -> Callable[[], int]:
+    cumulative = list(accumulate(1.0 / (rank ** exponent) for rank in range(1, size + 1)))
+    total = cumulative[-1]
+    return lambda: min(bisect(cumulative, rnd.random() * total), size - 1)
+
+
+def generate(path: str, rows: int, senders: int = 20000, exponent: float = 1.1, days: int = 7, seed: int = 1,
+             domains: int = 500) -> Tuple[int, int]:
+    """
+    Write a Smart Search CSV with rows messages.
+
+    :return: Rows written and the size of the file in bytes.
+    """
+    rnd = random.Random(seed)
+    kinds: List[str] = []
+    for kind, share in SENDER_KINDS:
+        kinds += [kind] * max(1, round(senders * share))
+    rnd.shuffle(kinds)
+    pool = [Sender(rnd, kind, i, domains) for i, kind in enumerate(kinds[:senders])]
+    pick = zipf_picker(rnd, len(pool), exponent)
+
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    span = days * 86400
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        for i in range(rows):
+            sender = pool[pick()]
+            date = start + timedelta(seconds=span * i / rows)
+            recipients = [f"user{rnd.randrange(5000)}@rcpt{rnd.randrange(50)}.com"
+                          for _ in range(10 if rnd.random() < 0.02 else rnd.randint(1, 3))]
+            envelope = sender.envelope(rnd, recipients[0])
+            writer.writerow([
+                date.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                envelope,
+                f'"{sender.display}" <{sender.address}>',
+                envelope,
+                ",".join(recipients),
+                sender.message_id(rnd, int(date.timestamp())),
+                int(rnd.lognormvariate(10.3, 1.0)),
+                sender.subject(rnd),
+                "127.0.0.1" if rnd.random() < 0.01 else sender.ip,
+            ])
+        size = f.tell()
+    return rows, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Smart Search CSV export.")
+    parser.add_argument("-o", "--output", required=True, help="CSV file to write.")
+    parser.add_argument("--rows", type=int, default=100000, help="Messages to generate. (default=100000)")
+    parser.add_argument("--senders", type=int, default=20000, help="Distinct senders in the pool. (default=20000)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of the sender volume. (default=1.1)")
+    parser.add_argument("--days", type=int, default=7, help="Days the messages are spread over. (default=7)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, the same seed writes the same file.")
+    args = parser.parse_args(argv)
+
+    rows, size = generate(args.output, args.rows, args.senders, args.zipf, args.days, args.seed)
+    print(f"Wrote {rows} rows ({size / (1024 * 1024):.1f} MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
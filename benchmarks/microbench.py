@@ -0,0 +1,213 @@
+"""
+Microbenchmarks of the per-row parsing functions.
+
+Every case runs one function over a fixed corpus of realistic inputs (benchmarks/corpus) and reports
+ns/call for the scalar function and, where there is one, its _batch variant. Before timing, the batch
+output is checked against the scalar output for the whole corpus. Timings are compared with a recorded
+baseline and the run fails when a case got slower than the allowed threshold.
+
+    python benchmarks/microbench.py --record          # record the baseline on this machine
+    python benchmarks/microbench.py --threshold 10    # compare, exit 1 on a >10% regression
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+from senderstats.common.address_parser import parse_email_details_batch, parse_email_details_tuple  # noqa: E402
+from senderstats.common.address_tools import (convert_srs, convert_srs_batch, normalize_bounces,  # noqa: E402
+                                              normalize_bounces_batch, normalize_entropy, remove_prvs,
+                                              remove_prvs_batch)
+from senderstats.common.mid_parser import MIDParser  # noqa: E402
+from senderstats.common.subject_normalizer import normalize_subject  # noqa: E402
+from senderstats.common.tld_parser import get_default_tld_parser  # noqa: E402
+from run_benchmarks import git_commit  # noqa: E402
+
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "microbench_baseline.json")
+
+
+def _clean_host(host: str) -> str:
+    # What the unchecked splitters expect, the safe ones do this themselves
+    return host.strip().rstrip(".").lower()
+
+
+@dataclass
+class Case:
+    name: str
+    corpus: str
+    scalar: Callable
+    batch: Optional[Callable] = None
+    # Applied to the corpus before timing, e.g. the casefold the CSV mapper does
+    prepare: Optional[Callable[[str], str]] = None
+    # Turns the list of scalar results into the shape the batch variant returns
+    as_batch: Callable[[List], object] = list
+
+
+def build_cases() -> List[Case]:
+    tld = get_default_tld_parser()
+    mid = MIDParser(tld)
+    first = lambda results: [r[0] for r in results]
+    columns = lambda results: tuple(list(column) for column in zip(*results))
+    return [
+        Case("normalize_subject", "subjects.txt", normalize_subject),
+        Case("split_host_safe", "hosts.txt", tld.split_host_safe, tld.split_host_batch_safe),
+        Case("split_host_unchecked", "hosts.txt", tld.split_host_unchecked, tld.split_host_batch_unchecked,
+             prepare=_clean_host),
+        Case("split_host_extended_safe", "hosts.txt", tld.split_host_extended_safe,
+             tld.split_host_extended_batch_safe, as_batch=columns),
+        Case("split_host_extended_unchecked", "hosts.txt", tld.split_host_extended_unchecked,
+             tld.split_host_extended_batch_unchecked, prepare=_clean_host, as_batch=columns),
+        Case("mid_parse", "message_ids.txt", mid.parse, prepare=str.casefold),
+        Case("parse_email_details", "header_from.txt", parse_email_details_tuple, parse_email_details_batch,
+             prepare=str.casefold, as_batch=lambda results: ([r[0] for r in results], [r[1] for r in results])),
+        Case("remove_prvs", "envelope_senders.txt", remove_prvs, remove_prvs_batch, prepare=str.casefold,
+             as_batch=first),
+        Case("convert_srs", "envelope_senders.txt", convert_srs, convert_srs_batch, prepare=str.casefold,
+             as_batch=first),
+        Case("normalize_bounces", "envelope_senders.txt", normalize_bounces, normalize_bounces_batch,
+             prepare=str.casefold, as_batch=first),
+        Case("normalize_entropy", "envelope_senders.txt", normalize_entropy, prepare=str.casefold),
+    ]
+
+
+def load_manifest() -> Dict:
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_corpus(manifest: Dict, name: str) -> List[str]:
+    with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != manifest["files"][name]:
+        raise SystemExit(f"{name} does not match corpus version {manifest['version']}, "
+                         f"bump the version in manifest.json when changing the corpus")
+    return data.decode("utf-8").split("\n")[:-1]
+
+
+def time_scalar(fn: Callable, items: List[str], reps: int, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for _ in range(reps):
+            for item in items:
+                fn(item)
+        samples.append(time.perf_counter_ns() - start)
+    return min(samples) / (reps * len(items))
+
+
+def time_batch(fn: Callable, items: List[str], reps: int, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for _ in range(reps):
+            fn(items)
+        samples.append(time.perf_counter_ns() - start)
+    return min(samples) / (reps * len(items))
+
+
+def first_mismatch(case: Case, items: List[str]) -> Optional[str]:
+    expected = case.as_batch([case.scalar(item) for item in items])
+    actual = case.batch(items)
+    if actual == expected:
+        return None
+    if isinstance(expected, tuple):
+        # Column lists, compare row by row
+        expected, actual = list(zip(*expected)), list(zip(*actual))
+    for item, want, got in zip(items, expected, actual):
+        if want != got:
+            return f"{item!r}: scalar {want!r}, batch {got!r}"
+    return f"batch returned {len(actual)} results for {len(expected)} inputs"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the per-row parsing functions.")
+    parser.add_argument("--case", action="append", help="Only run cases whose name starts with this, may be repeated.")
+    parser.add_argument("--reps", type=int, default=10, help="Passes over the corpus per round. (default=10)")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds, the fastest is kept. (default=7)")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed slowdown against the baseline in percent. (default=10)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare with or record to.")
+    parser.add_argument("--record", action="store_true", help="Record the timings as the new baseline.")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest()
+    baseline = None
+    if not args.record and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["corpus_version"] != manifest["version"]:
+            print(f"Baseline is for corpus version {baseline['corpus_version']}, not {manifest['version']}, "
+                  f"record a new one with --record")
+            baseline = None
+        elif baseline["python"] != platform.python_version() or baseline["platform"] != platform.platform():
+            print(f"Warning: baseline was recorded on Python {baseline['python']} ({baseline['platform']})")
+
+    cases = [case for case in build_cases() if not args.case or any(case.name.startswith(p) for p in args.case)]
+    corpora: Dict[str, List[str]] = {}
+    results: Dict[str, float] = {}
+    failures: List[str] = []
+
+    print(f"Corpus version {manifest['version']}, {args.rounds} rounds of {args.reps} passes\n")
+    print(f"{'Case':<38}{'ns/call':>10}{'Baseline':>10}{'Change':>9}")
+    for case in cases:
+        if case.corpus not in corpora:
+            corpora[case.corpus] = load_corpus(manifest, case.corpus)
+        items = corpora[case.corpus]
+        if case.prepare is not None:
+            items = [case.prepare(item) for item in items]
+
+        if case.batch is not None:
+            mismatch = first_mismatch(case, items)
+            if mismatch is not None:
+                failures.append(f"{case.name}: batch output differs, {mismatch}")
+
+        variants = [("scalar", case.scalar, time_scalar)]
+        if case.batch is not None:
+            variants.append(("batch", case.batch, time_batch))
+        for variant, fn, timer in variants:
+            key = f"{case.name}/{variant}"
+            timer(fn, items[:200], 1, 1)  # warm up
+            results[key] = ns = timer(fn, items, args.reps, args.rounds)
+
+            before = baseline["results"].get(key) if baseline else None
+            change = ""
+            if before:
+                ratio = ns / before - 1
+                change = f"{ratio:+.1%}"
+                if ratio * 100 > args.threshold:
+                    failures.append(f"{key}: {ns:.0f} ns/call, {ratio:+.1%} against the baseline of {before:.0f}")
+            print(f"{key:<38}{ns:>10.0f}{before or 0:>10.0f}{change:>9}")
+
+    if args.record:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "corpus_version": manifest["version"],
+                "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": {key: round(ns, 1) for key, ns in results.items()},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline recorded to {args.baseline}")
+
+    if failures:
+        print("\nFailed:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
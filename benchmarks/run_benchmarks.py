@@ -0,0 +1,167 @@
+"""
+End-to-end benchmarks of the senderstats command line.
+
+Every scenario runs the full pipeline (read, filter, transform, aggregate and write the report) in a
+fresh interpreter, so the peak memory of one scenario does not leak into the next. Results are
+appended to a JSON lines history with the version, commit and platform, and each run is compared
+with the previous result of the same scenario and input size.
+
+    python benchmarks/run_benchmarks.py --rows 500000
+    python benchmarks/run_benchmarks.py --input export.csv --scenario default --scenario full --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from statistics import median
+from typing import Dict, List, Optional
+
+from generate_smart_search import generate
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+
+NORMALIZE = ["--remove-prvs", "--decode-srs", "--normalize-bounces", "--normalize-entropy"]
+REPORTS = ["--gen-hfrom", "--gen-rpath", "--gen-alignment", "--gen-msgid"]
+SCENARIOS: Dict[str, List[str]] = {
+    "default": [],
+    "hfrom-alignment": ["--gen-hfrom", "--gen-alignment"],
+    "all-reports": REPORTS,
+    "subjects": ["--sample-subject"],
+    "normalize": NORMALIZE,
+    "expand-recipients": ["--expand-recipients"],
+    "full": REPORTS + NORMALIZE + ["--sample-subject", "--exclude-dup-msgids"],
+}
+
+# Runs in the child interpreter: the command line, then the elapsed time and peak memory as JSON
+CHILD = """
+import contextlib, io, json, sys, time
+sys.argv = ["senderstats"] + sys.argv[1:]
+from senderstats import cli
+from senderstats.processing.memory_report import peak_rss_bytes
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    cli.main()
+print(json.dumps({"seconds": time.perf_counter() - start, "peak_rss_bytes": peak_rss_bytes()}))
+"""
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(SRC_DIR), check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def package_version() -> str:
+    result = subprocess.run([sys.executable, "-c", "from senderstats.cli_args import get_version; print(get_version())"],
+                            capture_output=True, text=True, env=child_env())
+    return result.stdout.strip() or "unknown"
+
+
+def child_env() -> Dict[str, str]:
+    # Benchmark the working tree, not whichever senderstats happens to be installed
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def count_rows(path: str) -> int:
+    with open(path, "rb") as f:
+        return max(0, sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1)
+
+
+def run_scenario(input_file: str, flags: List[str], work_dir: str) -> Dict:
+    output = os.path.join(work_dir, "report.xlsx")
+    args = ["-i", input_file, "-o", output, "--no-progress", *flags]
+    result = subprocess.run([sys.executable, "-c", CHILD, *args], capture_output=True, text=True, env=child_env())
+    if result.returncode != 0:
+        raise RuntimeError(f"senderstats {' '.join(args)} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history: List[Dict], scenario: str, rows: int) -> Optional[Dict]:
+    for record in reversed(history):
+        if record["scenario"] == scenario and record["rows"] == rows:
+            return record
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the full senderstats pipeline.")
+    parser.add_argument("--input", help="Smart Search CSV to benchmark, a synthetic file is generated if omitted.")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows of the generated file. (default=200000)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the generated file. (default=1)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run, may be repeated. (default=all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario, the median is kept. (default=1)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON lines file the results are appended to.")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results, e.g. a release name.")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    version, commit = package_version(), git_commit()
+    with tempfile.TemporaryDirectory(prefix="senderstats-bench-") as work_dir:
+        input_file = args.input
+        if input_file is None:
+            input_file = os.path.join(work_dir, "smart_search.csv")
+            print(f"Generating {args.rows:,} rows...")
+            generate(input_file, args.rows, seed=args.seed)
+        rows = count_rows(input_file)
+        input_bytes = os.path.getsize(input_file)
+
+        print(f"senderstats {version} ({commit or 'no commit'}), {rows:,} rows, "
+              f"{input_bytes / (1024 * 1024):.1f} MB\n")
+        print(f"{'Scenario':<20}{'Seconds':>10}{'Rows/sec':>12}{'Peak MB':>10}{'vs previous':>14}")
+        records = []
+        for scenario in args.scenario or list(SCENARIOS):
+            runs = [run_scenario(input_file, SCENARIOS[scenario], work_dir) for _ in range(args.repeat)]
+            seconds = median(run["seconds"] for run in runs)
+            peaks = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"] is not None]
+            record = {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "label": args.label,
+                "version": version,
+                "commit": commit,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scenario": scenario,
+                "flags": SCENARIOS[scenario],
+                "input": os.path.basename(input_file) if args.input else f"synthetic-seed{args.seed}",
+                "rows": rows,
+                "input_bytes": input_bytes,
+                "repeat": args.repeat,
+                "seconds": round(seconds, 4),
+                "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+                "peak_rss_bytes": max(peaks) if peaks else None,
+            }
+            records.append(record)
+
+            previous = previous_result(history, scenario, rows)
+            change = ""
+            if previous and previous.get("rows_per_second") and record["rows_per_second"]:
+                change = f"{record['rows_per_second'] / previous['rows_per_second'] - 1:+.1%}"
+            peak_mb = f"{record['peak_rss_bytes'] / (1024 * 1024):.0f}" if record["peak_rss_bytes"] else "n/a"
+            print(f"{scenario:<20}{seconds:>10.2f}{record['rows_per_second'] or 0:>12,.0f}{peak_mb:>10}{change:>14}")
+
+    with open(args.history, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"\nResults appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 import sys
 
-from senderstats.cli import main as cli_main
-from senderstats.gui import main as gui_main
-
 if __name__ == "__main__":
     if "--gui" in sys.argv:
         sys.argv.remove("--gui")
+        from senderstats.gui import main as gui_main
         gui_main()
     else:
+        from senderstats.cli import main as cli_main
         cli_main()
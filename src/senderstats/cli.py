@@ -1,14 +1,128 @@
-from senderstats.cli_args import parse_arguments
-from senderstats.processing.config_manager import ConfigManager
-from senderstats.processing.data_source_manager import DataSourceManager
-from senderstats.processing.pipeline_manager import PipelineManager
-from senderstats.processing.pipeline_processor import PipelineProcessor
-from senderstats.reporting.pipeline_processor_report import PipelineProcessorReport
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+from senderstats.cli_args import parse_arguments, parse_ingest_arguments, parse_merge_arguments
+
+# The pipeline, its parsers and the report writers are imported once the arguments are parsed,
+# so --help and usage errors return without loading them
+if TYPE_CHECKING:
+    from senderstats.processing.config_manager import ConfigManager
+    from senderstats.processing.pipeline_manager import PipelineManager
+
+
+def create_report(config: ConfigManager, pipeline_manager: PipelineManager, partial_run=None):
+    if config.output_format == 'xlsx':
+        from senderstats.reporting.pipeline_processor_report import PipelineProcessorReport
+        return PipelineProcessorReport(config.output_file, pipeline_manager, config.with_probability, partial_run,
+                                       config.streaming_report)
+    from senderstats.reporting.file_report import PipelineProcessorFileReport
+    return PipelineProcessorFileReport(config.output_file, pipeline_manager, config.output_format, partial_run)
+
+
+def merge_main(argv):
+    merge_args = parse_merge_arguments(argv)
+
+    from senderstats.common.utils import print_list_with_title
+    from senderstats.processing.config_manager import ConfigManager
+    from senderstats.processing.pipeline_manager import PipelineManager
+    from senderstats.processing.snapshot_manager import SnapshotManager
+
+    try:
+        snapshots = [SnapshotManager.load(path) for path in merge_args.snapshots]
+        options = SnapshotManager.merge_options(snapshots)
+    except (OSError, ValueError) as e:
+        print(f"Unable to merge snapshots: {e}")
+        return 1
+
+    print_list_with_title("Snapshots to be merged:", [s.path for s in snapshots])
+
+    # Rebuild the run configuration the snapshots were created with
+    args = parse_arguments(["-i", *merge_args.snapshots, "-o", merge_args.output_file,
+                            "--output-format", merge_args.output_format])
+    for key, value in options.items():
+        setattr(args, key, value)
+    args.save_snapshot = merge_args.save_snapshot
+    args.streaming_report = merge_args.streaming_report
+    args.report_sort = merge_args.report_sort
+    args.report_top = merge_args.report_top
+    args.report_min_messages = merge_args.report_min_messages
+
+    if args.report_sort == 'score' and not args.with_probability:
+        print("Unable to merge snapshots: --report-sort score requires snapshots created with --with-probability")
+        return 1
+
+    config = ConfigManager(args)
+
+    pipeline_manager = PipelineManager(config)
+    for snapshot in snapshots:
+        pipeline_manager.merge_state(snapshot.state)
+
+    # Display filtering statistics
+    pipeline_manager.get_filter_manager().display_summary()
+
+    if config.save_snapshot:
+        SnapshotManager.save(config.save_snapshot, config.snapshot_options, pipeline_manager.get_state())
+        print(f"Snapshot saved: {config.save_snapshot}")
+
+    report = create_report(config, pipeline_manager)
+    report.generate()
+    report.close()
+
+
+def ingest_main(argv):
+    ingest_args = parse_ingest_arguments(argv)
+
+    from senderstats.processing.ingest_manager import IngestManager
+    ingest = IngestManager(ingest_args)
+
+    if not ingest.get_input_files():
+        print("No input files exist, please check if the input files exist")
+        return 1
+
+    try:
+        start_time = time.perf_counter()
+        rows = ingest.ingest()
+    except (OSError, ValueError) as e:
+        print(f"Unable to ingest: {e}")
+        return 1
+
+    print(f"Ingested {rows} rows in {time.perf_counter() - start_time:.4f} seconds")
+    if ingest.get_skipped_rows():
+        print(f"Skipped {ingest.get_skipped_rows()} row(s) with an empty or unparsable date")
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        return merge_main(sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "ingest":
+        return ingest_main(sys.argv[2:])
+
+    args = parse_arguments()
+
+    from senderstats.common.progress_line import ProgressLine
+    from senderstats.common.utils import print_list_with_title
+    from senderstats.data.data_source_type import DataSourceType
+    from senderstats.processing.aggregate_cache import AggregateCache
+    from senderstats.processing.cached_pipeline_processor import CachedPipelineProcessor
+    from senderstats.processing.checkpoint_manager import CheckpointManager
+    from senderstats.processing.config_manager import ConfigManager
+    from senderstats.processing.data_source_manager import DataSourceManager
+    from senderstats.processing.memory_report import MemoryReport
+    from senderstats.processing.metrics_exporter import MetricsExporter
+    from senderstats.processing.pipeline_manager import PipelineManager
+    from senderstats.processing.pipeline_processor import PipelineProcessor
+    from senderstats.processing.run_manifest import RunManifest
+    from senderstats.processing.run_profiler import RunProfiler
+    from senderstats.processing.snapshot_manager import SnapshotManager
+    from senderstats.processing.two_pass_pipeline_processor import TwoPassPipelineProcessor
+
     # Config object stores all arguments parsed
-    config = ConfigManager(parse_arguments())
+    config = ConfigManager(args)
 
     if not config.input_files:
         print(f"No input files exist, please check if the input files exist")
@@ -16,22 +130,93 @@ def main():
 
     config.display_filter_criteria()
 
+    run_manifest = RunManifest(config) if config.run_manifest else None
+    profiler = RunProfiler(config.profile, config.profile_sample) if config.profile else None
+
     # This will create a CSV data source or WebSocket for PoD Log API
     data_source_manager = DataSourceManager(config)
 
     # Pipeline manager builds the correct filters and processing depending on the report options
     pipeline_manager = PipelineManager(config)
 
-    processor = PipelineProcessor(data_source_manager, pipeline_manager)
+    memory_report = MemoryReport(pipeline_manager, config.memory_trace) if config.memory_report else None
+    if memory_report is not None:
+        # Other processing modes read through their own data sources, only the totals are measured there
+        data_source_manager.get_data_source().add_file_listener(memory_report.file_completed)
+
+    # Only drawn on a terminal, a progress line would litter redirected output
+    if config.progress and config.source_type == DataSourceType.CSV and sys.stderr.isatty():
+        data_source_manager.get_data_source().add_progress_listener(ProgressLine())
 
-    processor.process_data()
+    cache = None
+    if config.cache_dir:
+        cache = AggregateCache(config.cache_dir, config.cache_max_size * 1024 * 1024, config.cache_key)
+        if config.clear_cache:
+            print(f"Cleared {cache.clear()} cached aggregate(s)")
+        processor = CachedPipelineProcessor(config, pipeline_manager, cache)
+    elif config.two_pass:
+        processor = TwoPassPipelineProcessor(config, pipeline_manager)
+    elif config.checkpoint:
+        checkpoint_manager = CheckpointManager(config.checkpoint, config.checkpoint_interval, config.snapshot_options)
+        if config.resume:
+            try:
+                checkpoint_manager.resume(pipeline_manager, data_source_manager.get_data_source())
+            except (OSError, ValueError) as e:
+                print(f"Unable to resume: {e}")
+                return 1
+        processor = PipelineProcessor(data_source_manager, pipeline_manager, checkpoint_manager)
+    else:
+        processor = PipelineProcessor(data_source_manager, pipeline_manager)
+
+    metrics_exporter = None
+    if config.metrics_file:
+        metrics_exporter = MetricsExporter(config.metrics_file, pipeline_manager, processor.get_rows_read,
+                                           config.metrics_interval, cache)
+        metrics_exporter.start()
+
+    with profiler.phase('ingest', pipeline_manager.get_pipeline()) if profiler else nullcontext():
+        processor.process_data()
+
+    partial_run = processor.get_partial_run()
+    if partial_run is not None:
+        print()
+        print("Processing was interrupted, generating a partial report.")
+        print_list_with_title("Files partially processed:", partial_run.partial_files)
+        print_list_with_title("Files not processed:", partial_run.unprocessed_files)
 
     # Display filtering statistics
     pipeline_manager.get_filter_manager().display_summary()
 
-    report = PipelineProcessorReport(config.output_file, pipeline_manager, config.with_probability)
-    report.generate()
-    report.close()
+    if config.stage_timing:
+        pipeline_manager.get_stage_timer().display_summary()
+
+    if memory_report is not None:
+        memory_report.measure()
+        memory_report.display_summary()
+
+    if config.save_snapshot:
+        SnapshotManager.save(config.save_snapshot, config.snapshot_options, pipeline_manager.get_state())
+        print(f"Snapshot saved: {config.save_snapshot}")
+
+    with profiler.phase('report') if profiler else nullcontext():
+        report = create_report(config, pipeline_manager, partial_run)
+        report.generate()
+        report.close()
+
+    memory_budget = pipeline_manager.get_processor_manager().memory_budget
+    if memory_budget is not None:
+        memory_budget.display_summary()
+        memory_budget.cleanup()
+
+    if metrics_exporter is not None and metrics_exporter.finish():
+        print(f"Metrics saved: {config.metrics_file}")
+
+    if run_manifest is not None:
+        run_manifest.write(config.run_manifest, pipeline_manager, partial_run, memory_report)
+        print(f"Run manifest saved: {config.run_manifest}")
+
+    if profiler is not None:
+        print(f"Profiles saved: {config.profile}")
 
 
 if __name__ == "__main__":
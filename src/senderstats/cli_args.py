@@ -1,7 +1,7 @@
 import argparse
+import importlib.util
 import re
 import sys
-from importlib.metadata import version, PackageNotFoundError
 
 from senderstats.common.defaults import *
 from senderstats.common.regex_patterns import EMAIL_ADDRESS_REGEX, VALID_DOMAIN_REGEX, IPV46_REGEX
@@ -9,12 +9,23 @@ from senderstats.data.data_source_type import DataSourceType
 
 
 def get_version():
+    # importlib.metadata is slow to import, only load it when the version is asked for
+    from importlib.metadata import version, PackageNotFoundError
     try:
         return version("senderstats")
     except PackageNotFoundError:
         return "0.0.0"
 
 
+class _VersionAction(argparse.Action):
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(f'SenderStats {get_version()}')
+        parser.exit()
+
+
 def is_valid_domain_syntax(domain_name: str):
     if not re.match(VALID_DOMAIN_REGEX, domain_name, re.IGNORECASE):
         raise argparse.ArgumentTypeError(f"Invalid domain name syntax: {domain_name}")
@@ -39,34 +50,49 @@ def validate_xlsx_file(file_path):
     return file_path
 
 
-def parse_arguments():
-    parser = argparse.ArgumentParser(
-        prog="senderstats",
-        add_help=False,
-        description="This tool helps identify the top senders based on smart search outbound message exports.",
-        formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=80)
-    )
+def add_output_format_argument(output_group):
+    output_group.add_argument('--output-format', dest="output_format", choices=['xlsx', 'csv', 'jsonl', 'parquet'],
+                              default='xlsx',
+                              help='Report format. csv, jsonl and parquet write one file per report into the output '
+                                   'directory, parquet requires pyarrow. (default=xlsx)')
 
-    required_group = parser.add_argument_group('Input / Output arguments (required)')
-    field_group = parser.add_argument_group('Field mapping arguments (optional)')
-    reporting_group = parser.add_argument_group('Reporting control arguments (optional)')
-    parser_group = parser.add_argument_group('Parsing behavior arguments (optional)')
-    output_group = parser.add_argument_group('Extended processing controls (optional)')
-    usage = parser.add_argument_group('Usage')
-    usage.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS,
-                       help='Show this help message and exit')
 
-    usage.add_argument('--version', action='version', help="Show the program's version and exit",
-                       version=f'SenderStats {get_version()}')
+def check_output_arguments(parser, args):
+    if args.output_format == 'xlsx':
+        try:
+            validate_xlsx_file(args.output_file)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    elif args.output_file.lower().endswith('.xlsx'):
+        parser.error(f"--output-format {args.output_format} writes one file per report, -o must be a directory")
 
-    required_group.add_argument('-i', '--input', metavar='<file>', dest="input_files",
-                                nargs='+', type=str, required=True,
-                                help='Smart search files to read.')
+    if args.output_format == 'parquet' and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--output-format parquet requires pyarrow, install it with: pip install senderstats[parquet]")
+
+
+def add_report_selection_arguments(output_group):
+    output_group.add_argument('--report-sort', dest="report_sort", choices=SORT_METRICS, default=None,
+                              help='Sort report rows by this metric, largest first. score requires --with-probability. '
+                                   '(default=first seen order)')
+    output_group.add_argument('--report-top', metavar='N', dest="report_top", type=int, default=None,
+                              help='Only list the N largest keys per report, the rest are combined into an "Other" row. '
+                                   '(sorts by messages unless --report-sort is given)')
+    output_group.add_argument('--report-min-messages', metavar='N', dest="report_min_messages", type=int, default=0,
+                              help='Combine keys with fewer than N messages into an "Other" row.')
+
+
+def check_report_selection_arguments(parser, args, with_probability: bool):
+    if args.report_top is not None and args.report_top <= 0:
+        parser.error("--report-top must be greater than 0")
 
-    required_group.add_argument('-o', '--output', metavar='<xlsx>', dest="output_file",
-                                type=validate_xlsx_file, required=True,
-                                help='Output file')
+    if args.report_min_messages < 0:
+        parser.error("--report-min-messages must not be negative")
 
+    if args.report_sort == 'score' and not with_probability:
+        parser.error("--report-sort score requires --with-probability")
+
+
+def add_field_mapping_arguments(field_group):
     field_group.add_argument('--ip', metavar='IP', dest="ip_field", type=str, required=False,
                              help=f'CSV field of the IP address. (default={DEFAULT_IP_FIELD})')
     field_group.add_argument('--mfrom', metavar='MFrom', dest="mfrom_field", type=str, required=False,
@@ -86,6 +112,36 @@ def parse_arguments():
     field_group.add_argument('--date', metavar='Date', dest="date_field", type=str, required=False,
                              help=f'CSV field of message date/time. (default={DEFAULT_DATE_FIELD})')
 
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="senderstats",
+        add_help=False,
+        description="This tool helps identify the top senders based on smart search outbound message exports.",
+        formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=80)
+    )
+
+    required_group = parser.add_argument_group('Input / Output arguments (required)')
+    field_group = parser.add_argument_group('Field mapping arguments (optional)')
+    reporting_group = parser.add_argument_group('Reporting control arguments (optional)')
+    parser_group = parser.add_argument_group('Parsing behavior arguments (optional)')
+    output_group = parser.add_argument_group('Extended processing controls (optional)')
+    usage = parser.add_argument_group('Usage')
+    usage.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS,
+                       help='Show this help message and exit')
+
+    usage.add_argument('--version', action=_VersionAction, help="Show the program's version and exit")
+
+    required_group.add_argument('-i', '--input', metavar='<file>', dest="input_files",
+                                nargs='+', type=str, required=True,
+                                help='Smart search files to read.')
+
+    required_group.add_argument('-o', '--output', metavar='<xlsx|dir>', dest="output_file",
+                                type=str, required=True,
+                                help='Output file, or output directory for --output-format csv, jsonl or parquet')
+
+    add_field_mapping_arguments(field_group)
+
     reporting_group.add_argument('--gen-hfrom', action='store_true', dest="gen_hfrom",
                                  help='Generate report showing the header From: data for messages being sent.')
     reporting_group.add_argument('--gen-rpath', action='store_true', dest="gen_rpath",
@@ -134,13 +190,87 @@ def parse_arguments():
     output_group.add_argument('--no-default-exclude-ips', action='store_true', dest="no_default_exclude_ips",
                               help='Will not include the default localhost ip exclusion.')
 
+    output_group.add_argument('--save-snapshot', metavar='<file>', dest="save_snapshot", type=str, required=False,
+                              help='Save the aggregation state to a snapshot file that can be combined with "senderstats merge".')
+
+    output_group.add_argument('--cache-dir', metavar='<dir>', dest="cache_dir", type=str, required=False,
+                              help='Cache per-file aggregates in this directory, unchanged files are not parsed again.')
+    output_group.add_argument('--cache-max-size', metavar='<MB>', dest="cache_max_size", type=int, default=2048,
+                              help='Maximum size of the aggregate cache, least recently used entries are evicted. (default=2048)')
+    output_group.add_argument('--cache-key', dest="cache_key", choices=['mtime', 'content'], default='mtime',
+                              help='Identify cached files by path, size and mtime or by a content fingerprint. (default=mtime)')
+    output_group.add_argument('--clear-cache', action='store_true', dest="clear_cache",
+                              help='Invalidate all cached aggregates before processing.')
+
+    output_group.add_argument('--checkpoint', metavar='<file>', dest="checkpoint", type=str, required=False,
+                              help='Periodically save the processing state to this file so the run can be resumed.')
+    output_group.add_argument('--checkpoint-interval', metavar='<seconds>', dest="checkpoint_interval", type=float,
+                              default=300, help='Seconds between checkpoints. (default=300)')
+    output_group.add_argument('--resume', action='store_true', dest="resume",
+                              help='Continue from the checkpoint file, already processed input is skipped.')
+
+    output_group.add_argument('--two-pass', action='store_true', dest="two_pass",
+                              help='Read the input twice: count every key first, then analyze subjects only for keys '
+                                   'with at least --two-pass-min-per-day messages per day (requires --sample-subject).')
+    output_group.add_argument('--two-pass-min-per-day', metavar='<N>', dest="two_pass_min_per_day", type=float,
+                              default=DEFAULT_THRESHOLD,
+                              help=f'Messages per day a key needs for subject analysis with --two-pass. '
+                                   f'(default={DEFAULT_THRESHOLD})')
+
+    output_group.add_argument('--sketch-keys', metavar='<K>', dest="sketch_keys", type=int, required=False,
+                              help='Keep exact statistics for about K keys per report and count the rest in a fixed '
+                                   'size sketch. Bounds memory for inputs with millions of distinct senders.')
+    output_group.add_argument('--max-memory', metavar='<MB>', dest="max_memory", type=int, required=False,
+                              help='Approximate memory budget for aggregated statistics. Aggregates beyond the budget '
+                                   'are spilled to temporary files and merged back when the report is written.')
+    output_group.add_argument('--spill-dir', metavar='<dir>', dest="spill_dir", type=str, required=False,
+                              help='Directory for the temporary files of --max-memory. (default=system temp directory)')
+
+    output_group.add_argument('--streaming-report', action='store_true', dest="streaming_report",
+                              help='Write the report in constant memory mode, rows are flushed to disk as they are '
+                                   'written. Recommended for very large reports.')
+
+    add_output_format_argument(output_group)
+    add_report_selection_arguments(output_group)
+
+    output_group.add_argument('--no-progress', action='store_true', dest="no_progress",
+                              help='Do not show the progress line (rows/sec, MB/sec and ETA) while reading CSV files.')
+
+    output_group.add_argument('--stage-timing', action='store_true', dest="stage_timing",
+                              help='Time every filter, transform and processor and print a per-stage table.')
+    output_group.add_argument('--stage-timing-sample', metavar='<N>', dest="stage_timing_sample", type=int,
+                              default=DEFAULT_STAGE_TIMING_SAMPLE,
+                              help=f'Time one row in N with --stage-timing, rows are always counted. '
+                                   f'(default={DEFAULT_STAGE_TIMING_SAMPLE})')
+    output_group.add_argument('--run-manifest', metavar='<file>', dest="run_manifest", type=str, required=False,
+                              help='Write a JSON manifest of the run (version, options, inputs, timings and filter '
+                                   'counts) to this file.')
+
+    output_group.add_argument('--metrics-file', metavar='<file>', dest="metrics_file", type=str, required=False,
+                              help='Write run statistics (rows, rows/sec, exclusions, cache hits, peak memory, and '
+                                   'stage times with --stage-timing) in OpenMetrics text format to this file, e.g. for a node_exporter '
+                                   'textfile collector.')
+    output_group.add_argument('--metrics-interval', metavar='<seconds>', dest="metrics_interval", type=float,
+                              default=60, help='Seconds between updates of --metrics-file while processing, 0 only '
+                                               'writes it when the run ends. (default=60)')
+    output_group.add_argument('--memory-report', action='store_true', dest="memory_report",
+                              help='Estimate the keys and bytes per key held by every report\'s aggregator and the '
+                                   'peak memory of the run, included in --run-manifest.')
+    output_group.add_argument('--memory-trace', action='store_true', dest="memory_trace",
+                              help='Like --memory-report, and trace allocations with tracemalloc to record memory '
+                                   'growth after every input file. Slows processing down considerably.')
+
     output_group.add_argument("--debug", action="store_true", dest="debug", help=argparse.SUPPRESS)
+    output_group.add_argument("--profile", metavar='<dir>', dest="profile", type=str, required=False,
+                              help=argparse.SUPPRESS)
+    output_group.add_argument("--profile-sample", metavar='<N>', dest="profile_sample", type=int, default=1,
+                              help=argparse.SUPPRESS)
 
-    if len(sys.argv) == 1:
+    if argv is None and len(sys.argv) == 1:
         parser.print_usage(sys.stderr)
         sys.exit(1)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.input_files:
         args.source_type = DataSourceType.CSV
@@ -150,4 +280,133 @@ def parse_arguments():
     if args.with_probability and not args.sample_subject:
         parser.error("--with-probability requires --sample-subject")
 
+    if args.clear_cache and not args.cache_dir:
+        parser.error("--clear-cache requires --cache-dir")
+
+    if args.cache_dir and args.exclude_dup_msgids:
+        parser.error("--cache-dir cannot be combined with --exclude-dup-msgids (duplicates span files)")
+
+    if args.cache_max_size <= 0:
+        parser.error("--cache-max-size must be greater than 0")
+
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+
+    if args.checkpoint and args.cache_dir:
+        parser.error("--checkpoint cannot be combined with --cache-dir")
+
+    if args.checkpoint_interval <= 0:
+        parser.error("--checkpoint-interval must be greater than 0")
+
+    if args.two_pass and not args.sample_subject:
+        parser.error("--two-pass requires --sample-subject")
+
+    if args.two_pass and (args.cache_dir or args.checkpoint):
+        parser.error("--two-pass cannot be combined with --cache-dir or --checkpoint")
+
+    if args.sketch_keys is not None and args.sketch_keys <= 0:
+        parser.error("--sketch-keys must be greater than 0")
+
+    if args.sketch_keys and args.two_pass:
+        parser.error("--sketch-keys cannot be combined with --two-pass")
+
+    if args.max_memory is not None and args.max_memory <= 0:
+        parser.error("--max-memory must be greater than 0")
+
+    if args.max_memory and (args.sketch_keys or args.two_pass):
+        parser.error("--max-memory cannot be combined with --sketch-keys or --two-pass")
+
+    # Saving the state would read every spilled partition back into memory
+    if args.max_memory and (args.checkpoint or args.save_snapshot or args.cache_dir):
+        parser.error("--max-memory cannot be combined with --checkpoint, --save-snapshot or --cache-dir")
+
+    if args.stage_timing_sample <= 0:
+        parser.error("--stage-timing-sample must be greater than 0")
+
+    if args.metrics_interval < 0:
+        parser.error("--metrics-interval must not be negative")
+
+    if args.profile_sample <= 0:
+        parser.error("--profile-sample must be greater than 0")
+
+    # Both read rows through pipelines of their own, which the sampler never sees
+    if args.profile_sample > 1 and (args.cache_dir or args.two_pass):
+        parser.error("--profile-sample cannot be combined with --cache-dir or --two-pass")
+
+    if args.two_pass_min_per_day < 0:
+        parser.error("--two-pass-min-per-day must not be negative")
+
+    check_output_arguments(parser, args)
+    check_report_selection_arguments(parser, args, args.with_probability)
+
+    return args
+
+
+def parse_merge_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="senderstats merge",
+        add_help=False,
+        description="Merge aggregate snapshots created with --save-snapshot and generate a single report.",
+        formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=80)
+    )
+
+    required_group = parser.add_argument_group('Input / Output arguments (required)')
+    output_group = parser.add_argument_group('Extended processing controls (optional)')
+    usage = parser.add_argument_group('Usage')
+    usage.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS,
+                       help='Show this help message and exit')
+
+    required_group.add_argument('snapshots', metavar='<snapshot>', nargs='+', type=str,
+                                help='Snapshot files to merge.')
+
+    required_group.add_argument('-o', '--output', metavar='<xlsx|dir>', dest="output_file",
+                                type=str, required=True,
+                                help='Output file, or output directory for --output-format csv, jsonl or parquet')
+
+    output_group.add_argument('--save-snapshot', metavar='<file>', dest="save_snapshot", type=str, required=False,
+                              help='Save the merged aggregation state to a new snapshot file.')
+    output_group.add_argument('--streaming-report', action='store_true', dest="streaming_report",
+                              help='Write the report in constant memory mode, rows are flushed to disk as they are '
+                                   'written. Recommended for very large reports.')
+
+    add_output_format_argument(output_group)
+    add_report_selection_arguments(output_group)
+
+    args = parser.parse_args(argv)
+    check_output_arguments(parser, args)
+    # Whether scores exist is only known once the snapshots are read
+    check_report_selection_arguments(parser, args, True)
     return args
+
+
+def parse_ingest_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="senderstats ingest",
+        add_help=False,
+        description="Convert smart search files into a columnar file that can be re-analyzed quickly with different "
+                    "report options.",
+        formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=80)
+    )
+
+    required_group = parser.add_argument_group('Input / Output arguments (required)')
+    field_group = parser.add_argument_group('Field mapping arguments (optional)')
+    parser_group = parser.add_argument_group('Parsing behavior arguments (optional)')
+    usage = parser.add_argument_group('Usage')
+    usage.add_argument('-h', '--help', action='help', default=argparse.SUPPRESS,
+                       help='Show this help message and exit')
+
+    required_group.add_argument('-i', '--input', metavar='<file>', dest="input_files",
+                                nargs='+', type=str, required=True,
+                                help='Smart search files to read.')
+
+    required_group.add_argument('-o', '--output', metavar='<ssc>', dest="output_file",
+                                type=str, required=True,
+                                help='Columnar file to create.')
+
+    add_field_mapping_arguments(field_group)
+
+    parser_group.add_argument('--date-format', metavar='DateFmt', dest="date_format", type=str, required=False,
+                              help=f'Date format used to parse the timestamps. (default={DEFAULT_DATE_FORMAT.replace("%", "%%")})',
+                              default=DEFAULT_DATE_FORMAT)
+
+    return parser.parse_args(argv)
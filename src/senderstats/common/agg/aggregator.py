@@ -1,10 +1,17 @@
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Generic, Hashable, Iterator, Tuple, TypeVar
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Iterator, List, Set, Tuple, TypeVar
 
 K = TypeVar("K", bound=Hashable)
 AggT = TypeVar("AggT")
 
 
+def key_bytes(key: Hashable) -> bytes:
+    # Python's hash() is salted per process, sketches and spill partitions must hash the same in every run
+    if isinstance(key, str):
+        return key.encode("utf-8", "surrogatepass")
+    return repr(key).encode("utf-8", "surrogatepass")
+
+
 @dataclass
 class KeyedAggregator(Generic[K, AggT]):
     agg_factory: Callable[[], AggT]
@@ -19,3 +26,24 @@ class KeyedAggregator(Generic[K, AggT]):
 
     def items(self) -> Iterator[Tuple[K, AggT]]:
         return self.data.items()
+
+    def keys_where(self, predicate: Callable[[AggT], bool]) -> Set[K]:
+        return {key for key, agg in self.data.items() if predicate(agg)}
+
+    def replace(self, other: "KeyedAggregator[K, AggT]", keys: Iterable[K]) -> None:
+        # Keys other has never seen keep their aggregate
+        data = self.data
+        other_data = other.data
+        for key in keys:
+            agg = other_data.get(key)
+            if agg is not None:
+                data[key] = agg
+
+    def get_state(self) -> List[Tuple[K, Any]]:
+        # Plain tuples only, aggregates must provide to_state()/merge_state()
+        return [(key, agg.to_state()) for key, agg in self.data.items()]
+
+    def merge_state(self, state: List[Tuple[K, Any]]) -> None:
+        get = self.get
+        for key, agg_state in state:
+            get(key).merge_state(agg_state)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Batched scoring is optional, the scalar code is used without it
+    np = None
+
+from .scoring import SenderScore, compute_sender_scores_and_label
+
+# Labels in the order classify_sender tests them, with their sort base
+_LABELS = (
+    ("Likely Human", 0.05),
+    ("High Probability App", 0.90),
+    ("Low-Volume Automated Source", 0.55),
+    ("Medium Probability App", 0.70),
+    ("Human-Operated Workflow", 0.30),
+)
+
+# volume_prior breakpoints
+_VOLUME_X = (0.0, 5.0, 25.0, 50.0, 75.0, 100.0)
+_VOLUME_Y = (0.05, 0.10, 0.35, 0.90, 0.97, 0.99)
+
+
+def is_numpy_available() -> bool:
+    return np is not None
+
+
+def _sigmoid(x):
+    # Same branches as scoring._sigmoid, exp() only ever sees non-positive values
+    z = np.exp(-np.abs(x))
+    return np.where(x >= 0, 1.0 / (1.0 + z), z / (1.0 + z))
+
+
+def _score_arrays(total_messages, messages_per_day, reply_ratio, top_mass, top3_mass, top1_ratio, ent):
+    clip01 = lambda a: np.clip(a, 0.0, 1.0)
+
+    # app_probability
+    rr = clip01(reply_ratio)
+    score = (
+            3.0 * (clip01(top_mass) - 0.60) +
+            2.0 * (clip01(top3_mass) - 0.75) +
+            1.5 * (clip01(top1_ratio) - 0.30) +
+            2.5 * ((1.0 - clip01(ent)) - 0.35)
+    )
+    score += -3.0 * (rr - 0.20)
+    p_signal = _sigmoid(4.0 * score)
+    confidence = np.minimum(total_messages / 25.0, 1.0)
+    p_template = 0.20 * (1.0 - confidence) + p_signal * confidence
+    p_template = np.where(total_messages <= 0, 0.0, p_template)
+
+    # volume_prior, np.interp holds the end values outside the breakpoints
+    rpd = np.maximum(messages_per_day, 0.0)
+    p_volume = np.interp(rpd, _VOLUME_X, _VOLUME_Y)
+
+    # combine_probabilities
+    pt = clip01(p_template)
+    p_app_like = pt + (1.0 - pt) * (clip01(p_volume) ** 2) * 0.35
+
+    # human_probability
+    p_human = _sigmoid(14.0 * (rr - 0.30)) * (1.0 - _sigmoid(0.18 * (rpd - 25.0)))
+
+    p_final = p_app_like * (1.0 - p_human)
+    p_final = np.where(reply_ratio >= 0.40, np.minimum(p_final, 0.10),
+                       np.where(reply_ratio >= 0.30, np.minimum(p_final, 0.20), p_final))
+
+    # classify_sender, the first matching condition wins
+    low_reply = reply_ratio <= 0.02
+    label_index = np.select(
+        [
+            p_human >= 0.40,
+            messages_per_day >= 20.0,
+            (messages_per_day < 1.0) & low_reply & (top1_ratio >= 0.95),
+            (messages_per_day >= 1.0) & low_reply,
+        ],
+        [0, 1, 2, 3],
+        default=4,
+    )
+    base = np.array([b for _, b in _LABELS])[label_index]
+
+    # autonomy_score
+    ph = clip01(p_human)
+    rank = clip01(p_app_like) * (1.0 - ph) * 0.75
+    rank += np.minimum(1.0, messages_per_day / 20.0) * 0.15
+    rank += clip01((0.30 - reply_ratio) / 0.30) * 0.10
+    lowvol_auto = (messages_per_day < 1.0) & (reply_ratio == 0.0) & (top1_ratio >= 0.95)
+    rank = np.where(lowvol_auto, np.maximum(rank, 0.60), rank)
+    rank = np.where(ph >= 0.40, np.minimum(rank, 0.10), rank)
+    p_rank = clip01(rank)
+
+    sort_score = base + p_rank * 0.099
+
+    return p_template, p_volume, p_app_like, p_human, p_final, p_rank, label_index, sort_score
+
+
+def compute_sender_scores_batch(
+        *,
+        total_messages: Sequence[int],
+        messages_per_day: Sequence[float],
+        reply_ratio: Sequence[float],
+        top_mass: Sequence[float],
+        top3_mass: Sequence[float],
+        top1_ratio: Sequence[float],
+        ent: Sequence[float],
+) -> List[SenderScore]:
+    """
+    compute_sender_scores_and_label for many senders at once, element i of every
+    argument describes sender i.
+
+    With NumPy installed the scores are computed on arrays, the results match the
+    scalar code to within floating point rounding. Without it every sender is
+    scored with the scalar code.
+    """
+    if np is None:
+        return [
+            compute_sender_scores_and_label(
+                total_messages=n, messages_per_day=rpd, reply_ratio=rr, top_mass=tm,
+                top3_mass=t3, top1_ratio=t1, ent=e,
+            )
+            for n, rpd, rr, tm, t3, t1, e in zip(
+                total_messages, messages_per_day, reply_ratio, top_mass, top3_mass, top1_ratio, ent)
+        ]
+
+    if len(total_messages) == 0:
+        return []
+
+    arrays = [np.asarray(a, dtype=np.float64) for a in (
+        total_messages, messages_per_day, reply_ratio, top_mass, top3_mass, top1_ratio, ent)]
+    p_template, p_volume, p_app_like, p_human, p_final, p_rank, label_index, sort_score = _score_arrays(*arrays)
+
+    labels = [name for name, _ in _LABELS]
+    return [
+        SenderScore(
+            p_template=pt,
+            p_volume=pv,
+            p_app_like=pa,
+            p_human=ph,
+            p_final=pf,
+            p_rank=pr,
+            label=labels[li],
+            sort_score=ss,
+        )
+        for pt, pv, pa, ph, pf, pr, li, ss in zip(
+            p_template.tolist(), p_volume.tolist(), p_app_like.tolist(), p_human.tolist(),
+            p_final.tolist(), p_rank.tolist(), label_index.tolist(), sort_score.tolist())
+    ]
@@ -0,0 +1,87 @@
+import sys
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, Hashable, Tuple
+
+from .aggregator import KeyedAggregator
+from .message import MessageAgg
+
+# Keys measured per aggregator, spread evenly over insertion order
+MEASURE_SAMPLE_KEYS = 10000
+
+
+def agg_size_breakdown(key: Hashable, agg: MessageAgg) -> Tuple[int, int, int]:
+    """
+    Approximate bytes held by one entry of a keyed aggregator.
+
+    :return: Bytes of the key, of the MessageAgg itself (with its timing statistics) and of its
+        subject pattern table. Shared objects such as interned strings are counted every time.
+    """
+    key_size = sys.getsizeof(key)
+    if isinstance(key, tuple):
+        key_size += sum(sys.getsizeof(k) for k in key)
+
+    agg_size = sys.getsizeof(agg) + sys.getsizeof(agg.__dict__)
+    agg_size += 2 * (sys.getsizeof(agg.gap_stats) + sys.getsizeof(agg.gap_stats.__dict__))
+
+    patterns = agg.norm_patterns.patterns
+    pattern_size = sys.getsizeof(agg.norm_patterns) + sys.getsizeof(patterns)
+    for normalized, entry in patterns.items():
+        pattern_size += sys.getsizeof(normalized) + sys.getsizeof(entry) + sys.getsizeof(entry.sample)
+    return key_size, agg_size, pattern_size
+
+
+def agg_size(key: Hashable, agg: MessageAgg) -> int:
+    return sum(agg_size_breakdown(key, agg))
+
+
+@dataclass
+class AggregatorMemory:
+    keys: int = 0
+    key_bytes: float = 0.0
+    agg_bytes: float = 0.0
+    pattern_bytes: float = 0.0
+    # Aggregates on disk, not included in keys or the sizes
+    spilled_records: int = 0
+
+    @property
+    def bytes_per_key(self) -> float:
+        return self.key_bytes + self.agg_bytes + self.pattern_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        return int(self.keys * self.bytes_per_key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'keys': self.keys,
+            'key_bytes': self.key_bytes,
+            'agg_bytes': self.agg_bytes,
+            'pattern_bytes': self.pattern_bytes,
+            'bytes_per_key': self.bytes_per_key,
+            'total_bytes': self.total_bytes,
+            'spilled_records': self.spilled_records,
+        }
+
+
+def measure_aggregator(aggregator: KeyedAggregator, sample_keys: int = MEASURE_SAMPLE_KEYS) -> AggregatorMemory:
+    """Estimate the memory of the aggregates an aggregator holds in memory from a sample of its keys."""
+    data = aggregator.data
+    # Only spilling aggregators have aggregates on disk
+    memory = AggregatorMemory(keys=len(data), spilled_records=getattr(aggregator, 'spilled_records', 0))
+    if not data:
+        return memory
+
+    step = max(1, len(data) // sample_keys)
+    measured = 0
+    for key, agg in islice(data.items(), 0, None, step):
+        key_size, message_size, pattern_size = agg_size_breakdown(key, agg)
+        memory.key_bytes += key_size
+        memory.agg_bytes += message_size
+        memory.pattern_bytes += pattern_size
+        measured += 1
+
+    memory.key_bytes /= measured
+    memory.agg_bytes /= measured
+    memory.pattern_bytes /= measured
+    return memory
@@ -51,6 +51,32 @@ class TopKNormalizedPatterns:
     def top_items(self, n: int = 10) -> List[Tuple[str, PatternEntry]]:
         return sorted(self.patterns.items(), key=lambda kv: kv[1].count, reverse=True)[:n]
 
+    def merge(self, other: TopKNormalizedPatterns) -> None:
+        """
+        Merge another summary into this one.
+
+        Counts for shared patterns are summed and the k heaviest patterns are kept.
+        The first-seen sample wins, so this summary's samples take precedence.
+        """
+        p = self.patterns
+        for normalized, entry in other.patterns.items():
+            mine = p.get(normalized)
+            if mine is not None:
+                mine.count += entry.count
+            else:
+                p[normalized] = PatternEntry(count=entry.count, sample=entry.sample)
+
+        if len(p) > self.k:
+            self.patterns = dict(self.top_items(self.k))
+
+    def to_state(self) -> tuple:
+        return tuple((normalized, e.count, e.sample) for normalized, e in self.patterns.items())
+
+    def merge_state(self, state: tuple) -> None:
+        other = TopKNormalizedPatterns(k=self.k)
+        other.patterns = {normalized: PatternEntry(count=count, sample=sample) for normalized, count, sample in state}
+        self.merge(other)
+
 
 @dataclass
 class RunningStats:
@@ -73,6 +99,23 @@ class RunningStats:
         self.mean = mean
         self.M2 = M2
 
+    def merge(self, other: RunningStats) -> None:
+        # Parallel variant of Welford (Chan et al.)
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.M2 = other.n, other.mean, other.M2
+            return
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.M2 += other.M2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    def to_state(self) -> Tuple[int, float, float]:
+        return self.n, self.mean, self.M2
+
     def std(self) -> float:
         return sqrt(self.M2 / (self.n - 1)) if self.n > 1 else 0.0
 
@@ -94,6 +137,7 @@ class MessageAgg:
     responses: int = 0
 
     # Burstiness / timing
+    first_date: Optional[datetime] = None
     last_date: Optional[datetime] = None
     gap_stats: RunningStats = field(default_factory=RunningStats)
 
@@ -135,6 +179,8 @@ class MessageAgg:
                 delta = (msg_date - self.last_date).total_seconds()
                 if delta >= 0:
                     self.gap_stats.add(float(delta))
+            else:
+                self.first_date = msg_date
             self.last_date = msg_date
 
         # Delivery stats recipient expanded
@@ -143,3 +189,68 @@ class MessageAgg:
 
         # Subject patterns per message
         self.norm_patterns.add(normalized_subject or "", subject or "")
+
+    def merge(self, other: MessageAgg) -> None:
+        """
+        Merge an aggregate built from a different slice of the input into this one.
+
+        Totals are exact. The gap between the two slices is only counted when their
+        date ranges do not overlap (e.g. runs split by date range).
+        """
+        self.messages += other.messages
+        self.total_bytes_original += other.total_bytes_original
+        self.total_recipients += other.total_recipients
+        self.total_recipients_bytes += other.total_recipients_bytes
+        self.responses += other.responses
+
+        self.size_stats.merge(other.size_stats)
+        self.gap_stats.merge(other.gap_stats)
+
+        if other.last_date is not None:
+            if self.last_date is None:
+                self.first_date = other.first_date
+                self.last_date = other.last_date
+            elif self.last_date <= other.first_date:
+                self.gap_stats.add(float((other.first_date - self.last_date).total_seconds()))
+                self.last_date = other.last_date
+            elif other.last_date <= self.first_date:
+                self.gap_stats.add(float((self.first_date - other.last_date).total_seconds()))
+                self.first_date = other.first_date
+            else:
+                self.first_date = min(self.first_date, other.first_date)
+                self.last_date = max(self.last_date, other.last_date)
+
+        self.norm_patterns.merge(other.norm_patterns)
+
+    def to_state(self) -> tuple:
+        return (
+            self.messages,
+            self.total_bytes_original,
+            self.total_recipients,
+            self.total_recipients_bytes,
+            self.responses,
+            self.first_date,
+            self.last_date,
+            self.gap_stats.to_state(),
+            self.size_stats.to_state(),
+            self.norm_patterns.to_state(),
+        )
+
+    def merge_state(self, state: tuple) -> None:
+        (messages, total_bytes_original, total_recipients, total_recipients_bytes, responses,
+         first_date, last_date, gap_stats, size_stats, patterns) = state
+
+        other = MessageAgg(
+            messages=messages,
+            total_bytes_original=total_bytes_original,
+            total_recipients=total_recipients,
+            total_recipients_bytes=total_recipients_bytes,
+            responses=responses,
+            first_date=first_date,
+            last_date=last_date,
+            gap_stats=RunningStats(*gap_stats),
+            size_stats=RunningStats(*size_stats),
+            norm_patterns=TopKNormalizedPatterns(k=self.norm_patterns.k),
+        )
+        other.norm_patterns.merge_state(patterns)
+        self.merge(other)
@@ -1,5 +1,10 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Batched metrics are optional, the per key code is used without them
+    np = None
 
 from .message import MessageAgg, PatternEntry
 from .scoring import normalized_entropy
@@ -77,3 +82,104 @@ def compute_message_agg_metrics(
         avg_rcpts=avg_rcpts,
         avg_ext_rcpts=avg_ext_rcpts,
     )
+
+
+def _pattern_stats(aggs: Sequence[MessageAgg], report_top_n: int):
+    """
+    Top-N mass, top-3 mass, top-1 ratio and normalized entropy of every aggregate at once.
+
+    The pattern counts of all keys are packed into one flat array, key i owning
+    flat[offsets[i]:offsets[i + 1]]. Sorting by (key, -count) ranks the counts within each
+    key, and the per key sums are bincounts over the key ids.
+    """
+    n = len(aggs)
+    lengths = np.fromiter((len(agg.norm_patterns.patterns) for agg in aggs), dtype=np.int64, count=n)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.fromiter((e.count for agg in aggs for e in agg.norm_patterns.patterns.values()),
+                       dtype=np.float64, count=int(offsets[-1]))
+    seg = np.repeat(np.arange(n), lengths)
+
+    ranked = flat[np.lexsort((-flat, seg))]
+    rank = np.arange(len(flat)) - offsets[seg]
+
+    total = np.fromiter((agg.messages for agg in aggs), dtype=np.float64, count=n)
+    has_total = total > 0
+    safe_total = np.where(has_total, total, 1.0)
+
+    def per_key(weights):
+        # Without any patterns bincount returns integers
+        return np.bincount(seg, weights=weights, minlength=n).astype(np.float64, copy=False)
+
+    top_mass = per_key(np.where(rank < report_top_n, ranked, 0.0)) / safe_total
+    top3_mass = per_key(np.where(rank < 3, ranked, 0.0)) / safe_total
+    top1_ratio = per_key(np.where(rank == 0, ranked, 0.0)) / safe_total
+
+    # normalized_entropy, the untracked tail is one more outcome
+    tracked = flat > 0
+    p = np.where(tracked, flat / safe_total[seg], 1.0)
+    h = -per_key(np.where(tracked, p * np.log2(p), 0.0))
+    outcomes = per_key(tracked.astype(np.float64))
+
+    tail = total - per_key(flat)
+    has_tail = tail > 0
+    p_tail = np.where(has_tail, tail / safe_total, 1.0)
+    h -= np.where(has_tail, p_tail * np.log2(p_tail), 0.0)
+    outcomes += has_tail
+
+    h_max = np.log2(np.maximum(outcomes, 2.0))
+    entropy = np.where(has_total & (outcomes > 1), h / h_max, 0.0)
+
+    zero = ~has_total
+    top_mass[zero] = top3_mass[zero] = top1_ratio[zero] = 0.0
+    return top_mass, top3_mass, top1_ratio, entropy
+
+
+def compute_message_agg_metrics_batch(
+        aggs: Sequence[MessageAgg],
+        *,
+        days: float,
+        report_top_n: int,
+        include_top_items: bool = True,
+) -> List[MessageAggMetrics]:
+    """
+    compute_message_agg_metrics for many aggregates at once.
+
+    With NumPy installed the pattern based metrics (top masses and entropy) are computed
+    with segment operations over every key's pattern counts, the results match the per
+    key code to within floating point rounding. Without it every aggregate is handled
+    by compute_message_agg_metrics. Sorting the patterns of each key for top_items is
+    skipped when include_top_items is False, top_items is then empty.
+    """
+    if np is None or not aggs:
+        return [compute_message_agg_metrics(agg, days=days, report_top_n=report_top_n) for agg in aggs]
+
+    top_mass, top3_mass, top1_ratio, entropy = _pattern_stats(aggs, report_top_n)
+
+    results = []
+    for agg, tm, t3, t1, ent in zip(aggs, top_mass.tolist(), top3_mass.tolist(), top1_ratio.tolist(),
+                                    entropy.tolist()):
+        total_messages = agg.messages
+        total_bytes = agg.total_bytes_original
+        total_recipients = agg.total_recipients
+        avg_rcpts = (total_recipients / total_messages) if total_messages > 0 else 0.0
+
+        results.append(MessageAggMetrics(
+            total_messages=total_messages,
+            messages_per_day=(total_messages / days) if days > 0 else 0.0,
+            total_bytes=total_bytes,
+            avg_size=(total_bytes / total_messages) if total_messages > 0 else 0.0,
+            total_recipients=total_recipients,
+            delivery_bytes=agg.total_recipients_bytes,
+            reply_ratio=(agg.responses / total_messages) if total_messages > 0 else 0.0,
+            top_items=agg.norm_patterns.top_items(report_top_n) if include_top_items else [],
+            top_mass=tm,
+            top3_mass=t3,
+            top1_ratio=t1,
+            entropy=ent,
+            gap_mean=agg.gap_stats.mean if agg.gap_stats.n > 0 else 0.0,
+            gap_cv=agg.gap_stats.cv() if agg.gap_stats.n > 1 else 0.0,
+            avg_rcpts=avg_rcpts,
+            avg_ext_rcpts=avg_rcpts,
+        ))
+    return results
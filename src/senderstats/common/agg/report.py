@@ -1,13 +1,87 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, List, Tuple, TypeVar, Generic, Callable
+import heapq
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, TypeVar, Generic, Callable
 
 from senderstats.common.agg.message import MessageAgg
-from senderstats.common.agg.metrics import compute_message_agg_metrics
-from senderstats.common.agg.scoring import compute_sender_scores_and_label
+from senderstats.common.agg.metrics import MessageAggMetrics, compute_message_agg_metrics_batch
+from senderstats.common.agg.batch_scoring import compute_sender_scores_batch
+from senderstats.common.agg.scoring import SenderScore
+from senderstats.common.agg.sketch import SketchAggregator
+from senderstats.common.defaults import SORT_METRICS
 
 K = TypeVar("K")
 
+# Keys scored together, large enough for the batched scoring to pay off
+SCORE_BATCH_SIZE = 4096
+
+_SORT_KEYS: dict = {
+    "messages": lambda agg: agg.messages,
+    "bytes": lambda agg: agg.total_bytes_original,
+    "recipients": lambda agg: agg.total_recipients,
+    "delivery-bytes": lambda agg: agg.total_recipients_bytes,
+    "avg-size": lambda agg: agg.total_bytes_original / agg.messages if agg.messages else 0.0,
+}
+
+
+@dataclass(frozen=True)
+class RowSelection:
+    """
+    Which keys a report lists and in which order.
+
+    Keys that are not selected are folded into a single "Other" row so the sheet
+    totals still match the input. Without any option rows are written in first-seen
+    order, which is how reports were always written.
+    """
+    sort_by: Optional[str] = None
+    top: Optional[int] = None
+    min_messages: int = 0
+
+    def __post_init__(self):
+        if self.sort_by is not None and self.sort_by not in SORT_METRICS:
+            raise ValueError(f"Unsupported sort metric: {self.sort_by}")
+        if self.top is not None and self.top < 0:
+            raise ValueError("top must not be negative")
+
+    @property
+    def is_active(self) -> bool:
+        return self.sort_by is not None or self.top is not None or self.min_messages > 0
+
+    @property
+    def sort_metric(self) -> Optional[str]:
+        # Keeping the top N only makes sense in some order, volume is the natural one
+        if self.sort_by is None and self.top is not None:
+            return "messages"
+        return self.sort_by
+
+
+class _OtherTotals:
+    __slots__ = ("keys", "evictions", "messages", "total_bytes", "total_recipients", "delivery_bytes")
+
+    def __init__(self):
+        self.keys = 0
+        self.evictions = 0
+        self.messages = 0
+        self.total_bytes = 0
+        self.total_recipients = 0
+        self.delivery_bytes = 0
+
+    def add(self, agg: MessageAgg) -> None:
+        self.keys += 1
+        self.__add_totals(agg)
+
+    def add_evicted(self, sketch: SketchAggregator) -> None:
+        self.evictions += sketch.evictions
+        self.__add_totals(sketch.evicted)
+
+    def __add_totals(self, agg: MessageAgg) -> None:
+        self.messages += agg.messages
+        self.total_bytes += agg.total_bytes_original
+        self.total_recipients += agg.total_recipients
+        self.delivery_bytes += agg.total_recipients_bytes
+
 
 class KeyedAggReport(Generic[K]):
     def __init__(
@@ -20,6 +94,7 @@ class KeyedAggReport(Generic[K]):
             sample_subject: bool,
             with_probability: bool,  # NEW
             debug: bool,
+            row_selection: Optional[RowSelection] = None,
     ):
         self._title = title
         self._key_columns = key_columns
@@ -28,13 +103,115 @@ class KeyedAggReport(Generic[K]):
         self._sample_subject = sample_subject
         self._with_probability = with_probability
         self._debug = debug
+        self._row_selection = row_selection or RowSelection()
+
+        if self._row_selection.sort_metric == "score" and not with_probability:
+            raise ValueError("Sorting by score requires probability scoring")
+
+    def _score_batch(
+            self,
+            aggs: List[MessageAgg],
+            days: float,
+    ) -> List[Tuple[MessageAggMetrics, Optional[SenderScore]]]:
+        # Sample subjects are the only use of the sorted patterns
+        metrics = compute_message_agg_metrics_batch(aggs, days=days, report_top_n=self._report_top_n,
+                                                    include_top_items=self._sample_subject)
+
+        # Only compute probabilistic scoring when enabled
+        if not self._with_probability:
+            return [(m, None) for m in metrics]
+
+        scores = compute_sender_scores_batch(
+            total_messages=[m.total_messages for m in metrics],
+            messages_per_day=[m.messages_per_day for m in metrics],
+            reply_ratio=[m.reply_ratio for m in metrics],
+            top_mass=[m.top_mass for m in metrics],
+            top3_mass=[m.top3_mass for m in metrics],
+            top1_ratio=[m.top1_ratio for m in metrics],
+            ent=[m.entropy for m in metrics],
+        )
+        return list(zip(metrics, scores))
+
+    def _scored(
+            self,
+            items: Iterable[Tuple[K, MessageAgg]],
+            days: float,
+    ) -> Iterator[Tuple[K, MessageAgg, MessageAggMetrics, Optional[SenderScore]]]:
+        # Keys are scored SCORE_BATCH_SIZE at a time, which bounds the memory of the batch
+        it = iter(items)
+        while True:
+            chunk = list(islice(it, SCORE_BATCH_SIZE))
+            if not chunk:
+                return
+            for (key, agg), (m, s) in zip(chunk, self._score_batch([agg for _, agg in chunk], days)):
+                yield key, agg, m, s
+
+    def _select(
+            self,
+            items: Iterable[Tuple[K, MessageAgg]],
+            days: float,
+            other: _OtherTotals,
+    ) -> Iterator[Tuple[K, MessageAggMetrics, Optional[SenderScore]]]:
+        selection = self._row_selection
+        if not selection.is_active:
+            for key, _, m, s in self._scored(items, days):
+                yield key, m, s
+            return
+
+        metric = selection.sort_metric
+        top = selection.top
+        min_messages = selection.min_messages
+
+        def kept() -> Iterator[Tuple[K, MessageAgg]]:
+            for key, agg in items:
+                if agg.messages < min_messages:
+                    other.add(agg)
+                else:
+                    yield key, agg
+
+        if metric == "score":
+            candidates = ((s.sort_score, key, agg, (m, s)) for key, agg, m, s in self._scored(kept(), days))
+        else:
+            sort_key = _SORT_KEYS.get(metric)
+            candidates = ((sort_key(agg) if sort_key else 0, key, agg, None) for key, agg in kept())
+
+        # Heap entries are (sort value, -arrival, key, agg, scored). The arrival index
+        # breaks ties in first-seen order and keeps keys and aggregates out of the comparison.
+        heap: list = []
+        for arrival, (value, key, agg, scored) in enumerate(candidates):
+            entry = (value, -arrival, key, agg, scored)
+            if top is None:
+                heap.append(entry)
+            elif len(heap) < top:
+                heapq.heappush(heap, entry)
+            else:
+                evicted = heapq.heappushpop(heap, entry)
+                other.add(evicted[3])
+
+        if metric is None:
+            # Threshold only, keep first-seen order
+            heap.sort(key=lambda e: -e[1])
+        else:
+            heap.sort(reverse=True)
+
+        if metric == "score":
+            for _, _, key, _, (m, s) in heap:
+                yield key, m, s
+        else:
+            for key, _, m, s in self._scored(((e[2], e[3]) for e in heap), days):
+                yield key, m, s
 
     def report(
             self,
             items: Iterable[Tuple[K, MessageAgg]],
             *,
             days: float,
+            sketch: Optional[SketchAggregator] = None,
     ) -> Iterator[Tuple[str, Iterator[list]]]:
+        """
+        :param sketch: The aggregator of items when sketch mode is used. Rows then get an upper bound
+            of their messages and the keys it evicted are reported in the Other row.
+        """
 
         def get_report_name() -> str:
             return self._title
@@ -50,6 +227,9 @@ class KeyedAggReport(Generic[K]):
                 "Delivery Bytes",
             ]
 
+            if sketch is not None:
+                headers.append("Max Messages")
+
             # Only include these when probability is enabled
             if self._with_probability:
                 headers.extend(["Autonomy Score (%)", "Label"])
@@ -80,26 +260,8 @@ class KeyedAggReport(Generic[K]):
 
             yield headers
 
-            for key, agg in items:
-                m = compute_message_agg_metrics(
-                    agg,
-                    days=days,
-                    report_top_n=self._report_top_n,
-                )
-
-                # Only compute probabilistic scoring when enabled
-                s = None
-                if self._with_probability:
-                    s = compute_sender_scores_and_label(
-                        total_messages=m.total_messages,
-                        messages_per_day=m.messages_per_day,
-                        reply_ratio=m.reply_ratio,
-                        top_mass=m.top_mass,
-                        top3_mass=m.top3_mass,
-                        top1_ratio=m.top1_ratio,
-                        ent=m.entropy,
-                    )
-
+            other = _OtherTotals()
+            for key, m, s in self._select(items, days, other):
                 row: List[object] = []
                 row.extend(self._key_to_cells(key))
                 row.extend([
@@ -111,6 +273,9 @@ class KeyedAggReport(Generic[K]):
                     m.delivery_bytes,
                 ])
 
+                if sketch is not None:
+                    row.append(sketch.messages_upper_bound(key))
+
                 if self._with_probability:
                     row.extend([round(s.sort_score * 100, 2), s.label])
 
@@ -145,4 +310,38 @@ class KeyedAggReport(Generic[K]):
 
                 yield row
 
+            if sketch is not None and sketch.evictions:
+                other.add_evicted(sketch)
+
+            if other.keys or other.evictions:
+                yield self._other_row(other, len(headers))
+
         yield get_report_name(), get_report_data()
+
+    def _other_row(self, other: _OtherTotals, width: int) -> List[object]:
+        # Cells without a value are None. Messages Per Day is left blank: the summary sheet counts
+        # rows at or above a per-day threshold and the folded keys must not count as one large sender.
+        if other.evictions:
+            label = f"Other ({other.keys} keys, {other.evictions} evictions)"
+        else:
+            label = f"Other ({other.keys} keys)"
+        row: List[object] = [label]
+        row.extend([None] * (len(self._key_columns) - 1))
+        row.extend([
+            other.messages,
+            (other.total_bytes / other.messages) if other.messages > 0 else 0.0,
+            None,
+            other.total_bytes,
+            other.total_recipients,
+            other.delivery_bytes,
+        ])
+        row.extend([None] * (width - len(row)))
+        return row
+
+
+def sketch_bound_note(sketch: SketchAggregator) -> str:
+    """The Count-Min guarantee behind the Max Messages column of a report written with sketch."""
+    cms = sketch.sketch
+    return (f"Max Messages overcounts by at most {cms.overcount_bound():,} messages (e x N / width) with "
+            f"probability {1 - cms.delta:.1%} (1 - e^-depth); Count-Min sketch width {cms.width:,}, "
+            f"depth {cms.depth}, N = {cms.total:,} messages")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass, field
+from math import ceil, e, exp
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from zlib import crc32
+
+from .aggregator import KeyedAggregator, key_bytes
+from .message import MessageAgg
+from .spill import MemoryBudget, SpillingAggregator
+
+K = TypeVar("K", bound=Hashable)
+
+SKETCH_DEPTH = 4
+MIN_SKETCH_WIDTH = 1 << 16
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch of message counts per key.
+
+    estimate() never undercounts. With probability 1 - delta it overcounts by at most
+    epsilon * total, where epsilon = e / width and delta = exp(-depth).
+    """
+
+    def __init__(self, width: int, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.__counters = array("q", bytes(8 * width * depth))
+
+    @property
+    def epsilon(self) -> float:
+        return e / self.width
+
+    @property
+    def delta(self) -> float:
+        return exp(-self.depth)
+
+    def overcount_bound(self) -> int:
+        """Overcount of any single estimate, exceeded with probability at most delta."""
+        return ceil(self.epsilon * self.total)
+
+    def __cells(self, key: Hashable):
+        # Double hashing, row i uses h1 + i * h2
+        data = key_bytes(key)
+        h1 = crc32(data)
+        h2 = crc32(data, 0x9E3779B9) | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """
+        Count key and return its new estimate.
+
+        Conservative update: counters are only raised as far as the new estimate, which
+        keeps the overcount of rarely seen keys much lower than plain increments.
+        """
+        counters = self.__counters
+        cells = self.__cells(key)
+        estimate = min(counters[cell] for cell in cells) + count
+        for cell in cells:
+            if counters[cell] < estimate:
+                counters[cell] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        counters = self.__counters
+        return min(counters[cell] for cell in self.__cells(key))
+
+    def merge(self, other: CountMinSketch) -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Count-Min sketches of different sizes cannot be merged")
+        counters = self.__counters
+        for i, value in enumerate(other.__counters):
+            if value:
+                counters[i] += value
+        self.total += other.total
+
+    def to_state(self) -> Tuple[int, int, int, bytes]:
+        return self.width, self.depth, self.total, self.__counters.tobytes()
+
+    @staticmethod
+    def from_state(state: Tuple[int, int, int, bytes]) -> CountMinSketch:
+        width, depth, total, counters = state
+        sketch = CountMinSketch(width, depth)
+        sketch.total = total
+        sketch.__counters = array("q", counters)
+        return sketch
+
+
+def sketch_width(max_keys: int) -> int:
+    # Plenty of columns per tracked key keeps the estimates of the heavy hitters tight
+    width = MIN_SKETCH_WIDTH
+    while width < 16 * max_keys:
+        width <<= 1
+    return width
+
+
+@dataclass
+class SketchAggregator(KeyedAggregator[K, MessageAgg]):
+    """
+    KeyedAggregator with a fixed memory budget.
+
+    Exact MessageAgg state is kept per key and every message is also counted in a Count-Min
+    sketch. Once the table holds twice max_keys keys it is pruned in one batch back to the
+    max_keys keys with the highest Count-Min estimate, the totals of the pruned keys are folded
+    into the evicted aggregate. A pruned key that comes back
+    is tracked from that point on, messages_upper_bound() bounds what it sent before.
+
+    evictions counts every time a key was pruned, a key pruned twice counts twice. Counting
+    distinct keys would take memory for every key ever seen, which the budget exists to avoid.
+
+    Totals over data and evicted always match the input exactly.
+    """
+    max_keys: int = 100000
+    sketch: Optional[CountMinSketch] = None
+    evicted: MessageAgg = field(default_factory=MessageAgg)
+    evictions: int = 0
+
+    def __post_init__(self):
+        if self.max_keys <= 0:
+            raise ValueError("max_keys must be greater than 0")
+        if self.sketch is None:
+            self.sketch = CountMinSketch(sketch_width(self.max_keys))
+
+    def get(self, key: K) -> MessageAgg:
+        # Called once per message, so this is where messages are counted in the sketch
+        self.sketch.add(key)
+        agg = self.data.get(key)
+        if agg is None:
+            if len(self.data) >= 2 * self.max_keys:
+                self.__prune()
+            agg = self.agg_factory()
+            self.data[key] = agg
+        return agg
+
+    def messages_upper_bound(self, key: K) -> int:
+        """Upper bound of the messages key sent, including the ones sent while it was not tracked."""
+        return max(self.sketch.estimate(key), self.data[key].messages)
+
+    def __prune(self) -> None:
+        estimate = self.sketch.estimate
+        keep = heapq.nlargest(self.max_keys, self.data, key=estimate)
+        kept = {key: self.data[key] for key in keep}
+        evicted = self.evicted
+        for key, agg in self.data.items():
+            if key not in kept:
+                _fold_totals(evicted, agg)
+                self.evictions += 1
+        self.data = kept
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            'keys': super().get_state(),
+            'evicted': self.evicted.to_state(),
+            'evictions': self.evictions,
+            'sketch': self.sketch.to_state(),
+        }
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        get = self.data.get
+        for key, agg_state in state['keys']:
+            agg = get(key)
+            if agg is None:
+                agg = self.agg_factory()
+                self.data[key] = agg
+            agg.merge_state(agg_state)
+        self.evicted.merge_state(state['evicted'])
+        self.evictions += state['evictions']
+        self.sketch.merge(CountMinSketch.from_state(state['sketch']))
+        if len(self.data) > self.max_keys:
+            self.__prune()
+
+
+def _fold_totals(target: MessageAgg, agg: MessageAgg) -> None:
+    # Only totals are reported for evicted keys, merging patterns and timings would be wasted work
+    target.messages += agg.messages
+    target.total_bytes_original += agg.total_bytes_original
+    target.total_recipients += agg.total_recipients
+    target.total_recipients_bytes += agg.total_recipients_bytes
+    target.responses += agg.responses
+
+
+def create_aggregator(agg_factory: Callable[[], MessageAgg], sketch_keys: Optional[int] = None,
+                      memory_budget: Optional[MemoryBudget] = None) -> KeyedAggregator:
+    """
+    Exact aggregation, sketch backed aggregation keeping sketch_keys keys when given, or exact
+    aggregation spilling to disk when a memory budget is given.
+    """
+    if sketch_keys:
+        return SketchAggregator(agg_factory=agg_factory, max_keys=sketch_keys)
+    if memory_budget is not None:
+        return SpillingAggregator(agg_factory=agg_factory, budget=memory_budget)
+    return KeyedAggregator(agg_factory=agg_factory)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple, TypeVar
+from zlib import crc32
+
+from .aggregator import KeyedAggregator, key_bytes
+from .memory import agg_size
+from .message import MessageAgg
+
+K = TypeVar("K", bound=Hashable)
+
+SPILL_PARTITIONS = 16
+
+# New keys between memory checks, and how many recent aggregates are measured per check
+_CHECK_KEYS = 4096
+_SAMPLE_KEYS = 64
+
+
+class MemoryBudget:
+    """
+    Approximate memory budget shared by the aggregators of a run.
+
+    Aggregators register with the budget and call check() as they grow. The size of an
+    aggregator is estimated from its key count and the measured size of its most recent
+    aggregates. While the total is over the budget the largest aggregator is spilled to disk.
+    """
+
+    def __init__(self, max_bytes: int, spill_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.__spill_dir = spill_dir
+        self.__temp_dir: Optional[tempfile.TemporaryDirectory] = None
+        self.__aggregators: List[SpillingAggregator] = []
+        self.spills = 0
+        self.spilled_bytes = 0
+        self.merge_seconds = 0.0
+
+    def register(self, aggregator: SpillingAggregator) -> str:
+        """Register an aggregator and return the file name prefix of its partitions."""
+        self.__aggregators.append(aggregator)
+        return f"agg{len(self.__aggregators)}"
+
+    def partition_path(self, prefix: str, partition: int) -> str:
+        if self.__temp_dir is None:
+            self.__temp_dir = tempfile.TemporaryDirectory(prefix="senderstats-spill-", dir=self.__spill_dir)
+        return os.path.join(self.__temp_dir.name, f"{prefix}_{partition:02d}.spill")
+
+    def check(self) -> None:
+        sizes = [(a.estimated_bytes(), a) for a in self.__aggregators]
+        total = sum(size for size, _ in sizes)
+        for size, aggregator in sorted(sizes, key=lambda s: s[0], reverse=True):
+            if total <= self.max_bytes:
+                break
+            self.spilled_bytes += aggregator.spill()
+            self.spills += 1
+            total -= size
+
+    def display_summary(self):
+        print()
+        print(f"Aggregates spilled to disk: {self.spilled_bytes / (1024 * 1024):.1f} MB in {self.spills} spill(s)")
+        print(f"Spilled partitions merged in {self.merge_seconds:.4f} seconds")
+
+    def cleanup(self) -> None:
+        if self.__temp_dir is not None:
+            self.__temp_dir.cleanup()
+            self.__temp_dir = None
+
+
+@dataclass
+class SpillingAggregator(KeyedAggregator[K, MessageAgg]):
+    """
+    KeyedAggregator that moves its aggregates to disk when the memory budget is exceeded.
+
+    Spilled aggregates are hash partitioned into partition files, a key always lands in
+    the same partition. items() reads and merges one partition at a time, so only one
+    partition has to fit in memory. Totals are exact, subject patterns and gap statistics
+    are merged like snapshots are. Once spilled, keys are reported partition by partition
+    instead of in first-seen order.
+
+    spilled_records counts the aggregates written to disk, a key spilled more than once
+    counts once per spill.
+    """
+    budget: Optional[MemoryBudget] = None
+    partitions: int = SPILL_PARTITIONS
+    spilled_records: int = field(default=0, init=False)
+    __prefix: str = field(default="", init=False, repr=False)
+    __new_keys: int = field(default=0, init=False, repr=False)
+    __spilled: bool = field(default=False, init=False, repr=False)
+    __key_bytes: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.budget is None:
+            raise ValueError("SpillingAggregator requires a memory budget")
+        self.__prefix = self.budget.register(self)
+
+    def get(self, key: K) -> MessageAgg:
+        agg = self.data.get(key)
+        if agg is None:
+            # Check before inserting, the caller has to update the aggregate it gets back in memory
+            self.__new_keys += 1
+            if self.__new_keys >= _CHECK_KEYS:
+                self.__new_keys = 0
+                self.budget.check()
+            agg = self.agg_factory()
+            self.data[key] = agg
+        return agg
+
+    def estimated_bytes(self) -> int:
+        data = self.data
+        if not data:
+            return 0
+        sample = list(islice(reversed(data.items()), _SAMPLE_KEYS))
+        measured = sum(agg_size(key, agg) for key, agg in sample) / len(sample)
+        # Older aggregates have seen more messages than recent ones, never shrink the estimate
+        self.__key_bytes = max(self.__key_bytes, measured)
+        return int(len(data) * self.__key_bytes)
+
+    def __partition(self, key: K) -> int:
+        return crc32(key_bytes(key)) % self.partitions
+
+    def spill(self) -> int:
+        """Append every in-memory aggregate to its partition file and return the bytes written."""
+        buckets: List[List[Tuple[K, Any]]] = [[] for _ in range(self.partitions)]
+        partition = self.__partition
+        for key, agg in self.data.items():
+            buckets[partition(key)].append((key, agg.to_state()))
+        self.spilled_records += len(self.data)
+        self.data = {}
+
+        written = 0
+        for p, bucket in enumerate(buckets):
+            if bucket:
+                with open(self.budget.partition_path(self.__prefix, p), "ab") as f:
+                    start = f.tell()
+                    pickle.dump(bucket, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    written += f.tell() - start
+        self.__spilled = True
+        return written
+
+    def __read_partition(self, p: int) -> Dict[K, MessageAgg]:
+        merged: Dict[K, MessageAgg] = {}
+        path = self.budget.partition_path(self.__prefix, p)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                while True:
+                    try:
+                        bucket = pickle.load(f)
+                    except EOFError:
+                        break
+                    for key, state in bucket:
+                        agg = merged.get(key)
+                        if agg is None:
+                            agg = self.agg_factory()
+                            merged[key] = agg
+                        agg.merge_state(state)
+        return merged
+
+    def items(self) -> Iterator[Tuple[K, MessageAgg]]:
+        if not self.__spilled:
+            return self.data.items()
+        return self.__merged_items()
+
+    def __merged_items(self) -> Iterator[Tuple[K, MessageAgg]]:
+        in_memory: List[List[K]] = [[] for _ in range(self.partitions)]
+        partition = self.__partition
+        for key in self.data:
+            in_memory[partition(key)].append(key)
+
+        for p in range(self.partitions):
+            start = time.perf_counter()
+            merged = self.__read_partition(p)
+            # Spilled state is older, merging it first keeps the first-seen subject samples
+            for key in in_memory[p]:
+                agg = merged.get(key)
+                if agg is None:
+                    merged[key] = self.data[key]
+                else:
+                    agg.merge(self.data[key])
+            self.budget.merge_seconds += time.perf_counter() - start
+            yield from merged.items()
+
+    def get_state(self) -> List[Tuple[K, Any]]:
+        # Reads every spilled partition back into one list, which is why --max-memory can not be
+        # combined with the options that save state
+        return [(key, agg.to_state()) for key, agg in self.items()]
+
@@ -1,5 +1,9 @@
 DEFAULT_DOMAIN_EXCLUSIONS = ['ppops.net', 'pphosted.com', 'knowledgefront.com']
 DEFAULT_THRESHOLD = 100
+DEFAULT_STAGE_TIMING_SAMPLE = 64
+
+# Metrics report rows can be sorted by, all but score are read straight from the aggregate
+SORT_METRICS = ('messages', 'bytes', 'recipients', 'delivery-bytes', 'avg-size', 'score')
 
 DEFAULT_MFROM_FIELD = 'Sender'
 DEFAULT_HFROM_FIELD = 'Header_From'
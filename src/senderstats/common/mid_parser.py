@@ -3,6 +3,13 @@ from __future__ import annotations
 from senderstats.common.address_parser import parse_email_details_tuple
 from senderstats.common.tld_parser import TLDParser
 
+# Distinct RHS hosts kept by MIDParser, the cache is cleared when it is full
+HOST_CACHE_SIZE = 16384
+
+# Characters the address parser accepts in the local part and in the domain
+_LOCAL_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!#$%&'*+/=?^_`{|}~.-"
+_HOST_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789[]_.-"
+
 
 class MIDParser:
     """
@@ -10,12 +17,18 @@ class MIDParser:
 
     Extracts RHS host from Message-ID-like values using the address parser,
     normalizes it, and splits it using the Public Suffix List.
+
+    Message-ID hosts repeat heavily, so split results are cached per RHS host.
+    The common <local@host> shape is taken apart by hand, other values go
+    through the address parser.
     """
 
-    __slots__ = ("tld",)
+    __slots__ = ("tld", "_hosts", "_cache_size")
 
-    def __init__(self, tld: TLDParser):
+    def __init__(self, tld: TLDParser, cache_size: int = HOST_CACHE_SIZE):
         self.tld = tld
+        self._hosts: dict[str, tuple[str, str, str, str]] = {}
+        self._cache_size = cache_size
 
     @staticmethod
     def is_ipv4_fast(s: str) -> bool:
@@ -52,15 +65,41 @@ class MIDParser:
         return dots == 3 and digits != 0
 
     def parse(self, mid: str) -> tuple[str, str, str, str]:
+        # <local@host>: the domain the address parser finds is whatever follows the last '@',
+        # as long as a local part character precedes it and the host is made of host characters
+        if mid[:1] == '<' and mid[-1:] == '>' and '\n' not in mid:
+            at = mid.rfind('@')
+            if at > 1 and mid[at - 1] in _LOCAL_CHARS:
+                domain = mid[at + 1:-1]
+                result = self._hosts.get(domain)
+                if result is not None:
+                    return result
+                if domain and not domain.strip(_HOST_CHARS):
+                    return self.__split_cached(domain)
+
         _, _, domain = parse_email_details_tuple(mid)
         if not domain:
             return "", "", "", ""
 
+        result = self._hosts.get(domain)
+        if result is not None:
+            return result
+        return self.__split_cached(domain)
+
+    def __split_cached(self, domain: str) -> tuple[str, str, str, str]:
+        hosts = self._hosts
+        if len(hosts) >= self._cache_size:
+            hosts.clear()
+        result = hosts[domain] = self.__split(domain)
+        return result
+
+    def __split(self, domain: str) -> tuple[str, str, str, str]:
         if ':' in domain or '[' in domain or ']' in domain or '.' not in domain or self.is_ipv4_fast(domain):
             return domain, "", "", ""
 
         if domain[-1] == '.':
             domain = domain.rstrip('.')
 
-        hn, sub, registrable, public_suffix = self.tld.split_host_extended_unchecked(domain)
+        # Usually lowercase already, the CSV mapper casefolds the Message-ID
+        hn, sub, registrable, public_suffix = self.tld.split_host_extended_unchecked(domain.lower())
         return hn, sub, registrable, public_suffix
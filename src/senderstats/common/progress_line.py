@@ -0,0 +1,24 @@
+import sys
+from typing import TextIO
+
+from senderstats.data.progress_event import ProgressEvent
+
+
+class ProgressLine:
+    """
+    Renders progress events on a single, rewritten terminal line.
+
+    The line is padded with spaces instead of using ANSI erase sequences, which older Windows
+    consoles print literally. It is cleared when a file is done, so the regular output that
+    follows starts on an empty line.
+    """
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.__stream = stream
+        self.__width = 0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        text = "" if event.file_done else event.describe()
+        self.__stream.write("\r" + text.ljust(self.__width) + ("\r" if event.file_done else ""))
+        self.__stream.flush()
+        self.__width = len(text)
@@ -0,0 +1,184 @@
+"""
+Flat binary Public Suffix List trie.
+
+Layout (little-endian, all offsets and counts are unsigned 32-bit unless noted):
+
+    header   magic b"PSLT", version (u16), reserved (u16), node count, edge count,
+             label count, label blob size
+    labels   label count + 1 offsets into the label blob, then the UTF-8 blob itself.
+             Labels are unique and sorted by their UTF-8 bytes, so a label id orders
+             like the label.
+    nodes    per node: index of its first edge, edge count (u16), flags (u8), padding
+    edges    per edge: label id, child node index. The edges of a node are contiguous
+             and sorted by label id.
+
+Node 0 is the root. Nodes are numbered breadth first, so the top of the trie, which every
+lookup touches, sits in the first pages of the file. The file is memory-mapped read-only
+and shared by every process that maps it; a process only decodes the nodes its lookups
+reach.
+
+Build a trie from a local copy of https://publicsuffix.org/list/public_suffix_list.dat:
+
+    python -m senderstats.common.psl_trie public_suffix_list.dat -o default_psl.bin
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import struct
+from typing import Dict, Iterable, List, Tuple, Union
+
+MAGIC = b"PSLT"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIII")
+_OFFSET = struct.Struct("<I")
+_NODE = struct.Struct("<IHBx")
+_EDGE = struct.Struct("<II")
+
+FLAG_RULE = 1
+FLAG_EXCEPTION = 2
+
+# Runtime node, as TLDParser walks it: (children, is_rule, has_star_child, is_exception)
+Node = Tuple[Dict[str, int], bool, bool, bool]
+
+
+def parse_rules(text: str) -> List[str]:
+    """Rules of a public_suffix_list.dat, comments and blank lines removed."""
+    rules = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("//"):
+            continue
+        # A rule ends at the first whitespace
+        rules.append(line.split()[0].lower())
+    return rules
+
+
+def compile_rules(rules: Iterable[str]) -> bytes:
+    """Compile PSL rules into the binary trie format."""
+    # Build a dict trie first: [children, flags]
+    root: list = [{}, 0]
+    for rule in rules:
+        flag = FLAG_RULE
+        if rule.startswith("!"):
+            flag, rule = FLAG_EXCEPTION, rule[1:]
+        node = root
+        for label in reversed(rule.split(".")):
+            node = node[0].setdefault(label, [{}, 0])
+        node[1] |= flag
+
+    labels = sorted({label for label in _walk_labels(root)}, key=lambda s: s.encode("utf-8"))
+    label_ids = {label: i for i, label in enumerate(labels)}
+
+    # Number the nodes breadth first
+    order = [root]
+    for node in order:
+        order.extend(child for _, child in sorted(node[0].items(), key=lambda kv: label_ids[kv[0]]))
+    index = {id(node): i for i, node in enumerate(order)}
+
+    nodes = bytearray()
+    edges = bytearray()
+    edge_count = 0
+    for node in order:
+        children = sorted(node[0].items(), key=lambda kv: label_ids[kv[0]])
+        if len(children) > 0xFFFF:
+            raise ValueError("Too many children for one trie node")
+        nodes += _NODE.pack(edge_count, len(children), node[1])
+        for label, child in children:
+            edges += _EDGE.pack(label_ids[label], index[id(child)])
+        edge_count += len(children)
+
+    encoded = [label.encode("utf-8") for label in labels]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    blob = b"".join(encoded)
+    blob += b"\0" * (-len(blob) % 4)
+
+    return b"".join([
+        _HEADER.pack(MAGIC, VERSION, 0, len(order), edge_count, len(labels), len(blob)),
+        b"".join(_OFFSET.pack(o) for o in offsets),
+        blob,
+        bytes(nodes),
+        bytes(edges),
+    ])
+
+
+def _walk_labels(node: list) -> Iterable[str]:
+    stack = [node]
+    while stack:
+        children = stack.pop()[0]
+        yield from children
+        stack.extend(children.values())
+
+
+class MappedTrieNodes(dict):
+    """
+    Nodes of a binary trie, decoded on first access.
+
+    Indexing works like the list of runtime nodes TLDParser walks: nodes[i] is
+    (children, is_rule, has_star_child, is_exception). Decoded nodes are cached in the
+    dict itself, so after the first visit a lookup costs a plain dict hit.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        super().__init__()
+        magic, version, _, node_count, edge_count, label_count, blob_size = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Invalid trie file: bad magic")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trie file version {version}")
+
+        self.__buffer = buffer
+        self.node_count = node_count
+        self.__offsets = _HEADER.size
+        self.__blob = self.__offsets + (label_count + 1) * _OFFSET.size
+        self.__nodes = self.__blob + blob_size
+        self.__edges = self.__nodes + node_count * _NODE.size
+        if self.__edges + edge_count * _EDGE.size > len(buffer):
+            raise ValueError("Invalid trie file: truncated")
+
+    @classmethod
+    def open(cls, path: str) -> MappedTrieNodes:
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def __missing__(self, index: int) -> Node:
+        if not 0 <= index < self.node_count:
+            raise IndexError(index)
+        buffer = self.__buffer
+        first, count, flags = _NODE.unpack_from(buffer, self.__nodes + index * _NODE.size)
+        children = {}
+        for label_id, child in _EDGE.iter_unpack(buffer[self.__edges + first * _EDGE.size:
+                                                        self.__edges + (first + count) * _EDGE.size]):
+            children[self.label(label_id)] = child
+        node = (children, bool(flags & FLAG_RULE), "*" in children, bool(flags & FLAG_EXCEPTION))
+        self[index] = node
+        return node
+
+    def label(self, label_id: int) -> str:
+        start, end = struct.unpack_from("<II", self.__buffer, self.__offsets + label_id * _OFFSET.size)
+        return bytes(self.__buffer[self.__blob + start:self.__blob + end]).decode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a public_suffix_list.dat into a binary trie.")
+    parser.add_argument("input", help="public_suffix_list.dat to compile.")
+    parser.add_argument("-o", "--output", required=True, help="Binary trie file to write.")
+    args = parser.parse_args(argv)
+
+    with open(args.input, encoding="utf-8") as f:
+        rules = parse_rules(f.read())
+    data = compile_rules(rules)
+    with open(args.output, "wb") as f:
+        f.write(data)
+    nodes = _HEADER.unpack_from(data, 0)[3]
+    print(f"Compiled {len(rules)} rules into {nodes} nodes ({len(data):,} bytes): {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import pickle
 from functools import lru_cache
 from importlib import resources
+from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
+from senderstats.common.psl_trie import MappedTrieNodes
+
 _RESOURCE_PACKAGE = "senderstats.common.data"
-_RESOURCE_PSL = "default_psl.pkl"
+_RESOURCE_PSL = "default_psl.bin"
 
-# On-disk schema (pickle artifact):
+# Dict-based trie schema ({"c": children, "r": is_rule, "e": is_exception} per node)
 RawNode = Dict[str, Any]
 
 # Fast runtime schema
@@ -19,34 +21,36 @@ class TLDParser:
     """
     PSL trie splitter.
 
-    Loads a stable dict-based trie pickle from package resources and converts once into
-    a compact tuple-based runtime representation optimized for splitting.
+    Walks a tuple-based runtime representation of the trie optimized for splitting. The
+    default trie is a memory-mapped binary file (see psl_trie) whose nodes are decoded the
+    first time a split reaches them.
     """
 
     __slots__ = ("nodes",)
 
     def __init__(self, raw_nodes: List[RawNode]):
-        # Convert stable pickle schema -> faster runtime schema
+        # Convert dict schema -> faster runtime schema
         self.nodes: List[Node] = [
             (n["c"], bool(n["r"]), ("*" in n["c"]), bool(n["e"]))
             for n in raw_nodes
         ]
 
+    @classmethod
+    def load_trie(cls, path: str) -> TLDParser:
+        """Parser over a binary trie file built with python -m senderstats.common.psl_trie."""
+        parser = cls.__new__(cls)
+        parser.nodes = MappedTrieNodes.open(path)
+        return parser
+
     @classmethod
     def load_default(cls) -> TLDParser:
-        with resources.files(_RESOURCE_PACKAGE).joinpath(_RESOURCE_PSL).open("rb") as f:
-            raw_nodes = pickle.load(f)
-        cls._validate_raw_nodes(raw_nodes)
-        return cls(raw_nodes)
-
-    @staticmethod
-    def _validate_raw_nodes(raw_nodes: Any) -> None:
-        if not isinstance(raw_nodes, list):
-            raise TypeError(f"Invalid trie pickle: expected list, got {type(raw_nodes)!r}")
-        if raw_nodes:
-            n0 = raw_nodes[0]
-            if not isinstance(n0, dict) or "c" not in n0:
-                raise TypeError("Invalid trie pickle: bad node schema")
+        resource = resources.files(_RESOURCE_PACKAGE).joinpath(_RESOURCE_PSL)
+        if isinstance(resource, Path):
+            return cls.load_trie(str(resource))
+        # Not a plain file (e.g. a zipped install), read it into memory instead
+        parser = cls.__new__(cls)
+        parser.nodes = MappedTrieNodes(resource.read_bytes())
+        return parser
 
     # -------------------------
     # Splitting, yes it's redundant but to prevent frames
@@ -5,6 +5,9 @@ from senderstats.common.regex_patterns import *
 # Precompiled Regex matches IPv4 and IPv6 addresses
 ip_re = re.compile(IPV46_REGEX, re.IGNORECASE)
 
+# Control characters that are not valid in XML (and therefore XLSX)
+excel_invalid_chars_re = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F]')
+
 def escape_regex_specials(literal_str: str):
     """
     Escapes regex special characters in a given string.
@@ -125,7 +128,7 @@ def print_list_with_title(title: str, items: list):
 
 def prepare_string_for_excel(text, max_length=32767):
     # Remove invalid XML control characters
-    sanitized = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F]', '', text)
+    sanitized = excel_invalid_chars_re.sub('', text)
 
     sanitized = sanitized[:max_length]
     if len(sanitized) == max_length:
@@ -1,3 +1,4 @@
+from .detail_key_filter import DetailKeyFilter
 from .exclude_domain_filter import ExcludeDomainFilter
 from .exclude_duplicate_mid_filter import ExcludeDuplicateMessageIdFilter
 from .exclude_empty_sender_filter import ExcludeEmptySenderFilter
@@ -7,6 +8,7 @@ from .exclude_sender_filter import ExcludeSenderFilter
 from .restrict_domain_filter import RestrictDomainFilter
 
 __all__ = [
+    'DetailKeyFilter',
     'ExcludeDomainFilter',
     'ExcludeEmptySenderFilter',
     'ExcludeInvalidSizeFilter',
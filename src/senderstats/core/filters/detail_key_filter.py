@@ -0,0 +1,27 @@
+from typing import Hashable, List, Set, Tuple
+
+from senderstats.data.message_data import MessageData
+from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.keyed import Keyed
+
+
+class DetailKeyFilter(Filter[MessageData]):
+    """
+    Passes the messages of selected keys, a message passes when its key is selected for at
+    least one of the keyed processors.
+    """
+
+    def __init__(self, selections: List[Tuple[Keyed, Set[Hashable]]]):
+        super().__init__()
+        self.__selections = [(processor.message_key, keys) for processor, keys in selections if keys]
+        self.__skipped_count = 0
+
+    def filter(self, data: MessageData) -> bool:
+        for message_key, keys in self.__selections:
+            if message_key(data) in keys:
+                return True
+        self.__skipped_count += 1
+        return False
+
+    def get_skipped_count(self) -> int:
+        return self.__skipped_count
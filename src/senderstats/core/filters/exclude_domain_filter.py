@@ -3,10 +3,11 @@ from typing import List
 from senderstats.common.utils import compile_domains_pattern
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 
 # ExcludeDomainFilter inherits from filter and works with MessageData
-class ExcludeDomainFilter(Filter[MessageData]):
+class ExcludeDomainFilter(Filter[MessageData], Mergeable):
     def __init__(self, excluded_domains: List[str]):
         super().__init__()
         self.__excluded_domains = compile_domains_pattern(excluded_domains)
@@ -20,3 +21,9 @@ class ExcludeDomainFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> int:
+        return self.__excluded_count
+
+    def merge_state(self, state: int) -> None:
+        self.__excluded_count += state
@@ -1,8 +1,9 @@
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 
-class ExcludeDuplicateMessageIdFilter(Filter[MessageData]):
+class ExcludeDuplicateMessageIdFilter(Filter[MessageData], Mergeable):
     def __init__(self):
         super().__init__()
         self.__seen_msgids = set()
@@ -17,3 +18,11 @@ class ExcludeDuplicateMessageIdFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> tuple:
+        return self.__excluded_count, set(self.__seen_msgids)
+
+    def merge_state(self, state: tuple) -> None:
+        excluded_count, seen_msgids = state
+        self.__excluded_count += excluded_count
+        self.__seen_msgids.update(seen_msgids)
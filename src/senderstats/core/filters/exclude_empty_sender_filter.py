@@ -1,8 +1,9 @@
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 
-class ExcludeEmptySenderFilter(Filter[MessageData]):
+class ExcludeEmptySenderFilter(Filter[MessageData], Mergeable):
     def __init__(self):
         super().__init__()
         self.__excluded_count = 0
@@ -15,3 +16,9 @@ class ExcludeEmptySenderFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> int:
+        return self.__excluded_count
+
+    def merge_state(self, state: int) -> None:
+        self.__excluded_count += state
@@ -2,9 +2,10 @@ from typing import List, Set
 
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 
-class ExcludeIPFilter(Filter[MessageData]):
+class ExcludeIPFilter(Filter[MessageData], Mergeable):
     __excluded_ips: Set[str]
 
     def __init__(self, excluded_ips: List[str]):
@@ -20,3 +21,9 @@ class ExcludeIPFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> int:
+        return self.__excluded_count
+
+    def merge_state(self, state: int) -> None:
+        self.__excluded_count += state
@@ -2,9 +2,10 @@ from typing import List, Set
 
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 
-class ExcludeSenderFilter(Filter[MessageData]):
+class ExcludeSenderFilter(Filter[MessageData], Mergeable):
     __excluded_senders: Set[str]
 
     def __init__(self, excluded_senders: List[str]):
@@ -20,3 +21,9 @@ class ExcludeSenderFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> int:
+        return self.__excluded_count
+
+    def merge_state(self, state: int) -> None:
+        self.__excluded_count += state
@@ -5,11 +5,12 @@ import regex as re
 from senderstats.common.utils import compile_domains_pattern
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.filter import Filter
+from senderstats.interfaces.mergeable import Mergeable
 
 TMessageData = TypeVar('TMessageData', bound=MessageData)
 
 
-class RestrictDomainFilter(Filter[MessageData]):
+class RestrictDomainFilter(Filter[MessageData], Mergeable):
     __restricted_domains: re.Pattern
 
     def __init__(self, restricted_domains: List[str]):
@@ -25,3 +26,9 @@ class RestrictDomainFilter(Filter[MessageData]):
 
     def get_excluded_count(self) -> int:
         return self.__excluded_count
+
+    def get_state(self) -> int:
+        return self.__excluded_count
+
+    def merge_state(self, state: int) -> None:
+        self.__excluded_count += state
@@ -51,6 +51,9 @@ class CSVMapper(FieldMapper):
 
         return message_data
 
+    def get_mappings(self) -> Dict[str, str]:
+        return dict(self.__mappings)
+
     def add_mapping(self, field_name: str, csv_field_name: str):
         self.__mappings[field_name] = csv_field_name
 
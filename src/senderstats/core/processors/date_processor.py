@@ -1,12 +1,13 @@
 from collections import defaultdict
-from typing import DefaultDict, Optional, Iterator, Tuple
+from typing import DefaultDict, Dict, Optional, Iterator, Tuple
 
 from senderstats.data.message_data import MessageData
+from senderstats.interfaces.mergeable import Mergeable
 from senderstats.interfaces.processor import Processor
 from senderstats.interfaces.reportable import Reportable
 
 
-class DateProcessor(Processor[MessageData], Reportable):
+class DateProcessor(Processor[MessageData], Reportable, Mergeable):
     __date_counter: DefaultDict[str, int]
     __hourly_counter: DefaultDict[str, int]
     __expand_recipients: bool
@@ -50,3 +51,13 @@ class DateProcessor(Processor[MessageData], Reportable):
     @property
     def create_data_table(self) -> bool:
         return False
+
+    def get_state(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        return dict(self.__date_counter), dict(self.__hourly_counter)
+
+    def merge_state(self, state: Tuple[Dict[str, int], Dict[str, int]]) -> None:
+        date_counter, hourly_counter = state
+        for k, v in date_counter.items():
+            self.__date_counter[k] += v
+        for k, v in hourly_counter.items():
+            self.__hourly_counter[k] += v
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import Iterator, Optional, Tuple
+from typing import Iterator, Optional, Set, Tuple
 
 from senderstats.common.agg.aggregator import KeyedAggregator
 from senderstats.common.agg.message import MessageAgg, TopKNormalizedPatterns
-from senderstats.common.agg.report import KeyedAggReport
+from senderstats.common.agg.report import KeyedAggReport, RowSelection
+from senderstats.common.agg.sketch import SketchAggregator, create_aggregator
+from senderstats.common.agg.spill import MemoryBudget
 from senderstats.data.message_data import MessageData
+from senderstats.interfaces.keyed import Keyed
+from senderstats.interfaces.mergeable import Mergeable
 from senderstats.interfaces.processor import Processor
 from senderstats.interfaces.reportable import Reportable
 
 
-class MFromProcessor(Processor[MessageData], Reportable):
+class MFromProcessor(Processor[MessageData], Reportable, Mergeable, Keyed):
     """
     Aggregates per-envelope-sender (MFrom) stats.
 
@@ -26,6 +30,9 @@ class MFromProcessor(Processor[MessageData], Reportable):
             topk_subjects: int = 64,
             report_top_n: int = 50,
             debug: bool = False,
+            row_selection: Optional[RowSelection] = None,
+            sketch_keys: Optional[int] = None,
+            memory_budget: Optional[MemoryBudget] = None,
     ):
         super().__init__()
         self.__sample_subject = sample_subject
@@ -34,13 +41,18 @@ class MFromProcessor(Processor[MessageData], Reportable):
         self.__topk_subjects = topk_subjects
         self.__report_top_n = report_top_n
         self.__debug = debug
+        self.__row_selection = row_selection
+        self.__sketch_keys = sketch_keys
+        self.__memory_budget = memory_budget
 
         # Keyed buckets for per-sender aggregation
-        self.__by_mfrom: KeyedAggregator[str, MessageAgg] = KeyedAggregator(
+        self.__by_mfrom: KeyedAggregator[str, MessageAgg] = create_aggregator(
             agg_factory=lambda: MessageAgg(
                 # ensure per-processor top-k size is applied
                 norm_patterns=TopKNormalizedPatterns(k=self.__topk_subjects)
-            )
+            ),
+            sketch_keys=self.__sketch_keys,
+            memory_budget=self.__memory_budget,
         )
         self.__reporter = KeyedAggReport[str](
             title="Envelope Senders",
@@ -50,6 +62,7 @@ class MFromProcessor(Processor[MessageData], Reportable):
             sample_subject=self.__sample_subject,
             with_probability=self.__with_probability,
             debug=self.__debug,
+            row_selection=self.__row_selection,
         )
 
     def execute(self, data: MessageData) -> None:
@@ -79,8 +92,31 @@ class MFromProcessor(Processor[MessageData], Reportable):
 
     def report(self, context: Optional = None) -> Iterator[Tuple[str, Iterator[list]]]:
         days = float(context) if context else 0.0
-        return self.__reporter.report(self.__by_mfrom.items(), days=days)
+        return self.__reporter.report(self.__by_mfrom.items(), days=days, sketch=self.sketch)
 
     @property
     def create_data_table(self) -> bool:
         return True
+
+    @property
+    def sketch(self) -> Optional[SketchAggregator]:
+        """The aggregator when --sketch-keys is used, its Count-Min bound applies to the Max Messages column."""
+        return self.__by_mfrom if self.__sketch_keys else None
+
+    def get_state(self) -> list:
+        return self.__by_mfrom.get_state()
+
+    def merge_state(self, state: list) -> None:
+        self.__by_mfrom.merge_state(state)
+
+    def message_key(self, data: MessageData) -> str:
+        return data.mfrom
+
+    def get_aggregator(self) -> KeyedAggregator[str, MessageAgg]:
+        return self.__by_mfrom
+
+    def keys_with_messages(self, min_messages: float) -> Set[str]:
+        return self.__by_mfrom.keys_where(lambda agg: agg.messages >= min_messages)
+
+    def replace_keys(self, other: MFromProcessor, keys: Set[str]) -> None:
+        self.__by_mfrom.replace(other.__by_mfrom, keys)
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from typing import Iterator, Optional, Tuple
+from typing import Iterator, Optional, Set, Tuple
 
 from senderstats.common.agg.aggregator import KeyedAggregator
 from senderstats.common.agg.message import MessageAgg, TopKNormalizedPatterns
-from senderstats.common.agg.report import KeyedAggReport
+from senderstats.common.agg.report import KeyedAggReport, RowSelection
+from senderstats.common.agg.sketch import SketchAggregator, create_aggregator
+from senderstats.common.agg.spill import MemoryBudget
 from senderstats.data.message_data import MessageData
+from senderstats.interfaces.keyed import Keyed
+from senderstats.interfaces.mergeable import Mergeable
 from senderstats.interfaces.processor import Processor
 from senderstats.interfaces.reportable import Reportable
 
 
-class RPathProcessor(Processor[MessageData], Reportable):
+class RPathProcessor(Processor[MessageData], Reportable, Mergeable, Keyed):
     """
     Aggregates per Return-Path (RPath) stats.
 
@@ -26,6 +30,9 @@ class RPathProcessor(Processor[MessageData], Reportable):
             topk_subjects: int = 64,
             report_top_n: int = 50,
             debug: bool = False,
+            row_selection: Optional[RowSelection] = None,
+            sketch_keys: Optional[int] = None,
+            memory_budget: Optional[MemoryBudget] = None,
     ):
         super().__init__()
         self.__sample_subject = sample_subject
@@ -34,12 +41,17 @@ class RPathProcessor(Processor[MessageData], Reportable):
         self.__topk_subjects = topk_subjects
         self.__report_top_n = report_top_n
         self.__debug = debug
+        self.__row_selection = row_selection
+        self.__sketch_keys = sketch_keys
+        self.__memory_budget = memory_budget
 
         # Keyed buckets for per-rpath aggregation
-        self.__by_rpath: KeyedAggregator[str, MessageAgg] = KeyedAggregator(
+        self.__by_rpath: KeyedAggregator[str, MessageAgg] = create_aggregator(
             agg_factory=lambda: MessageAgg(
                 norm_patterns=TopKNormalizedPatterns(k=self.__topk_subjects)
-            )
+            ),
+            sketch_keys=self.__sketch_keys,
+            memory_budget=self.__memory_budget,
         )
 
         self.__reporter = KeyedAggReport[str](
@@ -50,6 +62,7 @@ class RPathProcessor(Processor[MessageData], Reportable):
             sample_subject=self.__sample_subject,
             with_probability=self.__with_probability,
             debug=self.__debug,
+            row_selection=self.__row_selection,
         )
 
     def execute(self, data: MessageData) -> None:
@@ -59,20 +72,52 @@ class RPathProcessor(Processor[MessageData], Reportable):
         else:
             count = 1
 
+        if self.__sample_subject:
+            subject = data.subject
+            snorm = data.subject_norm
+            is_response = data.subject_is_response
+        else:
+            subject = ""
+            snorm = ""
+            is_response = ""
+
         agg = self.__by_rpath.get(data.rpath)
         agg.add_message(
             msgsz=int(data.msgsz),
-            subject=data.subject,
-            normalized_subject=data.subject_norm,
-            is_response=data.subject_is_response,
+            subject=subject,
+            normalized_subject=snorm,
+            is_response=is_response,
             msg_date=data.date or None,
             rcpt_count=count
         )
 
     def report(self, context: Optional = None) -> Iterator[Tuple[str, Iterator[list]]]:
         days = float(context) if context else 0.0
-        return self.__reporter.report(self.__by_rpath.items(), days=days)
+        return self.__reporter.report(self.__by_rpath.items(), days=days, sketch=self.sketch)
 
     @property
     def create_data_table(self) -> bool:
         return True
+
+    @property
+    def sketch(self) -> Optional[SketchAggregator]:
+        """The aggregator when --sketch-keys is used, its Count-Min bound applies to the Max Messages column."""
+        return self.__by_rpath if self.__sketch_keys else None
+
+    def get_state(self) -> list:
+        return self.__by_rpath.get_state()
+
+    def merge_state(self, state: list) -> None:
+        self.__by_rpath.merge_state(state)
+
+    def message_key(self, data: MessageData) -> str:
+        return data.rpath
+
+    def get_aggregator(self) -> KeyedAggregator[str, MessageAgg]:
+        return self.__by_rpath
+
+    def keys_with_messages(self, min_messages: float) -> Set[str]:
+        return self.__by_rpath.keys_where(lambda agg: agg.messages >= min_messages)
+
+    def replace_keys(self, other: RPathProcessor, keys: Set[str]) -> None:
+        self.__by_rpath.replace(other.__by_rpath, keys)
@@ -3,9 +3,10 @@ from .hfrom_transform import HFromTransform
 from .mfrom_transform import MFromTransform
 from .mid_transform import MIDTransform
 from .rpath_transform import RPathTransform
-from .subject_transform import SubjectTransform
+from .subject_transform import BlankSubjectTransform, SubjectTransform
 
 __all__ = [
+    'BlankSubjectTransform',
     'DateTransform',
     'HFromTransform',
     'MFromTransform',
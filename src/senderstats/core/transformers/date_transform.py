@@ -12,6 +12,10 @@ class DateTransform(Transform[MessageData, MessageData]):
         self.__date_format = date_format
 
     def transform(self, data: MessageData) -> MessageData:
+        # Columnar inputs are already parsed
+        if isinstance(data.date, datetime):
+            return data
+
         try:
             # Try ISO date first for fastest parsing
             data.date = ciso8601.parse_datetime(data.date)
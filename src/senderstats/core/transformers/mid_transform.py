@@ -1,5 +1,5 @@
 from senderstats.common.mid_parser import MIDParser
-from senderstats.common.tld_parser import TLDParser
+from senderstats.common.tld_parser import get_default_tld_parser
 from senderstats.data.message_data import MessageData
 from senderstats.interfaces.transform import Transform
 
@@ -7,7 +7,7 @@ from senderstats.interfaces.transform import Transform
 class MIDTransform(Transform[MessageData, MessageData]):
     def __init__(self):
         super().__init__()
-        self._mid_parser = MIDParser(TLDParser.load_default())
+        self._mid_parser = MIDParser(get_default_tld_parser())
 
     def transform(self, data: MessageData) -> MessageData:
         mid_host_label, mid_subdomain, mid_domain, _ = self._mid_parser.parse(data.msgid)
@@ -12,3 +12,18 @@ class SubjectTransform(Transform[MessageData, MessageData]):
         setattr(data, "subject_norm", snorm)
         setattr(data, "subject_is_response", is_resp)
         return data
+
+
+class BlankSubjectTransform(Transform[MessageData, MessageData]):
+    """
+    Stands in for SubjectTransform when subjects are not looked at, processors then record
+    no subject patterns and no replies.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    def transform(self, data: MessageData) -> MessageData:
+        setattr(data, "subject_norm", "")
+        setattr(data, "subject_is_response", False)
+        return data
@@ -0,0 +1,78 @@
+import time
+from typing import Any, Callable, Dict, List
+
+from senderstats.core.mappers.csv_mapper import CSVMapper
+from senderstats.data.columnar_store import ColumnarReader
+from senderstats.data.file_progress import FileProgress
+from senderstats.data.message_data import MessageData
+from senderstats.interfaces.data_source import DataSource
+from senderstats.interfaces.resumable import Resumable
+
+
+class ColumnarDataSource(DataSource, Resumable):
+    """
+    Reads message data from columnar files created by ``senderstats ingest``.
+
+    Only the fields the mapper requires for this run are read. The stored mappings
+    must match the requested mappings, otherwise the file holds different columns
+    than the user asked for.
+    """
+
+    def __init__(self, input_files: List[str], field_mapper: CSVMapper):
+        self.__input_files = input_files
+        self.__field_mapper = field_mapper
+        self.__failed_files = []
+        self.__progress = FileProgress()
+        self.__rows_read = 0
+
+    def read_data(self):
+        progress = self.__progress
+        mappings = self.__field_mapper.get_mappings()
+        fields = list(mappings)
+
+        f_total = len(self.__input_files)
+        for f_current, input_file in enumerate(self.__input_files, start=1):
+            start_row = progress.start_file(input_file)
+            if start_row is None:
+                print(f"Skipping: {input_file} ({f_current} of {f_total}), already processed")
+                continue
+
+            print(f"Processing: {input_file} ({f_current} of {f_total})")
+            try:
+                reader = ColumnarReader(input_file)
+                stored_mappings = reader.header['mappings']
+                for field, csv_field in mappings.items():
+                    if field in stored_mappings and stored_mappings[field] != csv_field:
+                        raise ValueError(f"'{field}' was ingested from '{stored_mappings[field]}', not '{csv_field}'")
+
+                start_time = time.perf_counter()
+                # The position of a columnar file is the number of rows read
+                for progress.position, row in enumerate(reader.iter_rows(fields, start_row), start=start_row + 1):
+                    message_data = MessageData()
+                    vars(message_data).update(zip(fields, row))
+                    yield message_data
+                    self.__rows_read += 1
+                end_time = time.perf_counter()
+                elapsed_time = end_time - start_time
+                print(f"File processed in {elapsed_time:.4f} seconds")
+                progress.complete_file()
+
+            except Exception as e:
+                print(f"Error reading file {input_file}: {e}")
+                self.__failed_files.append(input_file)
+
+    def get_failed_files(self) -> List[str]:
+        return self.__failed_files
+
+    def get_rows_read(self) -> int:
+        """Rows read so far by this run, safe to call from another thread."""
+        return self.__rows_read
+
+    def add_file_listener(self, listener: Callable[[str], None]) -> None:
+        self.__progress.add_listener(listener)
+
+    def get_progress(self) -> Dict[str, Any]:
+        return self.__progress.to_state()
+
+    def resume(self, progress: Dict[str, Any]) -> None:
+        self.__progress.resume(progress)
@@ -0,0 +1,241 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+COLUMNAR_MAGIC = b"SSCOL\r\n\x1a"
+COLUMNAR_VERSION = 1
+
+# Fields stored as codes into the shared string table
+STRING_FIELDS = ('mfrom', 'hfrom', 'rpath', 'msgid', 'subject', 'ip')
+# Fields stored as a list of codes per row
+LIST_FIELDS = ('rcpts',)
+INT_FIELDS = ('msgsz',)
+DATE_FIELDS = ('date',)
+
+# Marker used in the offset column for timestamps without timezone information
+_NAIVE_OFFSET = -2 ** 31
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ALIGNMENT = 8
+
+_HEADER = struct.Struct("<8sHHI")
+
+
+def is_columnar_file(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(COLUMNAR_MAGIC)) == COLUMNAR_MAGIC
+    except OSError:
+        return False
+
+
+class ColumnarWriter:
+    """
+    Builds a columnar store from mapped message data.
+
+    Strings from every text column share one dictionary, each row only stores a
+    uint32 code. Sizes are int64, dates are int64 microseconds since the epoch plus
+    an int32 UTC offset in seconds. All arrays are 8 byte aligned so the reader can
+    map them directly.
+    """
+
+    def __init__(self, fields: List[str]):
+        self.__fields = list(fields)
+        self.__strings: Dict[str, int] = {}
+        self.__rows = 0
+        self.__columns: Dict[str, Dict[str, array]] = {}
+        for field in self.__fields:
+            if field in STRING_FIELDS:
+                self.__columns[field] = {'codes': array('I')}
+            elif field in LIST_FIELDS:
+                self.__columns[field] = {'offsets': array('Q', [0]), 'codes': array('I')}
+            elif field in INT_FIELDS:
+                self.__columns[field] = {'values': array('q')}
+            elif field in DATE_FIELDS:
+                self.__columns[field] = {'micros': array('q'), 'offsets': array('i')}
+            else:
+                raise ValueError(f"Field '{field}' cannot be stored in a columnar file")
+
+    def __encode(self, value: str) -> int:
+        code = self.__strings.get(value)
+        if code is None:
+            code = len(self.__strings)
+            self.__strings[value] = code
+        return code
+
+    def add(self, data: Any) -> None:
+        encode = self.__encode
+        for field in self.__fields:
+            value = getattr(data, field)
+            column = self.__columns[field]
+            if field in STRING_FIELDS:
+                column['codes'].append(encode(value))
+            elif field in LIST_FIELDS:
+                codes = column['codes']
+                codes.extend(encode(v) for v in value)
+                column['offsets'].append(len(codes))
+            elif field in INT_FIELDS:
+                column['values'].append(value)
+            else:
+                offset = value.utcoffset()
+                if offset is None:
+                    column['offsets'].append(_NAIVE_OFFSET)
+                    value = value.replace(tzinfo=timezone.utc)
+                else:
+                    column['offsets'].append(int(offset.total_seconds()))
+                column['micros'].append((value - _EPOCH) // timedelta(microseconds=1))
+        self.__rows += 1
+
+    def get_row_count(self) -> int:
+        return self.__rows
+
+    def write(self, path: str, metadata: Dict[str, Any]) -> None:
+        string_data = bytearray()
+        string_offsets = array('Q', [0])
+        for value in self.__strings:
+            string_data += value.encode("utf-8", "surrogatepass")
+            string_offsets.append(len(string_data))
+
+        blocks: List[Tuple[str, str, Any]] = [('strings', 'offsets', string_offsets),
+                                              ('strings', 'data', bytes(string_data))]
+        for field, column in self.__columns.items():
+            for name, values in column.items():
+                blocks.append((field, name, values))
+
+        # Block offsets are relative to the end of the (padded) JSON header
+        layout: Dict[str, Dict[str, list]] = {}
+        position = 0
+        for owner, name, values in blocks:
+            size = len(values) * values.itemsize if isinstance(values, array) else len(values)
+            typecode = values.typecode if isinstance(values, array) else 'B'
+            layout.setdefault(owner, {})[name] = [position, size, typecode]
+            position += size + (-size % _ALIGNMENT)
+
+        header = dict(metadata)
+        header.update({
+            'byteorder': sys.byteorder,
+            'rows': self.__rows,
+            'strings': len(self.__strings),
+            'fields': self.__fields,
+            'blocks': layout,
+        })
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        header_bytes += b" " * (-(_HEADER.size + len(header_bytes)) % _ALIGNMENT)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, 0, len(header_bytes)))
+            f.write(header_bytes)
+            for _, _, values in blocks:
+                data = values.tobytes() if isinstance(values, array) else values
+                f.write(data)
+                f.write(b"\0" * (-len(data) % _ALIGNMENT))
+        os.replace(tmp_path, path)
+
+
+class ColumnarReader:
+    """
+    Memory maps a columnar store and iterates its rows without copying the arrays.
+    """
+
+    def __init__(self, path: str):
+        self.__path = path
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER.size)
+            if len(raw) != _HEADER.size:
+                raise ValueError(f"Not a senderstats columnar file: {path}")
+            magic, version, _, header_len = _HEADER.unpack(raw)
+            if magic != COLUMNAR_MAGIC:
+                raise ValueError(f"Not a senderstats columnar file: {path}")
+            if version != COLUMNAR_VERSION:
+                raise ValueError(f"Unsupported columnar version {version} in {path} (expected {COLUMNAR_VERSION})")
+            self.header = json.loads(f.read(header_len))
+        if self.header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {self.header['byteorder']}-endian system")
+        self.__data_start = _HEADER.size + header_len
+        self.__strings: Optional[List[str]] = None
+
+    def get_fields(self) -> List[str]:
+        return self.header['fields']
+
+    def get_row_count(self) -> int:
+        return self.header['rows']
+
+    def iter_rows(self, fields: Optional[List[str]] = None, start_row: int = 0) -> Iterator[tuple]:
+        """
+        Yield one tuple per row holding the values of the requested fields, in order.
+
+        :param start_row: Index of the first row to yield, earlier rows are skipped without being decoded.
+        """
+        fields = self.get_fields() if fields is None else fields
+        missing = [field for field in fields if field not in self.header['fields']]
+        if missing:
+            raise ValueError(f"{self.__path} does not contain the field(s): {', '.join(missing)}")
+
+        with open(self.__path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            views = [memoryview(mm)]
+
+            def block(owner: str, name: str, first: int = 0) -> memoryview:
+                offset, size, typecode = self.header['blocks'][owner][name]
+                start = self.__data_start + offset
+                view = views[0][start:start + size]
+                views.append(view)
+                if typecode != 'B':
+                    view = view.cast(typecode)
+                    views.append(view)
+                if first:
+                    view = view[first:]
+                    views.append(view)
+                return view
+
+            try:
+                if start_row < self.header['rows']:
+                    yield from zip(*[self.__column(field, block, start_row) for field in fields])
+            finally:
+                # Views must be released before the map can be closed
+                for view in reversed(views):
+                    view.release()
+
+    def __column(self, field: str, block, start_row: int) -> Iterator[Any]:
+        if field in STRING_FIELDS or field in LIST_FIELDS:
+            strings = self.__load_strings(block)
+        if field in STRING_FIELDS:
+            return map(strings.__getitem__, block(field, 'codes', start_row))
+        if field in LIST_FIELDS:
+            return self.__iter_lists(strings, block(field, 'offsets', start_row), block(field, 'codes'))
+        if field in INT_FIELDS:
+            return iter(block(field, 'values', start_row))
+        return self.__iter_dates(block(field, 'micros', start_row), block(field, 'offsets', start_row))
+
+    def __load_strings(self, block) -> List[str]:
+        if self.__strings is None:
+            offsets = block('strings', 'offsets')
+            data = bytes(block('strings', 'data'))
+            self.__strings = [data[offsets[i]:offsets[i + 1]].decode("utf-8", "surrogatepass")
+                              for i in range(len(offsets) - 1)]
+        return self.__strings
+
+    @staticmethod
+    def __iter_lists(strings: List[str], offsets: memoryview, codes: memoryview) -> Iterator[List[str]]:
+        start = offsets[0]
+        for i in range(1, len(offsets)):
+            end = offsets[i]
+            yield [strings[c] for c in codes[start:end]]
+            start = end
+
+    @staticmethod
+    def __iter_dates(micros: memoryview, offsets: memoryview) -> Iterator[datetime]:
+        fromtimestamp = datetime.fromtimestamp
+        zones: Dict[int, timezone] = {}
+        for us, offset in zip(micros, offsets):
+            if offset == _NAIVE_OFFSET:
+                yield fromtimestamp(us / 1e6, timezone.utc).replace(tzinfo=None)
+                continue
+            tz = zones.get(offset)
+            if tz is None:
+                tz = zones[offset] = timezone(timedelta(seconds=offset))
+            yield fromtimestamp(us / 1e6, tz)
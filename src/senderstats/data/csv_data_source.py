@@ -1,32 +1,140 @@
 import csv
+import os
 import time
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
 
 from senderstats.core.mappers.csv_mapper import CSVMapper
+from senderstats.data.file_progress import FileProgress
+from senderstats.data.progress_event import PROGRESS_CHECK_ROWS, ProgressEvent, ProgressTracker
 from senderstats.interfaces.data_source import DataSource
+from senderstats.interfaces.resumable import Resumable
 
+# Bytes read at a time when row offsets are tracked
+_READ_CHUNK = 1 << 16
 
-class CSVDataSource(DataSource):
-    def __init__(self, input_files: List[str], field_mapper: CSVMapper):
+
+class CSVDataSource(DataSource, Resumable):
+    def __init__(self, input_files: List[str], field_mapper: CSVMapper, track_offsets: bool = False):
         self.__input_files = input_files
         self.__field_mapper = field_mapper
+        self.__failed_files = []
+        # Checkpoints need the byte offset of every row boundary, which is only known when
+        # decoding the lines ourselves. Otherwise the faster text mode reader is used.
+        self.__track_offsets = track_offsets
+        self.__progress = FileProgress()
+        self.__rows_read = 0
+        self.__progress_listener: Optional[Callable[[ProgressEvent], None]] = None
+        self.__progress_interval = 0.5
+
+    def __iter_lines(self, file):
+        # Lines are read as bytes so the offset of every row boundary is known. Like text mode,
+        # \n, \r\n and a lone \r all end a line and are translated to \n, so both readers
+        # produce the same fields.
+        progress = self.__progress
+        tail = b""
+        for chunk in iter(lambda: file.read(_READ_CHUNK), b""):
+            lines = (tail + chunk).splitlines(keepends=True)
+            # The last line may continue in the next chunk, a trailing \r may be half of \r\n
+            tail = lines.pop()
+            if tail[-1:] == b"\n":
+                lines.append(tail)
+                tail = b""
+            for line in lines:
+                progress.position += len(line)
+                yield _translate_newline(line)
+        if tail:
+            progress.position += len(tail)
+            yield _translate_newline(tail)
+
+    def __position(self, file) -> int:
+        if self.__track_offsets:
+            return self.__progress.position
+        # Bytes read from disk, ahead of the parsed rows by at most one buffer
+        return file.buffer.tell()
+
+    def add_progress_listener(self, listener: Callable[[ProgressEvent], None], interval: float = 0.5) -> None:
+        """Call listener with a ProgressEvent at most every interval seconds while reading."""
+        self.__progress_listener = listener
+        self.__progress_interval = interval
 
     def read_data(self):
+        progress = self.__progress
         f_total = len(self.__input_files)
+        sizes = [os.path.getsize(f) if os.path.isfile(f) else 0 for f in self.__input_files]
+        tracker = None
+        if self.__progress_listener is not None:
+            tracker = ProgressTracker(sum(sizes), self.__progress_listener, self.__progress_interval)
+        mask = PROGRESS_CHECK_ROWS - 1
+        done_bytes = 0
+        rows = 0
         for f_current, input_file in enumerate(self.__input_files, start=1):
+            start_position = progress.start_file(input_file)
+            if start_position is None:
+                print(f"Skipping: {input_file} ({f_current} of {f_total}), already processed")
+                done_bytes += sizes[f_current - 1]
+                continue
+
             print(f"Processing: {input_file} ({f_current} of {f_total})")
             try:
-                with open(input_file, mode="r", encoding="utf-8-sig") as file:
-                    start_time = time.perf_counter()
+                if self.__track_offsets:
+                    file = open(input_file, mode="rb")
+                    reader = csv.reader(self.__iter_lines(file))
+                else:
+                    file = open(input_file, mode="r", encoding="utf-8-sig")
                     reader = csv.reader(file)
+                with file:
+                    start_time = time.perf_counter()
                     headers = next(reader)
+                    if headers:
+                        headers[0] = headers[0].lstrip("\ufeff")
                     self.__field_mapper.reindex(headers)
+                    if start_position:
+                        # Lines read ahead of the header are dropped with the old reader
+                        file.seek(start_position)
+                        progress.position = start_position
+                        reader = csv.reader(self.__iter_lines(file))
                     for row in reader:
                         normalized_row = self.__field_mapper.map_fields(row)
                         yield normalized_row
+                        rows += 1
+                        self.__rows_read = rows
+                        if tracker is not None and not rows & mask:
+                            tracker.update(input_file, f_current, f_total, rows, done_bytes + self.__position(file))
+                    if tracker is not None:
+                        tracker.update(input_file, f_current, f_total, rows, done_bytes + sizes[f_current - 1],
+                                       file_done=True)
                     end_time = time.perf_counter()
                     elapsed_time = end_time - start_time
                     print(f"File processed in {elapsed_time:.4f} seconds")
+                progress.complete_file()
 
             except Exception as e:
                 print(f"Error reading file {input_file}: {e}")
+                self.__failed_files.append(input_file)
+            done_bytes += sizes[f_current - 1]
+
+    def get_failed_files(self) -> List[str]:
+        return self.__failed_files
+
+    def get_rows_read(self) -> int:
+        """Rows read so far by this run, safe to call from another thread."""
+        return self.__rows_read
+
+    def add_file_listener(self, listener: Callable[[str], None]) -> None:
+        self.__progress.add_listener(listener)
+
+    def get_progress(self) -> Dict[str, Any]:
+        return self.__progress.to_state()
+
+    def resume(self, progress: Dict[str, Any]) -> None:
+        # Resume positions are byte offsets
+        self.__track_offsets = True
+        self.__progress.resume(progress)
+
+
+def _translate_newline(line: bytes) -> str:
+    if line[-2:] == b"\r\n":
+        line = line[:-2] + b"\n"
+    elif line[-1:] == b"\r":
+        line = line[:-1] + b"\n"
+    return line.decode("utf-8")
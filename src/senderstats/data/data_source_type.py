@@ -3,3 +3,4 @@ from enum import Enum
 
 class DataSourceType(Enum):
     CSV = "CSV"
+    COLUMNAR = "COLUMNAR"
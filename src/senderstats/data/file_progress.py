@@ -0,0 +1,75 @@
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+
+def file_identity(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class FileProgress:
+    """
+    Tracks which input files are complete and the read position within the current file.
+
+    Files are identified by absolute path, size and mtime so a resumed run refuses to
+    continue from a position in a file that has changed since.
+    """
+
+    def __init__(self):
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self.current: Optional[str] = None
+        self.position = 0
+        self.__resume_positions: Dict[str, int] = {}
+        self.__listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener with the path of every file once it is completely read."""
+        self.__listeners.append(listener)
+
+    def start_file(self, path: str) -> Optional[int]:
+        """
+        :return: The position to start reading from, or None if the file is already complete.
+        """
+        key = os.path.abspath(path)
+        if key in self.completed:
+            return None
+        self.current = path
+        self.position = self.__resume_positions.pop(key, 0)
+        return self.position
+
+    def complete_file(self) -> None:
+        path = self.current
+        self.completed[os.path.abspath(path)] = file_identity(path)
+        self.current = None
+        self.position = 0
+        for listener in self.__listeners:
+            listener(path)
+
+    def is_completed(self, path: str) -> bool:
+        return os.path.abspath(path) in self.completed
+
+    def to_state(self) -> Dict[str, Any]:
+        current = None
+        if self.current is not None:
+            current = file_identity(self.current)
+            current['position'] = self.position
+        return {'completed': list(self.completed.values()), 'current': current}
+
+    def resume(self, state: Dict[str, Any]) -> None:
+        for entry in state['completed']:
+            FileProgress.__verify(entry)
+            self.completed[entry['path']] = dict(entry)
+
+        current = state['current']
+        if current is not None:
+            FileProgress.__verify(current)
+            self.__resume_positions[current['path']] = current['position']
+
+    @staticmethod
+    def __verify(entry: Dict[str, Any]) -> None:
+        path = entry['path']
+        if not os.path.isfile(path):
+            raise ValueError(f"{path} no longer exists")
+        identity = file_identity(path)
+        if identity['size'] != entry['size'] or identity['mtime_ns'] != entry['mtime_ns']:
+            raise ValueError(f"{path} has changed since the checkpoint was written")
@@ -0,0 +1,84 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Rows between progress checks in the read loop (must be a power of 2)
+PROGRESS_CHECK_ROWS = 1024
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Progress of reading all input files, rates are smoothed over the recent updates."""
+    file: str
+    file_index: int
+    file_count: int
+    rows: int
+    bytes_read: int
+    total_bytes: int
+    rows_per_second: float
+    bytes_per_second: float
+    eta_seconds: Optional[float]
+    file_done: bool = False
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.bytes_read / self.total_bytes) if self.total_bytes else 0.0
+
+    def describe(self) -> str:
+        eta = "--:--:--"
+        if self.eta_seconds is not None:
+            minutes, seconds = divmod(int(self.eta_seconds), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return (f"{self.fraction:6.1%} | file {self.file_index} of {self.file_count} | {self.rows:,} rows | "
+                f"{self.rows_per_second:,.0f} rows/s | {self.bytes_per_second / (1024 * 1024):.1f} MB/s | ETA {eta}")
+
+
+class ProgressTracker:
+    """
+    Turns row and byte counts into throttled progress events.
+
+    update() is cheap enough to call every PROGRESS_CHECK_ROWS rows: it only reads the clock
+    and calls the listener at most once per interval. Rates are an exponentially weighted
+    moving average, so the ETA follows changes in speed without jumping around.
+    """
+
+    def __init__(self, total_bytes: int, listener: Callable[[ProgressEvent], None], interval: float = 0.5,
+                 smoothing: float = 0.3):
+        self.__total_bytes = total_bytes
+        self.__listener = listener
+        self.__interval = interval
+        self.__smoothing = smoothing
+        self.__last_time = time.perf_counter()
+        self.__last_rows = 0
+        self.__last_bytes: Optional[int] = None
+        self.__rows_per_second: Optional[float] = None
+        self.__bytes_per_second: Optional[float] = None
+
+    def update(self, file: str, file_index: int, file_count: int, rows: int, bytes_read: int,
+               file_done: bool = False) -> None:
+        now = time.perf_counter()
+        elapsed = now - self.__last_time
+        if self.__last_bytes is None:
+            # First update of the run (or of a resumed run), start measuring from here
+            self.__last_time, self.__last_rows, self.__last_bytes = now, rows, bytes_read
+            elapsed = 0.0
+        if elapsed < self.__interval and not file_done:
+            return
+
+        if elapsed > 0:
+            self.__rows_per_second = self.__smooth(self.__rows_per_second, (rows - self.__last_rows) / elapsed)
+            self.__bytes_per_second = self.__smooth(self.__bytes_per_second,
+                                                    (bytes_read - self.__last_bytes) / elapsed)
+            self.__last_time, self.__last_rows, self.__last_bytes = now, rows, bytes_read
+
+        bytes_per_second = self.__bytes_per_second or 0.0
+        eta = (self.__total_bytes - bytes_read) / bytes_per_second if bytes_per_second > 0 else None
+        self.__listener(ProgressEvent(file, file_index, file_count, rows, bytes_read, self.__total_bytes,
+                                      self.__rows_per_second or 0.0, bytes_per_second,
+                                      max(0.0, eta) if eta is not None else None, file_done))
+
+    def __smooth(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return self.__smoothing * value + (1 - self.__smoothing) * average
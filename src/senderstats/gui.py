@@ -109,7 +109,8 @@ class SenderStatsGUI:
         #  - row 2: run button
         self.root.rowconfigure(0, weight=3)  # notebook
         self.root.rowconfigure(1, weight=2)  # log
-        self.root.rowconfigure(2, weight=0)  # run button (natural size)
+        self.root.rowconfigure(2, weight=0)  # progress (natural size)
+        self.root.rowconfigure(3, weight=0)  # run button (natural size)
 
         # Debug
         self.debug_mode = tk.BooleanVar(value=False)  # hidden debug state
@@ -176,9 +177,18 @@ class SenderStatsGUI:
         self.clear_log_button = ttk.Button(log_frame, text="Clear Log", command=self.clear_log)
         self.clear_log_button.grid(row=1, column=0, pady=(0, 5), padx=(0, 10), sticky='e')
 
+        # Progress of the current run
+        progress_frame = ttk.Frame(root)
+        progress_frame.grid(row=2, column=0, sticky='ew', padx=10, pady=(0, 5))
+        progress_frame.columnconfigure(0, weight=1)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
+        self.progress_bar.grid(row=0, column=0, sticky='ew')
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.grid(row=1, column=0, sticky='w')
+
         # Run button
         self.run_button = ttk.Button(root, text="Run SenderStats", command=self.run_tool)
-        self.run_button.grid(row=2, column=0, sticky='ew', padx=10, pady=(0, 10))
+        self.run_button.grid(row=3, column=0, sticky='ew', padx=10, pady=(0, 10))
 
         # Set initial focus to input listbox once everything is created
         self.root.after(0, lambda: self.input_listbox.focus_set())
@@ -228,13 +238,18 @@ class SenderStatsGUI:
         t.start()
 
     def __handle_queue_message(self, msg, arg):
-        if msg == "output":
+        if msg == "progress":
+            self.progress_bar['value'] = arg.fraction * 100
+            self.progress_label.config(text=arg.describe())
+
+        elif msg == "output":
             self.output_text.config(state='normal')
             self.output_text.insert(tk.END, arg)
             self.output_text.config(state='disabled')
             self.output_text.see(tk.END)
 
         elif msg == "success":
+            self.progress_bar['value'] = 100
             self.run_button.config(state='normal', text="Run SenderStats")
 
         elif msg == "error":
@@ -620,6 +635,8 @@ class SenderStatsGUI:
             validate_xlsx_file(output)
 
             self.run_button.config(state='disabled', text="Running...")
+            self.progress_bar['value'] = 0
+            self.progress_label.config(text="")
 
             # Clear output text
             self.output_text.config(state='normal')
@@ -664,6 +681,34 @@ class SenderStatsGUI:
             args.date_format = self.date_format.get() or DEFAULT_DATE_FORMAT
             args.no_default_exclude_domains = self.no_default_exclude_domains.get()
             args.no_default_exclude_ips = self.no_default_exclude_ips.get()
+            args.save_snapshot = None
+            args.cache_dir = None
+            args.cache_max_size = 2048
+            args.cache_key = 'mtime'
+            args.clear_cache = False
+            args.checkpoint = None
+            args.checkpoint_interval = 300
+            args.resume = False
+            args.output_format = 'xlsx'
+            args.streaming_report = False
+            args.report_sort = None
+            args.report_top = None
+            args.report_min_messages = 0
+            args.two_pass = False
+            args.two_pass_min_per_day = DEFAULT_THRESHOLD
+            args.sketch_keys = None
+            args.max_memory = None
+            args.spill_dir = None
+            args.stage_timing = False
+            args.stage_timing_sample = DEFAULT_STAGE_TIMING_SAMPLE
+            args.run_manifest = None
+            args.profile = None
+            args.profile_sample = 1
+            args.memory_report = False
+            args.memory_trace = False
+            args.metrics_file = None
+            args.metrics_interval = 60
+            args.no_progress = False
 
             def process():
                 q_output = QueueOutput(self.result_queue)
@@ -679,6 +724,10 @@ class SenderStatsGUI:
                         config.display_filter_criteria()
 
                         data_source_manager = DataSourceManager(config)
+                        # Columnar stores do not report progress
+                        if config.source_type == DataSourceType.CSV:
+                            data_source_manager.get_data_source().add_progress_listener(
+                                lambda event: self.result_queue.put(("progress", event)))
                         pipeline_manager = PipelineManager(config)
 
                         processor = PipelineProcessor(data_source_manager, pipeline_manager)
@@ -1,13 +1,21 @@
 from .filter import Filter
 from .handler import Handler
+from .keyed import Keyed
+from .mergeable import Mergeable
 from .processor import Processor
+from .report_writer import ReportWriter
+from .resumable import Resumable
 from .transform import Transform
 from .validator import Validator
 
 __all__ = [
     'Filter',
     'Handler',
+    'Keyed',
+    'Mergeable',
     'Processor',
+    'ReportWriter',
+    'Resumable',
     'Transform',
     'Validator'
 ]
@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, Set
+
+
+# Keyed processors aggregate per key and can take over the aggregates of single keys from another instance
+class Keyed(ABC):
+    @abstractmethod
+    def message_key(self, data: Any) -> Hashable:
+        """Return the key a message is aggregated under."""
+        pass
+
+    @abstractmethod
+    def keys_with_messages(self, min_messages: float) -> Set[Hashable]:
+        """Return the keys with at least min_messages messages."""
+        pass
+
+    @abstractmethod
+    def get_aggregator(self) -> Any:
+        """Return the KeyedAggregator holding the aggregates."""
+        pass
+
+    @abstractmethod
+    def replace_keys(self, other: Any, keys: Set[Hashable]) -> None:
+        """Replace the aggregates of keys with the ones of other, a processor of the same type."""
+        pass
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+# Mergeable components can export their aggregation state as plain data and fold in state from another run
+class Mergeable(ABC):
+    @abstractmethod
+    def get_state(self) -> Any:
+        """Return the aggregation state as plain (picklable) data."""
+        pass
+
+    @abstractmethod
+    def merge_state(self, state: Any) -> None:
+        """Merge state previously returned by get_state(), possibly from another run."""
+        pass
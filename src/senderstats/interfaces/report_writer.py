@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+# Report writers stream the rows of one report (header row first) into a file
+class ReportWriter(ABC):
+    @property
+    @abstractmethod
+    def extension(self) -> str:
+        """File extension, including the leading dot."""
+        pass
+
+    @abstractmethod
+    def write(self, path: str, rows: Iterator[list]) -> int:
+        """Write the header row and all data rows to path and return the number of data rows."""
+        pass
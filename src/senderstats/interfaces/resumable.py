@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+# Resumable data sources report how far they have read and can continue from that point
+class Resumable(ABC):
+    @abstractmethod
+    def get_progress(self) -> Dict[str, Any]:
+        """Return the completed files and the position in the current file as plain data."""
+        pass
+
+    @abstractmethod
+    def resume(self, progress: Dict[str, Any]) -> None:
+        """Skip the completed files and continue the current file from the recorded position."""
+        pass
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+from glob import glob
+from typing import Any, Dict, Optional
+
+from senderstats.processing.snapshot_manager import SNAPSHOT_VERSION, SnapshotManager
+
+_CACHE_SUFFIX = ".snap"
+_FINGERPRINT_CHUNK = 1024 * 1024
+
+
+class AggregateCache:
+    """
+    Bounded on-disk cache of per-file aggregation state.
+
+    Entries are keyed by the input file identity (path, size and mtime, or a content
+    fingerprint) combined with a hash of the options that affect aggregation, so any
+    change to either produces a miss. Entries use the snapshot file format and the
+    least recently used entries are evicted once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, key_mode: str = "mtime"):
+        if key_mode not in ("mtime", "content"):
+            raise ValueError(f"Unsupported cache key mode: {key_mode}")
+        self.__cache_dir = cache_dir
+        self.__max_bytes = max_bytes
+        self.__key_mode = key_mode
+        self.__hits = 0
+        self.__misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def config_hash(options: Dict[str, Any]) -> str:
+        encoded = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{SNAPSHOT_VERSION}:{encoded}".encode("utf-8")).hexdigest()
+
+    def key_for(self, input_file: str, config_hash: str) -> str:
+        st = os.stat(input_file)
+        if self.__key_mode == "content":
+            identity = f"{st.st_size}:{self.__fingerprint(input_file)}"
+        else:
+            identity = f"{os.path.abspath(input_file)}:{st.st_size}:{st.st_mtime_ns}"
+        return hashlib.sha256(f"{identity}:{config_hash}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def __fingerprint(input_file: str) -> str:
+        h = hashlib.blake2b(digest_size=32)
+        with open(input_file, "rb") as f:
+            for chunk in iter(lambda: f.read(_FINGERPRINT_CHUNK), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, key + _CACHE_SUFFIX)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.__entry_path(key)
+        try:
+            snapshot = SnapshotManager.load(path)
+        except OSError:
+            self.__misses += 1
+            return None
+        except ValueError:
+            # Corrupt or truncated entry, drop it so it is rebuilt
+            self.__misses += 1
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        # Refresh mtime so eviction is least recently used
+        os.utime(path)
+        self.__hits += 1
+        return snapshot.state
+
+    def put(self, key: str, options: Dict[str, Any], state: Dict[str, Any]) -> None:
+        SnapshotManager.save(self.__entry_path(key), options, state)
+        self.__enforce_limit()
+
+    def __enforce_limit(self) -> None:
+        entries = []
+        for path in glob(os.path.join(self.__cache_dir, "*" + _CACHE_SUFFIX)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self) -> int:
+        removed = 0
+        for path in glob(os.path.join(self.__cache_dir, "*" + _CACHE_SUFFIX)):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
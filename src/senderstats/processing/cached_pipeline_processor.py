@@ -0,0 +1,83 @@
+from typing import Optional
+
+from senderstats.processing.aggregate_cache import AggregateCache
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.interrupt_handler import InterruptHandler, PartialRun
+from senderstats.processing.pipeline_manager import PipelineManager
+
+
+class CachedPipelineProcessor:
+    """
+    Processes each input file into its own partial aggregate and caches it.
+
+    Files that are unchanged since a previous run with the same options are merged
+    from the cache instead of being parsed again.
+    """
+
+    def __init__(self, config: ConfigManager, pipeline_manager: PipelineManager, cache: AggregateCache):
+        self.__config = config
+        self.__pipeline_manager = pipeline_manager
+        self.__cache = cache
+        self.__partial_run: Optional[PartialRun] = None
+        # Rows of the files already parsed, plus the file being parsed
+        self.__rows_read = 0
+        self.__data_source = None
+
+    def process_data(self):
+        with InterruptHandler() as interrupt:
+            self.__process_files(interrupt)
+
+    def __process_files(self, interrupt: InterruptHandler):
+        config = self.__config
+        cache = self.__cache
+        options = config.snapshot_options
+        config_hash = cache.config_hash(options)
+
+        f_total = len(config.input_files)
+        for f_current, input_file in enumerate(config.input_files, start=1):
+            if interrupt.requested:
+                self.__partial_run = PartialRun([], config.input_files[f_current - 1:])
+                break
+
+            key = cache.key_for(input_file, config_hash)
+            state = cache.get(key)
+            if state is not None:
+                print(f"Cached: {input_file} ({f_current} of {f_total})")
+            else:
+                # Fresh pipeline so the file's state can be cached on its own
+                file_pipeline_manager = PipelineManager(config)
+                pipeline = file_pipeline_manager.get_pipeline()
+                data_source = DataSourceManager(config, [input_file]).get_data_source()
+                self.__data_source = data_source
+                for message_data in data_source.read_data():
+                    pipeline.handle(message_data)
+                    if interrupt.requested:
+                        break
+                self.__rows_read += data_source.get_rows_read()
+                self.__data_source = None
+
+                state = file_pipeline_manager.get_state()
+                self.__pipeline_manager.merge_stage_timings(file_pipeline_manager)
+                if interrupt.requested:
+                    self.__partial_run = PartialRun([input_file], config.input_files[f_current:])
+                # Never cache a partially read file
+                elif not data_source.get_failed_files():
+                    cache.put(key, options, state)
+
+            self.__pipeline_manager.merge_state(state)
+            if self.__partial_run is not None:
+                break
+
+        print(f"Aggregate cache: {cache.get_hits()} hit(s), {cache.get_misses()} miss(es)")
+
+    def get_rows_read(self) -> int:
+        """Rows parsed by this run, files merged from the cache are not read."""
+        data_source = self.__data_source
+        return self.__rows_read + (data_source.get_rows_read() if data_source is not None else 0)
+
+    def get_partial_run(self) -> Optional[PartialRun]:
+        """
+        :return: The unfinished input files if processing was interrupted, otherwise None.
+        """
+        return self.__partial_run
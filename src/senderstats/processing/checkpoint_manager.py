@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from senderstats.interfaces.resumable import Resumable
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.snapshot_manager import Snapshot, SnapshotManager
+
+
+class CheckpointManager:
+    """
+    Periodically persists the pipeline state together with the read progress of the data source.
+
+    The state is captured on the processing thread at a row boundary, serializing and
+    writing it happens on a background thread. The capture copies the state of every key,
+    so the pause grows with the number of distinct keys: for very large aggregates pick a
+    longer checkpoint interval.
+    Checkpoints use the snapshot format, so a checkpoint can also be merged like a snapshot.
+    """
+
+    def __init__(self, path: str, interval: float, options: Dict[str, Any]):
+        self.__path = path
+        self.__interval = interval
+        self.__options = options
+        self.__next_due = time.monotonic() + interval
+        self.__writer: Optional[threading.Thread] = None
+        self.__saved = 0
+
+    def is_due(self) -> bool:
+        return time.monotonic() >= self.__next_due
+
+    def save(self, pipeline_manager: PipelineManager, data_source: Resumable, wait: bool = False) -> bool:
+        """
+        Capture the current state and write it in the background.
+
+        :return: False if the previous checkpoint is still being written and wait is False.
+        """
+        if self.__writer is not None and self.__writer.is_alive():
+            if not wait:
+                return False
+            self.__writer.join()
+
+        state = pipeline_manager.get_state()
+        progress = data_source.get_progress()
+        self.__writer = threading.Thread(target=self.__write, args=(state, progress),
+                                         name="senderstats-checkpoint", daemon=True)
+        self.__writer.start()
+        self.__next_due = time.monotonic() + self.__interval
+        if wait:
+            self.__writer.join()
+        return True
+
+    def __write(self, state: Dict[str, Any], progress: Dict[str, Any]) -> None:
+        try:
+            SnapshotManager.save(self.__path, self.__options, state, progress)
+            self.__saved += 1
+        except OSError as e:
+            print(f"Unable to write checkpoint {self.__path}: {e}")
+
+    def resume(self, pipeline_manager: PipelineManager, data_source: Resumable) -> Optional[Snapshot]:
+        """
+        Load the checkpoint into the pipeline and position the data source after the recorded progress.
+
+        :return: The checkpoint, or None if no checkpoint exists yet.
+        """
+        if not os.path.exists(self.__path):
+            print(f"No checkpoint found at {self.__path}, starting from the beginning")
+            return None
+
+        snapshot = SnapshotManager.load(self.__path)
+        if snapshot.progress is None:
+            raise ValueError(f"{self.__path} is a snapshot, not a checkpoint")
+
+        changed = sorted(key for key in set(self.__options) | set(snapshot.options)
+                         if self.__options.get(key) != snapshot.options.get(key))
+        if changed:
+            raise ValueError(f"Options differ from the checkpointed run: {', '.join(changed)}")
+
+        data_source.resume(snapshot.progress)
+        pipeline_manager.merge_state(snapshot.state)
+        print(f"Resuming from checkpoint created {snapshot.created}, "
+              f"{len(snapshot.progress['completed'])} file(s) already processed")
+        return snapshot
+
+    def get_saved_count(self) -> int:
+        return self.__saved
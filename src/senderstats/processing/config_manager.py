@@ -2,10 +2,20 @@ import os
 from glob import glob
 from typing import List
 
+from senderstats.common.agg.report import RowSelection
 from senderstats.common.defaults import DEFAULT_DOMAIN_EXCLUSIONS
 from senderstats.common.utils import print_list_with_title
+from senderstats.data.columnar_store import is_columnar_file
 from senderstats.data.data_source_type import DataSourceType
 
+# Arguments that only describe a single run and are never persisted with a snapshot
+_RUN_ONLY_ARGUMENTS = ('debug', 'input_files', 'output_file', 'source_type', 'token', 'cluster_id', 'save_snapshot',
+                       'cache_dir', 'cache_max_size', 'cache_key', 'clear_cache',
+                       'checkpoint', 'checkpoint_interval', 'resume', 'streaming_report',
+                       'output_format', 'report_sort', 'report_top', 'report_min_messages', 'max_memory', 'spill_dir',
+                       'stage_timing', 'stage_timing_sample', 'run_manifest', 'profile', 'profile_sample',
+                       'memory_report', 'memory_trace', 'metrics_file', 'metrics_interval',
+                       'no_progress')
 
 class ConfigManager:
     def __init__(self, args):
@@ -17,6 +27,11 @@ class ConfigManager:
         self.token = args.token
         self.cluster_id = args.cluster_id
 
+        # Files written by senderstats ingest are read with the columnar data source
+        if self.source_type == DataSourceType.CSV and self.input_files and all(
+                is_columnar_file(f) for f in self.input_files):
+            self.source_type = DataSourceType.COLUMNAR
+
         # Output configurations
         self.output_file = args.output_file
 
@@ -45,6 +60,23 @@ class ConfigManager:
         self.no_empty_hfrom = args.no_empty_hfrom
         self.sample_subject = args.sample_subject
         self.with_probability = args.with_probability
+        self.two_pass = args.two_pass
+        self.two_pass_min_per_day = args.two_pass_min_per_day
+        self.sketch_keys = args.sketch_keys
+        self.max_memory = args.max_memory
+        self.spill_dir = args.spill_dir
+
+        # Instrumentation options
+        self.progress = not args.no_progress
+        self.stage_timing = args.stage_timing
+        self.stage_timing_sample = args.stage_timing_sample
+        self.run_manifest = args.run_manifest
+        self.profile = args.profile
+        self.profile_sample = args.profile_sample
+        self.memory_report = args.memory_report or args.memory_trace
+        self.memory_trace = args.memory_trace
+        self.metrics_file = args.metrics_file
+        self.metrics_interval = args.metrics_interval
 
         if args.no_default_exclude_ips:
             self.exclude_ips = ConfigManager.__prepare_exclusions(args.exclude_ips)
@@ -62,6 +94,26 @@ class ConfigManager:
         self.date_format = args.date_format
         self.no_default_exclude_domains = args.no_default_exclude_domains
 
+        # Snapshot configurations
+        self.save_snapshot = args.save_snapshot
+        self.snapshot_options = ConfigManager.__prepare_snapshot_options(args)
+
+        # Aggregate cache configurations
+        self.cache_dir = args.cache_dir
+        self.cache_max_size = args.cache_max_size
+        self.cache_key = args.cache_key
+        self.clear_cache = args.clear_cache
+
+        # Checkpoint configurations
+        self.checkpoint = args.checkpoint
+        self.checkpoint_interval = args.checkpoint_interval
+        self.resume = args.resume
+
+        # Report configurations
+        self.output_format = args.output_format
+        self.streaming_report = args.streaming_report
+        self.row_selection = RowSelection(args.report_sort, args.report_top, args.report_min_messages)
+
     @staticmethod
     def __prepare_input_files(input_files: List[str]):
         if input_files:
@@ -71,6 +123,13 @@ class ConfigManager:
             file_names = set(file_names)
             return [file for file in file_names if os.path.isfile(file)]
 
+    @staticmethod
+    def __prepare_snapshot_options(args) -> dict:
+        return {
+            key: value for key, value in vars(args).items()
+            if key not in _RUN_ONLY_ARGUMENTS and isinstance(value, (bool, int, float, str, list, type(None)))
+        }
+
     @staticmethod
     def __prepare_exclusions(exclusions: List[str]):
         return sorted(list({item.casefold() for item in exclusions}))
@@ -91,7 +150,7 @@ class ConfigManager:
         return unique_domains
 
     def display_filter_criteria(self):
-        if self.source_type == DataSourceType.CSV:
+        if self.source_type in (DataSourceType.CSV, DataSourceType.COLUMNAR):
             print_list_with_title("Files to be processed:", self.input_files)
         print_list_with_title("IPs excluded from processing:", self.exclude_ips)
         print_list_with_title("Senders excluded from processing:", self.exclude_senders)
@@ -4,7 +4,7 @@ from senderstats.processing.config_manager import ConfigManager
 
 
 class CSVMapperManager:
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, keep_all_mappings: bool = False):
         self.__config = config
         default_field_mappings = {
             'mfrom': DEFAULT_MFROM_FIELD,
@@ -19,7 +19,8 @@ class CSVMapperManager:
         }
         self.__mapper = CSVMapper(default_field_mappings)
         self.__add_custom_mappings()
-        self.__remove_unnecessary_mappings()
+        if not keep_all_mappings:
+            self.__remove_unnecessary_mappings()
 
     def get_mapper(self) -> CSVMapper:
         return self.__mapper
@@ -1,3 +1,6 @@
+from typing import List, Optional
+
+from senderstats.data.columnar_data_source import ColumnarDataSource
 from senderstats.data.csv_data_source import CSVDataSource
 from senderstats.data.data_source_type import DataSourceType
 from senderstats.processing.config_manager import ConfigManager
@@ -5,12 +8,21 @@ from senderstats.processing.csv_mapper_manager import CSVMapperManager
 
 
 class DataSourceManager:
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, input_files: Optional[List[str]] = None):
+        input_files = config.input_files if input_files is None else input_files
+        self.__input_files = input_files
         if config.source_type == DataSourceType.CSV:
             self.__mapper_manager = CSVMapperManager(config)
-            self.__data_source = CSVDataSource(config.input_files, self.__mapper_manager.get_mapper())
+            self.__data_source = CSVDataSource(input_files, self.__mapper_manager.get_mapper(),
+                                               track_offsets=bool(config.checkpoint))
+        elif config.source_type == DataSourceType.COLUMNAR:
+            self.__mapper_manager = CSVMapperManager(config)
+            self.__data_source = ColumnarDataSource(input_files, self.__mapper_manager.get_mapper())
         else:
-            raise ValueError("Unsupported source type. Use SourceType.CSV")
+            raise ValueError("Unsupported source type. Use SourceType.CSV or SourceType.COLUMNAR")
+
+    def get_input_files(self) -> List[str]:
+        return self.__input_files
 
     def get_data_source(self):
         return self.__data_source
@@ -1,4 +1,7 @@
+from typing import Any, Dict
+
 from senderstats.core.filters import *
+from senderstats.interfaces.mergeable import Mergeable
 from senderstats.processing.config_manager import ConfigManager
 
 
@@ -12,6 +15,28 @@ class FilterManager:
         self.restrict_senders_filter = RestrictDomainFilter(config.restrict_domains)
         self.exclude_duplicate_message_id_filter = ExcludeDuplicateMessageIdFilter()
 
+    def __named_filters(self) -> Dict[str, Mergeable]:
+        return {
+            'exclude_empty_sender': self.exclude_empty_sender_filter,
+            'exclude_invalid_size': self.exclude_invalid_size_filter,
+            'exclude_domain': self.exclude_domain_filter,
+            'exclude_ip': self.exclude_ip_filter,
+            'exclude_senders': self.exclude_senders_filter,
+            'restrict_senders': self.restrict_senders_filter,
+            'exclude_duplicate_message_id': self.exclude_duplicate_message_id_filter,
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        return {name: f.get_state() for name, f in self.__named_filters().items()}
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        filters = self.__named_filters()
+        for name, filter_state in state.items():
+            filters[name].merge_state(filter_state)
+
+    def get_excluded_counts(self) -> Dict[str, int]:
+        return {name: f.get_excluded_count() for name, f in self.__named_filters().items()}
+
     def display_summary(self):
         print()
         print("Messages excluded by empty sender:", self.exclude_empty_sender_filter.get_excluded_count())
@@ -0,0 +1,99 @@
+import csv
+import os
+from datetime import datetime, timezone
+from glob import glob
+from typing import List
+
+from senderstats.common.utils import print_list_with_title
+from senderstats.core.transformers import DateTransform
+from senderstats.data.columnar_store import ColumnarWriter
+from senderstats.data.csv_data_source import CSVDataSource
+from senderstats.processing.csv_mapper_manager import CSVMapperManager
+
+# Fields every report needs, the remaining fields are only stored when the inputs have them
+_REQUIRED_FIELDS = ('mfrom', 'msgsz', 'date')
+
+
+class IngestManager:
+    """
+    Parses smart search CSV files once and stores the mapped columns in a columnar file.
+
+    All mappings are kept (not only those the current report options need) so the
+    columnar file can be re-analyzed with any combination of report flags.
+    """
+
+    def __init__(self, args):
+        self.__input_files = IngestManager.__prepare_input_files(args.input_files)
+        self.__output_file = args.output_file
+        self.__date_format = args.date_format
+        self.__mapper = CSVMapperManager(args, keep_all_mappings=True).get_mapper()
+        self.__skipped_rows = 0
+
+    @staticmethod
+    def __prepare_input_files(input_files: List[str]) -> List[str]:
+        file_names = set()
+        for f in input_files:
+            file_names.update(glob(f))
+        return sorted(file for file in file_names if os.path.isfile(file))
+
+    def get_input_files(self) -> List[str]:
+        return self.__input_files
+
+    def get_skipped_rows(self) -> int:
+        """
+        :return: Number of rows not stored because their date could not be parsed.
+        """
+        return self.__skipped_rows
+
+    def __read_headers(self, input_file: str) -> List[str]:
+        with open(input_file, mode="r", encoding="utf-8-sig", newline="") as file:
+            return next(csv.reader(file), [])
+
+    def __drop_missing_fields(self):
+        headers = [set(self.__read_headers(f)) for f in self.__input_files]
+        for field, csv_field in self.__mapper.get_mappings().items():
+            if all(csv_field in h for h in headers):
+                continue
+            if field in _REQUIRED_FIELDS:
+                raise ValueError(f"Required header '{csv_field}' not found in all input files.")
+            print(f"Header '{csv_field}' not found in all input files, '{field}' will not be stored.")
+            self.__mapper.delete_mapping(field)
+
+    def ingest(self) -> int:
+        """
+        Create the columnar file.
+
+        :return: Number of rows stored.
+        """
+        print_list_with_title("Files to be ingested:", self.__input_files)
+        self.__drop_missing_fields()
+
+        mappings = self.__mapper.get_mappings()
+        writer = ColumnarWriter(list(mappings))
+        date_transform = DateTransform(self.__date_format)
+
+        data_source = CSVDataSource(self.__input_files, self.__mapper)
+        for message_data in data_source.read_data():
+            # Dates are stored parsed, a row without a usable date can not be stored
+            try:
+                message_data = date_transform.transform(message_data)
+            except ValueError:
+                self.__skipped_rows += 1
+                continue
+            writer.add(message_data)
+
+        if data_source.get_failed_files():
+            raise ValueError(f"Unable to read: {', '.join(data_source.get_failed_files())}")
+
+        sources = []
+        for input_file in self.__input_files:
+            st = os.stat(input_file)
+            sources.append({'path': os.path.abspath(input_file), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+
+        writer.write(self.__output_file, {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'sources': sources,
+            'mappings': mappings,
+            'date_format': self.__date_format,
+        })
+        return writer.get_row_count()
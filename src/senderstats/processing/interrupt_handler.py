@@ -0,0 +1,58 @@
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+@dataclass(frozen=True)
+class PartialRun:
+    """Input files that were not fully processed because the run was interrupted."""
+    partial_files: List[str]
+    unprocessed_files: List[str]
+
+    @staticmethod
+    def from_progress(input_files: List[str], progress: Dict[str, Any]) -> "PartialRun":
+        completed = {entry['path'] for entry in progress['completed']}
+        current = progress['current']['path'] if progress['current'] else None
+        partial, unprocessed = [], []
+        for input_file in input_files:
+            path = os.path.abspath(input_file)
+            if path == current:
+                partial.append(input_file)
+            elif path not in completed:
+                unprocessed.append(input_file)
+        return PartialRun(partial, unprocessed)
+
+
+class InterruptHandler:
+    """
+    Turns the first Ctrl-C into a stop request so processing can end at a row boundary.
+
+    A second Ctrl-C raises KeyboardInterrupt as usual. Signal handlers can only be installed
+    from the main thread, elsewhere (e.g. the GUI worker thread) this is a no-op.
+    """
+
+    def __init__(self):
+        self.requested = False
+        self.__previous = None
+        self.__installed = False
+
+    def __enter__(self) -> "InterruptHandler":
+        if threading.current_thread() is threading.main_thread():
+            self.__previous = signal.signal(signal.SIGINT, self.__handle)
+            self.__installed = True
+        return self
+
+    def __handle(self, signum, frame):
+        if self.requested:
+            raise KeyboardInterrupt
+        self.requested = True
+        print()
+        print("Interrupt received, stopping after the current row (press Ctrl-C again to abort)")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__installed:
+            signal.signal(signal.SIGINT, self.__previous)
+            self.__installed = False
+        return False
@@ -0,0 +1,121 @@
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from senderstats.common.agg.memory import AggregatorMemory, measure_aggregator
+from senderstats.interfaces.keyed import Keyed
+from senderstats.processing.pipeline_manager import PipelineManager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allocation sites listed per tracemalloc snapshot
+_TOP_ALLOCATIONS = 5
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _mb(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+
+class MemoryReport:
+    """
+    Estimates which aggregator holds the memory of a run.
+
+    measure() samples the aggregates of every keyed processor for the bytes per key of the keys,
+    the MessageAgg objects and their subject pattern tables. With trace=True, tracemalloc runs
+    for the whole run and a snapshot is taken whenever an input file is complete, recording
+    traced memory, RSS and the allocation sites that grew most against the input read so far.
+
+    Keys and sizes cover the aggregates in memory. With --max-memory, the aggregates spilled to
+    disk are only counted, as spilled records.
+    """
+
+    def __init__(self, pipeline_manager: PipelineManager, trace: bool = False):
+        self.__pipeline_manager = pipeline_manager
+        self.__trace = trace
+        self.__input_bytes = 0
+        self.__snapshot: Optional[tracemalloc.Snapshot] = None
+        self.file_snapshots: List[Dict[str, Any]] = []
+        self.aggregators: Dict[str, AggregatorMemory] = {}
+        if trace:
+            tracemalloc.start()
+
+    def file_completed(self, path: str) -> None:
+        """File listener of the data source, records memory at every file boundary."""
+        self.__input_bytes += os.path.getsize(path)
+        entry = {
+            'file': path,
+            'input_bytes': self.__input_bytes,
+            'rss_bytes': current_rss_bytes(),
+            'keys': {type(p).__name__: len(p.get_aggregator().data) for p in self.__keyed_processors()},
+        }
+        spilled = {type(p).__name__: p.get_aggregator().spilled_records for p in self.__keyed_processors()
+                   if getattr(p.get_aggregator(), 'spilled_records', 0)}
+        if spilled:
+            entry['spilled_records'] = spilled
+        if self.__trace:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            entry['traced_bytes'] = current
+            entry['traced_peak_bytes'] = peak
+            if self.__snapshot is not None:
+                growth = snapshot.compare_to(self.__snapshot, 'lineno')[:_TOP_ALLOCATIONS]
+            else:
+                growth = snapshot.statistics('lineno')[:_TOP_ALLOCATIONS]
+            entry['top_allocations'] = [
+                {'site': str(stat.traceback[0]), 'bytes': stat.size,
+                 'growth_bytes': getattr(stat, 'size_diff', stat.size)}
+                for stat in growth
+            ]
+            self.__snapshot = snapshot
+        self.file_snapshots.append(entry)
+
+    def __keyed_processors(self) -> List[Keyed]:
+        return [p for p in self.__pipeline_manager.get_active_processors() if isinstance(p, Keyed)]
+
+    def measure(self) -> None:
+        self.aggregators = {type(p).__name__: measure_aggregator(p.get_aggregator())
+                            for p in self.__keyed_processors()}
+        if self.__trace:
+            tracemalloc.stop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'peak_rss_bytes': peak_rss_bytes(),
+            'aggregators': {name: memory.to_dict() for name, memory in self.aggregators.items()},
+            'files': self.file_snapshots,
+        }
+
+    def display_summary(self):
+        print()
+        print(f"Memory by aggregator (peak RSS {_mb(peak_rss_bytes())}):")
+        print(f"{'Processor':<24} {'Keys':>10} {'Key (B)':>9} {'Agg (B)':>9} {'Patterns (B)':>13} {'Estimated':>12}")
+        for name, memory in self.aggregators.items():
+            print(f"{name:<24} {memory.keys:>10} {memory.key_bytes:>9.0f} {memory.agg_bytes:>9.0f} "
+                  f"{memory.pattern_bytes:>13.0f} {_mb(memory.total_bytes):>12}")
+        spilled = sum(memory.spilled_records for memory in self.aggregators.values())
+        if spilled:
+            print(f"Keys and sizes exclude the {spilled} aggregate(s) spilled to disk "
+                  f"(a key spilled more than once counts once per spill)")
+        for entry in self.file_snapshots:
+            traced = f", traced {_mb(entry['traced_bytes'])}" if 'traced_bytes' in entry else ""
+            print(f"After {entry['file']}: input {_mb(entry['input_bytes'])}, RSS {_mb(entry['rss_bytes'])}{traced}")
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from senderstats.processing.aggregate_cache import AggregateCache
+from senderstats.processing.memory_report import peak_rss_bytes
+from senderstats.processing.pipeline_manager import PipelineManager
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Family:
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.samples: List[str] = []
+
+    def add(self, value: float, **labels: str) -> "_Family":
+        suffix = '_total' if self.metric_type == 'counter' else ''
+        label_text = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+        if label_text:
+            label_text = '{' + label_text + '}'
+        self.samples.append(f"{self.name}{suffix}{label_text} {value}")
+        return self
+
+    def lines(self) -> List[str]:
+        return [f"# TYPE {self.name} {self.metric_type}", f"# HELP {self.name} {self.help_text}", *self.samples]
+
+
+class MetricsExporter:
+    """
+    Writes the statistics of a run as an OpenMetrics text file, e.g. for the node_exporter textfile collector.
+
+    The file is rewritten every interval seconds by a background thread while the run is processing
+    and once more when it ends. It is replaced atomically, so a scraper never reads a partial file.
+    Rows read come from rows_read, usually the data source's counter. Per stage rows and times are
+    only written when the pipeline has a stage timer (--stage-timing).
+    """
+
+    def __init__(self, path: str, pipeline_manager: PipelineManager, rows_read: Callable[[], int],
+                 interval: float = 0, cache: Optional[AggregateCache] = None):
+        self.__path = path
+        self.__pipeline_manager = pipeline_manager
+        self.__rows_read = rows_read
+        self.__interval = interval
+        self.__cache = cache
+        self.__started = time.time()
+        self.__start_time = time.perf_counter()
+        self.__finished = False
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.__interval > 0:
+            self.__thread = threading.Thread(target=self.__run, name="senderstats-metrics", daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        while not self.__stop.wait(self.__interval):
+            self.__write()
+
+    def finish(self) -> bool:
+        """
+        Stop the periodic writes and write the final statistics.
+
+        :return: False if the file could not be written.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        self.__finished = True
+        return self.__write()
+
+    def __write(self) -> bool:
+        # A metrics file that can not be written must not end the run or the report
+        try:
+            self.write()
+            return True
+        except OSError as e:
+            print(f"Unable to write metrics {self.__path}: {e}")
+            return False
+
+    def render(self) -> str:
+        elapsed = time.perf_counter() - self.__start_time
+        families = []
+
+        rows = self.__rows_read()
+        families.append(_Family('senderstats_rows', 'counter', 'Rows read from the input files.').add(rows))
+        families.append(_Family('senderstats_rows_per_second', 'gauge', 'Rows read per second of run time.')
+                        .add(rows / elapsed if elapsed > 0 else 0.0))
+
+        excluded = _Family('senderstats_excluded_messages', 'counter', 'Messages excluded by each filter.')
+        for name, count in self.__pipeline_manager.get_filter_manager().get_excluded_counts().items():
+            excluded.add(count, filter=name)
+        families.append(excluded)
+
+        stage_timer = self.__pipeline_manager.get_stage_timer()
+        if stage_timer is not None:
+            stage_rows = _Family('senderstats_stage_rows', 'counter', 'Rows that entered each pipeline stage.')
+            stage_seconds = _Family('senderstats_stage_seconds', 'counter',
+                                    'Estimated seconds spent in each pipeline stage, excluding later stages.')
+            for stage in stage_timer.get_stages():
+                stage_rows.add(stage.rows_in, stage=stage.name, kind=stage.kind)
+                stage_seconds.add(stage.estimated_seconds, stage=stage.name, kind=stage.kind)
+            families += [stage_rows, stage_seconds]
+
+        if self.__cache is not None:
+            hits, misses = self.__cache.get_hits(), self.__cache.get_misses()
+            families.append(_Family('senderstats_cache_hits', 'counter', 'Input files read from the aggregate cache.')
+                            .add(hits))
+            families.append(_Family('senderstats_cache_misses', 'counter', 'Input files not found in the aggregate cache.')
+                            .add(misses))
+            families.append(_Family('senderstats_cache_hit_ratio', 'gauge', 'Share of input files read from the cache.')
+                            .add(hits / (hits + misses) if hits + misses else 0.0))
+
+        peak_rss = peak_rss_bytes()
+        if peak_rss is not None:
+            families.append(_Family('senderstats_peak_rss_bytes', 'gauge', 'Peak resident memory of the run.')
+                            .add(peak_rss))
+
+        families.append(_Family('senderstats_run_start_timestamp_seconds', 'gauge', 'Unix time the run started.')
+                        .add(self.__started))
+        families.append(_Family('senderstats_run_elapsed_seconds', 'gauge', 'Seconds since the run started.')
+                        .add(elapsed))
+        families.append(_Family('senderstats_run_finished', 'gauge', '1 once the run has ended, 0 while it runs.')
+                        .add(int(self.__finished)))
+
+        lines = [line for family in families for line in family.lines()]
+        return '\n'.join(lines) + '\n# EOF\n'
+
+    def write(self) -> None:
+        temp_path = f"{self.__path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, self.__path)
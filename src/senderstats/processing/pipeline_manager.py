@@ -1,12 +1,19 @@
+from typing import Optional
+
 from senderstats.interfaces import Filter, Processor, Transform
 from senderstats.processing.config_manager import ConfigManager
 from senderstats.processing.filter_manager import FilterManager
 from senderstats.processing.processor_manager import ProcessorManager
+from senderstats.processing.stage_timer import PipelineTimer
 from senderstats.processing.transform_manager import TransformManager
 
 
 class PipelineManager:
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, detail_filter: Optional[Filter] = None):
+        """
+        :param detail_filter: Only normalize the subjects of messages this filter passes and skip
+            the others. Used for the second pass of --two-pass, where all key transforms run first.
+        """
         self.__filter_manager = FilterManager(config)
         self.__transform_manager = TransformManager(config)
         self.__processor_manager = ProcessorManager(config)
@@ -30,22 +37,31 @@ class PipelineManager:
         if config.exclude_dup_msgids:
             pipeline.set_next(self.__filter_manager.exclude_duplicate_message_id_filter)
 
-        if config.sample_subject:
-            pipeline.set_next(self.__transform_manager.subject_transform)
-
         pipeline.set_next(self.__transform_manager.date_transform)
 
-        pipeline.set_next(self.__processor_manager.mfrom_processor)
-
+        # Every key is known before the subject step, so it can skip messages by key
         if config.gen_hfrom or config.gen_alignment:
             pipeline.set_next(self.__transform_manager.hfrom_transform)
+        if config.gen_rpath:
+            pipeline.set_next(self.__transform_manager.rpath_transform)
+        if config.gen_msgid:
+            pipeline.set_next(self.__transform_manager.msgid_transform)
+
+        if detail_filter is not None:
+            pipeline.set_next(detail_filter)
+            pipeline.set_next(self.__transform_manager.subject_transform)
+        elif config.two_pass:
+            # The first pass only counts, subjects are normalized in the second pass
+            pipeline.set_next(self.__transform_manager.blank_subject_transform)
+        elif config.sample_subject:
+            pipeline.set_next(self.__transform_manager.subject_transform)
+
+        pipeline.set_next(self.__processor_manager.mfrom_processor)
         if config.gen_hfrom:
             pipeline.set_next(self.__processor_manager.hfrom_processor)
         if config.gen_rpath:
-            pipeline.set_next(self.__transform_manager.rpath_transform)
             pipeline.set_next(self.__processor_manager.rpath_processor)
         if config.gen_msgid:
-            pipeline.set_next(self.__transform_manager.msgid_transform)
             pipeline.set_next(self.__processor_manager.msgid_processor)
         if config.gen_alignment:
             pipeline.set_next(self.__processor_manager.align_processor)
@@ -53,6 +69,10 @@ class PipelineManager:
         pipeline.set_next(self.__processor_manager.date_processor)
 
         self.__pipeline = pipeline
+        if config.stage_timing:
+            self.__stage_timer = PipelineTimer(pipeline, config.stage_timing_sample)
+        else:
+            self.__stage_timer = None
 
     def get_pipeline(self):
         return self.__pipeline
@@ -66,6 +86,24 @@ class PipelineManager:
     def get_transform_manager(self):
         return self.__transform_manager
 
+    def get_stage_timer(self) -> Optional[PipelineTimer]:
+        return self.__stage_timer
+
+    def merge_stage_timings(self, other: "PipelineManager") -> None:
+        """Add the stage timings of a pipeline built from the same configuration."""
+        if self.__stage_timer is not None and other.__stage_timer is not None:
+            self.__stage_timer.merge(other.__stage_timer)
+
+    def get_state(self) -> dict:
+        return {
+            'filters': self.__filter_manager.get_state(),
+            'processors': self.__processor_manager.get_state(),
+        }
+
+    def merge_state(self, state: dict) -> None:
+        self.__filter_manager.merge_state(state['filters'])
+        self.__processor_manager.merge_state(state['processors'])
+
     def get_active_processors(self) -> list:
         processors = []
         current = self.__pipeline
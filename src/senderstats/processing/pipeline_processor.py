@@ -1,12 +1,58 @@
+from typing import Optional
+
+from senderstats.processing.checkpoint_manager import CheckpointManager
 from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.interrupt_handler import InterruptHandler, PartialRun
 from senderstats.processing.pipeline_manager import PipelineManager
 
+# Rows between clock checks when checkpointing is enabled (must be a power of 2)
+_CHECKPOINT_CHECK_ROWS = 1024
+
 
 class PipelineProcessor:
-    def __init__(self, data_source_manager: DataSourceManager, pipeline_builder: PipelineManager):
+    def __init__(self, data_source_manager: DataSourceManager, pipeline_builder: PipelineManager,
+                 checkpoint_manager: Optional[CheckpointManager] = None):
+        self.__input_files = data_source_manager.get_input_files()
         self.__data_source = data_source_manager.get_data_source()
+        self.__pipeline_manager = pipeline_builder
         self.__pipeline = pipeline_builder.get_pipeline()
+        self.__checkpoint_manager = checkpoint_manager
+        self.__partial_run: Optional[PartialRun] = None
 
     def process_data(self):
-        for message_data in self.__data_source.read_data():
-            self.__pipeline.handle(message_data)
+        with InterruptHandler() as interrupt:
+            if self.__checkpoint_manager is not None:
+                self.__process_data_with_checkpoints(interrupt)
+            else:
+                for message_data in self.__data_source.read_data():
+                    self.__pipeline.handle(message_data)
+                    if interrupt.requested:
+                        break
+
+        if interrupt.requested:
+            self.__partial_run = PartialRun.from_progress(self.__input_files, self.__data_source.get_progress())
+
+    def __process_data_with_checkpoints(self, interrupt: InterruptHandler):
+        checkpoint_manager = self.__checkpoint_manager
+        data_source = self.__data_source
+        pipeline = self.__pipeline
+        mask = _CHECKPOINT_CHECK_ROWS - 1
+
+        for count, message_data in enumerate(data_source.read_data(), start=1):
+            pipeline.handle(message_data)
+            if interrupt.requested:
+                break
+            # The data source has not advanced yet, so its progress matches the captured state
+            if not count & mask and checkpoint_manager.is_due():
+                checkpoint_manager.save(self.__pipeline_manager, data_source)
+
+        checkpoint_manager.save(self.__pipeline_manager, data_source, wait=True)
+
+    def get_rows_read(self) -> int:
+        return self.__data_source.get_rows_read()
+
+    def get_partial_run(self) -> Optional[PartialRun]:
+        """
+        :return: The unfinished input files if processing was interrupted, otherwise None.
+        """
+        return self.__partial_run
@@ -1,12 +1,35 @@
+from typing import Any, Dict
+
+from senderstats.common.agg.spill import MemoryBudget
 from senderstats.core.processors import *
+from senderstats.interfaces.mergeable import Mergeable
 from senderstats.processing.config_manager import ConfigManager
 
 
 class ProcessorManager:
     def __init__(self, config: ConfigManager):
-        self.mfrom_processor = MFromProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug)
-        self.hfrom_processor = HFromProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug)
-        self.msgid_processor = MIDProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug)
-        self.rpath_processor = RPathProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug)
-        self.align_processor = AlignmentProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug)
+        self.memory_budget = MemoryBudget(config.max_memory * 1024 * 1024, config.spill_dir) if config.max_memory else None
+        self.mfrom_processor = MFromProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug, row_selection=config.row_selection, sketch_keys=config.sketch_keys, memory_budget=self.memory_budget)
+        self.hfrom_processor = HFromProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug, row_selection=config.row_selection, sketch_keys=config.sketch_keys, memory_budget=self.memory_budget)
+        self.msgid_processor = MIDProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug, row_selection=config.row_selection, sketch_keys=config.sketch_keys, memory_budget=self.memory_budget)
+        self.rpath_processor = RPathProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug, row_selection=config.row_selection, sketch_keys=config.sketch_keys, memory_budget=self.memory_budget)
+        self.align_processor = AlignmentProcessor(config.sample_subject, config.with_probability, config.expand_recipients, debug=config.debug, row_selection=config.row_selection, sketch_keys=config.sketch_keys, memory_budget=self.memory_budget)
         self.date_processor = DateProcessor(config.expand_recipients)
+
+    def __named_processors(self) -> Dict[str, Mergeable]:
+        return {
+            'mfrom': self.mfrom_processor,
+            'hfrom': self.hfrom_processor,
+            'msgid': self.msgid_processor,
+            'rpath': self.rpath_processor,
+            'align': self.align_processor,
+            'date': self.date_processor,
+        }
+
+    def get_state(self) -> Dict[str, Any]:
+        return {name: p.get_state() for name, p in self.__named_processors().items()}
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        processors = self.__named_processors()
+        for name, processor_state in state.items():
+            processors[name].merge_state(processor_state)
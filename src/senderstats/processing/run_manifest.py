@@ -0,0 +1,54 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from senderstats.cli_args import get_version
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.interrupt_handler import PartialRun
+from senderstats.processing.memory_report import MemoryReport
+from senderstats.processing.pipeline_manager import PipelineManager
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat(timespec='seconds')
+
+
+class RunManifest:
+    """
+    JSON record of a run: version, options, inputs, timings and filter counts.
+
+    Created when the run starts and written when it ends, so the elapsed time covers
+    processing and report generation.
+    """
+
+    def __init__(self, config: ConfigManager):
+        self.__config = config
+        self.__started = time.time()
+        self.__start_time = time.perf_counter()
+
+    def build(self, pipeline_manager: PipelineManager, partial_run: Optional[PartialRun] = None,
+              memory_report: Optional[MemoryReport] = None) -> Dict[str, Any]:
+        config = self.__config
+        stage_timer = pipeline_manager.get_stage_timer()
+        return {
+            'version': get_version(),
+            'started': _timestamp(self.__started),
+            'finished': _timestamp(time.time()),
+            'elapsed_seconds': round(time.perf_counter() - self.__start_time, 6),
+            'input_files': [
+                {'path': f, 'size': os.path.getsize(f) if os.path.isfile(f) else None} for f in config.input_files
+            ],
+            'output_file': config.output_file,
+            'options': config.snapshot_options,
+            'interrupted': partial_run is not None,
+            'filters': pipeline_manager.get_filter_manager().get_excluded_counts(),
+            'stage_timing': stage_timer.to_dict() if stage_timer is not None else None,
+            'memory': memory_report.to_dict() if memory_report is not None else None,
+        }
+
+    def write(self, path: str, pipeline_manager: PipelineManager, partial_run: Optional[PartialRun] = None,
+              memory_report: Optional[MemoryReport] = None) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.build(pipeline_manager, partial_run, memory_report), f, indent=2)
@@ -0,0 +1,142 @@
+import cProfile
+import os
+import pstats
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from senderstats.interfaces import Handler
+
+# Stacks deeper than this are cut off, cProfile only keeps caller/callee pairs so every level is a guess
+_MAX_STACK_DEPTH = 64
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _frame_name(func: FunctionKey) -> str:
+    filename, line, name = func
+    if filename == '~':
+        # Built-in functions have no file, name is e.g. "<method 'split' of 'str' objects>"
+        return name.replace(';', ',')
+    return f"{os.path.basename(filename)}:{line}:{name}".replace(';', ',')
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """
+    Convert profile statistics to collapsed stack lines ("a;b;c <microseconds>").
+
+    cProfile records call pairs rather than full stacks, so stacks are rebuilt from the
+    call graph and the time of a function is split between its callers in proportion
+    to the time each caller spent in it. Recursive calls are not expanded.
+    """
+    raw = stats.stats
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, caller_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, caller_ct))
+
+    weights: Dict[str, int] = {}
+
+    def walk(func: FunctionKey, stack: List[str], share: float):
+        tt = raw[func][2]
+        stack.append(_frame_name(func))
+        self_time = int(tt * share * 1e6)
+        if self_time > 0:
+            key = ';'.join(stack)
+            weights[key] = weights.get(key, 0) + self_time
+        if len(stack) < _MAX_STACK_DEPTH:
+            for callee, edge_ct in callees.get(func, ()):
+                callee_ct = raw[callee][3]
+                # Branches worth less than a microsecond are dropped, they would not show up anyway
+                if share * edge_ct >= 1e-6 and _frame_name(callee) not in stack:
+                    walk(callee, stack, share * edge_ct / callee_ct)
+        stack.pop()
+
+    for func, (_, _, _, _, callers) in raw.items():
+        if not callers:
+            walk(func, [], 1.0)
+
+    return [f"{stack} {weight}" for stack, weight in weights.items()]
+
+
+class _SampledHandle:
+    """Replaces the pipeline head's handle, profiles reading and handling one row in sample_every."""
+
+    def __init__(self, profile: cProfile.Profile, handle, sample_every: int):
+        self.__profile = profile
+        self.__handle = handle
+        self.__sample_every = sample_every
+        self.__rows = 0
+        self.enabled = False
+
+    def __call__(self, data):
+        try:
+            return self.__handle(data)
+        finally:
+            self.__rows += 1
+            # Enabled from the end of the previous row, so the next row is profiled while it is read
+            if (self.__rows + 1) % self.__sample_every == 0:
+                if not self.enabled:
+                    self.__profile.enable()
+                    self.enabled = True
+            elif self.enabled:
+                self.__profile.disable()
+                self.enabled = False
+
+
+class RunProfiler:
+    """
+    Profiles the phases of a run with cProfile.
+
+    Every phase is written to <directory>/<phase>.pstats, for pstats or snakeviz, and to
+    <directory>/<phase>.collapsed, which flamegraph tools (flamegraph.pl, speedscope) read.
+    With sample_every > 1, only one row in sample_every is profiled during ingestion.
+    """
+
+    def __init__(self, directory: str, sample_every: int = 1):
+        if sample_every <= 0:
+            raise ValueError("sample_every must be greater than 0")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sample_every = sample_every
+
+    @contextmanager
+    def phase(self, name: str, pipeline: Optional[Handler] = None):
+        """
+        Profile the block as phase name.
+
+        :param pipeline: Head of the handler chain the block runs, required for row sampling.
+        """
+        profile = cProfile.Profile()
+        if pipeline is None or self.sample_every == 1:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+        else:
+            # Another wrapper (e.g. --stage-timing) may already have replaced handle
+            wrapped = vars(pipeline).get('handle')
+            sampled = _SampledHandle(profile, pipeline.handle, self.sample_every)
+            pipeline.handle = sampled
+            try:
+                yield
+            finally:
+                if sampled.enabled:
+                    profile.disable()
+                if wrapped is None:
+                    del pipeline.handle
+                else:
+                    pipeline.handle = wrapped
+        self.__write(name, profile)
+
+    def __write(self, name: str, profile: cProfile.Profile) -> None:
+        try:
+            stats = pstats.Stats(profile)
+        except TypeError:
+            # Nothing was profiled, e.g. no row was sampled
+            print(f"No rows were profiled, {name}.pstats was not written")
+            return
+        stats.dump_stats(os.path.join(self.directory, f"{name}.pstats"))
+        with open(os.path.join(self.directory, f"{name}.collapsed"), 'w', encoding='utf-8') as f:
+            for line in collapsed_stacks(stats):
+                f.write(line + '\n')
@@ -0,0 +1,142 @@
+import io
+import os
+import pickle
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_MAGIC = b"SSSNAP\r\n"
+SNAPSHOT_VERSION = 1
+
+# Options that change the shape of the aggregates, snapshots can only be merged when these match
+AGGREGATION_OPTIONS = (
+    'gen_hfrom',
+    'gen_rpath',
+    'gen_alignment',
+    'gen_msgid',
+    'expand_recipients',
+    'no_display',
+    'remove_prvs',
+    'decode_srs',
+    'normalize_bounces',
+    'normalize_entropy',
+    'no_empty_hfrom',
+    'sample_subject',
+    'with_probability',
+    'sketch_keys',
+    # Filters, these decide which messages were counted
+    'exclude_domains',
+    'no_default_exclude_domains',
+    'exclude_ips',
+    'no_default_exclude_ips',
+    'exclude_senders',
+    'restrict_domains',
+    'exclude_dup_msgids',
+    'date_format',
+)
+
+_HEADER = struct.Struct("<8sH")
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    # Snapshots only ever contain builtin containers and datetimes
+    _ALLOWED = {
+        ("datetime", "datetime"),
+        ("datetime", "timezone"),
+        ("datetime", "timedelta"),
+        ("builtins", "set"),
+        ("builtins", "frozenset"),
+    }
+
+    def find_class(self, module, name):
+        if (module, name) in self._ALLOWED:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Unexpected object in snapshot: {module}.{name}")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: str
+    version: int
+    created: str
+    options: Dict[str, Any]
+    state: Dict[str, Any]
+    # Only set for checkpoints, records which input was consumed
+    progress: Optional[Dict[str, Any]] = None
+
+
+class SnapshotManager:
+    """
+    Reads and writes aggregate snapshot files.
+
+    Layout: 8 byte magic, little-endian uint16 format version, then a zlib compressed
+    pickle of plain data (dicts, lists, tuples, numbers, strings and datetimes).
+    """
+
+    @staticmethod
+    def save(path: str, options: Dict[str, Any], state: Dict[str, Any],
+             progress: Optional[Dict[str, Any]] = None) -> None:
+        payload = {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'options': options,
+            'state': state,
+            'progress': progress,
+        }
+        data = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 6)
+
+        # Write to a temp file first so a crash never leaves a truncated snapshot behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> Snapshot:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError(f"Not a senderstats snapshot: {path}")
+            magic, version = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a senderstats snapshot: {path}")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {version} in {path} (expected {SNAPSHOT_VERSION})")
+            try:
+                payload = _SnapshotUnpickler(io.BytesIO(zlib.decompress(f.read()))).load()
+            except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+                raise ValueError(f"Corrupt snapshot {path}: {e}") from e
+            if not isinstance(payload, dict) or not {'created', 'options', 'state'} <= payload.keys():
+                raise ValueError(f"Corrupt snapshot {path}: missing contents")
+
+        return Snapshot(path, version, payload['created'], payload['options'], payload['state'],
+                        payload.get('progress'))
+
+    @staticmethod
+    def merge_options(snapshots: List[Snapshot]) -> Dict[str, Any]:
+        """
+        Validate that snapshots were produced with compatible aggregation options.
+
+        :return: The options of the first snapshot, used to rebuild the pipeline for reporting.
+        """
+        if not snapshots:
+            raise ValueError("No snapshots to merge")
+
+        first = snapshots[0]
+        for snapshot in snapshots[1:]:
+            for option in AGGREGATION_OPTIONS:
+                if _comparable(first.options.get(option)) != _comparable(snapshot.options.get(option)):
+                    raise ValueError(
+                        f"Snapshot {snapshot.path} was created with {option}={snapshot.options.get(option)} "
+                        f"but {first.path} has {option}={first.options.get(option)}"
+                    )
+        return dict(first.options)
+
+
+def _comparable(value: Any) -> Any:
+    # Exclusion lists are matched case-insensitively and in any order
+    if isinstance(value, list):
+        return sorted({str(item).strip().casefold() for item in value})
+    return value
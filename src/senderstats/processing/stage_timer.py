@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from senderstats.common.defaults import DEFAULT_STAGE_TIMING_SAMPLE
+from senderstats.interfaces import Filter, Handler, Processor, Transform
+
+
+@dataclass
+class StageStats:
+    name: str
+    kind: str
+    rows_in: int = 0
+    rows_out: int = 0
+    sampled_rows: int = 0
+    sampled_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.sampled_seconds / self.sampled_rows if self.sampled_rows else 0.0
+
+    @property
+    def estimated_seconds(self) -> float:
+        # Time is only measured for sampled rows, extrapolate to every row the stage handled
+        return self.mean_seconds * self.rows_in
+
+    def merge(self, other: "StageStats") -> None:
+        self.rows_in += other.rows_in
+        self.rows_out += other.rows_out
+        self.sampled_rows += other.sampled_rows
+        self.sampled_seconds += other.sampled_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'sampled_rows': self.sampled_rows,
+            'mean_seconds': self.mean_seconds,
+            'estimated_seconds': self.estimated_seconds,
+        }
+
+
+def _kind(handler: Handler) -> str:
+    for base in (Filter, Transform, Processor):
+        if isinstance(handler, base):
+            return base.__name__
+    return type(handler).__name__
+
+
+class _TimedHandle:
+    """Replaces handler.handle, counts every row and times the handler itself on sampled rows."""
+
+    def __init__(self, timer: "PipelineTimer", stats: StageStats, handle, is_head: bool):
+        self.__timer = timer
+        self.__stats = stats
+        self.__handle = handle
+        self.__is_head = is_head
+
+    def __call__(self, data):
+        stats = self.__stats
+        stats.rows_in += 1
+        timer = self.__timer
+        if self.__is_head:
+            # The first stage decides, so a sampled row is timed through the whole chain
+            timer.sampled = (stats.rows_in - 1) % timer.sample_every == 0
+        if not timer.sampled:
+            return self.__handle(data)
+
+        # The next stage stores its own elapsed time in downstream_seconds, if the row gets there
+        timer.downstream_seconds = 0.0
+        start = perf_counter()
+        result = self.__handle(data)
+        elapsed = perf_counter() - start
+        stats.sampled_rows += 1
+        stats.sampled_seconds += elapsed - timer.downstream_seconds
+        timer.downstream_seconds = elapsed
+        return result
+
+
+class PipelineTimer:
+    """
+    Opt-in per-stage instrumentation of a handler chain.
+
+    Every handler's handle is wrapped in place, so the chain and isinstance checks on its
+    handlers are unchanged. Rows in and out are counted for every row, the time spent in a
+    stage itself (excluding the stages after it) is measured on one row in sample_every.
+    """
+
+    def __init__(self, pipeline: Handler, sample_every: int = DEFAULT_STAGE_TIMING_SAMPLE):
+        if sample_every <= 0:
+            raise ValueError("sample_every must be greater than 0")
+        self.sample_every = sample_every
+        self.sampled = False
+        self.downstream_seconds = 0.0
+        self.__stages: List[StageStats] = []
+
+        handler: Optional[Handler] = pipeline
+        while handler is not None:
+            stats = StageStats(type(handler).__name__, _kind(handler))
+            handler.handle = _TimedHandle(self, stats, handler.handle, not self.__stages)
+            self.__stages.append(stats)
+            handler = handler.get_next()
+
+    def get_stages(self) -> List[StageStats]:
+        # A stage passes on what the next stage received, the last one passes on everything
+        stages = self.__stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.rows_out = next_stage.rows_in
+        if stages:
+            stages[-1].rows_out = stages[-1].rows_in
+        return stages
+
+    def merge(self, other: "PipelineTimer") -> None:
+        """Add the counts of another pipeline built from the same configuration."""
+        for stage, other_stage in zip(self.get_stages(), other.get_stages()):
+            stage.merge(other_stage)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sample_every': self.sample_every,
+            'stages': [stage.to_dict() for stage in self.get_stages()],
+        }
+
+    def display_summary(self):
+        stages = self.get_stages()
+        total = sum(stage.estimated_seconds for stage in stages) or 1.0
+        print()
+        print(f"Stage timing (1 in {self.sample_every} rows timed):")
+        print(f"{'Stage':<36} {'Rows In':>12} {'Rows Out':>12} {'Time (s)':>10} {'Mean (us)':>10} {'Share':>7}")
+        for stage in stages:
+            print(f"{stage.name:<36} {stage.rows_in:>12} {stage.rows_out:>12} {stage.estimated_seconds:>10.4f} "
+                  f"{stage.mean_seconds * 1e6:>10.2f} {stage.estimated_seconds / total:>7.1%}")
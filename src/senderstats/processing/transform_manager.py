@@ -7,6 +7,8 @@ class TransformManager:
         self.date_transform = DateTransform(config.date_format)
         self.mfrom_transform = MFromTransform(config.decode_srs, config.remove_prvs, config.normalize_bounces, config.normalize_entropy)
         self.hfrom_transform = HFromTransform(config.no_display_name, config.no_empty_hfrom)
-        self.msgid_transform = MIDTransform()
+        # Loads the public suffix list, only needed for the Message ID report
+        self.msgid_transform = MIDTransform() if config.gen_msgid else None
         self.rpath_transform = RPathTransform(config.decode_srs, config.remove_prvs, config.normalize_bounces, config.normalize_entropy)
         self.subject_transform = SubjectTransform()
+        self.blank_subject_transform = BlankSubjectTransform()
@@ -0,0 +1,83 @@
+from typing import Optional
+
+from senderstats.core.filters import DetailKeyFilter
+from senderstats.interfaces.keyed import Keyed
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.interrupt_handler import InterruptHandler, PartialRun
+from senderstats.processing.pipeline_manager import PipelineManager
+
+
+class TwoPassPipelineProcessor:
+    """
+    Reads the input twice so subjects are only analyzed for keys that matter.
+
+    The first pass aggregates every key without normalizing subjects. Keys with at least
+    config.two_pass_min_per_day messages per day are then read again in a second pass with
+    full subject tracking, and their aggregates replace the first pass ones. All other keys
+    keep exact counts, sizes and dates but no subject patterns and no replies.
+    """
+
+    def __init__(self, config: ConfigManager, pipeline_manager: PipelineManager):
+        self.__config = config
+        self.__pipeline_manager = pipeline_manager
+        self.__partial_run: Optional[PartialRun] = None
+        self.__data_source = None
+
+    def process_data(self):
+        with InterruptHandler() as interrupt:
+            print("First pass: counting messages per key")
+            data_source_manager = DataSourceManager(self.__config)
+            data_source = data_source_manager.get_data_source()
+            self.__data_source = data_source
+            pipeline = self.__pipeline_manager.get_pipeline()
+            for message_data in data_source.read_data():
+                pipeline.handle(message_data)
+                if interrupt.requested:
+                    break
+
+            if interrupt.requested:
+                self.__partial_run = PartialRun.from_progress(data_source_manager.get_input_files(),
+                                                              data_source.get_progress())
+                return
+
+            self.__second_pass(interrupt)
+
+    def __second_pass(self, interrupt: InterruptHandler):
+        config = self.__config
+        processor_manager = self.__pipeline_manager.get_processor_manager()
+        days = len(processor_manager.date_processor.get_date_counter())
+        min_messages = config.two_pass_min_per_day * days
+
+        keyed = [p for p in self.__pipeline_manager.get_active_processors() if isinstance(p, Keyed)]
+        selections = [(p, p.keys_with_messages(min_messages)) for p in keyed]
+        detail_keys = sum(len(keys) for _, keys in selections)
+        if not detail_keys:
+            print(f"Second pass skipped: no key has {config.two_pass_min_per_day:g} messages per day")
+            return
+
+        print(f"Second pass: analyzing subjects of {detail_keys} key(s) "
+              f"with at least {config.two_pass_min_per_day:g} messages per day")
+        detail_filter = DetailKeyFilter(selections)
+        detail_manager = PipelineManager(config, detail_filter)
+        pipeline = detail_manager.get_pipeline()
+        for message_data in DataSourceManager(config).get_data_source().read_data():
+            pipeline.handle(message_data)
+            if interrupt.requested:
+                # Half read keys would lose messages, keep the complete first pass aggregates
+                print("Second pass interrupted, subjects are not reported")
+                return
+
+        detailed = [p for p in detail_manager.get_active_processors() if isinstance(p, Keyed)]
+        for (processor, keys), detail_processor in zip(selections, detailed):
+            processor.replace_keys(detail_processor, keys)
+
+    def get_rows_read(self) -> int:
+        """Rows of the first pass, the second pass reads the same rows again."""
+        return self.__data_source.get_rows_read() if self.__data_source is not None else 0
+
+    def get_partial_run(self) -> Optional[PartialRun]:
+        """
+        :return: The unfinished input files if processing was interrupted, otherwise None.
+        """
+        return self.__partial_run
@@ -0,0 +1,213 @@
+import csv
+import json
+import os
+import re
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+from senderstats.common.agg.report import sketch_bound_note
+from senderstats.common.utils import print_list_with_title
+from senderstats.interfaces.report_writer import ReportWriter
+from senderstats.interfaces.reportable import Reportable
+from senderstats.processing.interrupt_handler import PartialRun
+from senderstats.processing.pipeline_manager import PipelineManager
+
+PARQUET_BATCH_ROWS = 65536
+PARTIAL_RUN_FILE = "partial_run.json"
+
+# Parquet types of the metric columns the reports write. Any cell of these may be blank.
+_PARQUET_COLUMN_TYPES = {
+    **dict.fromkeys(["Messages", "Total Bytes", "Total Recipients", "Delivery Bytes", "Max Messages"], "int64"),
+    **dict.fromkeys(["Avg Msg Size", "Messages Per Day", "Autonomy Score (%)", "App Probability", "Reply/Fwd Ratio",
+                     "TopN Mass", "Top3 Mass", "Top1 Ratio", "Entropy", "P Template", "P Volume", "P AppLike",
+                     "P Human", "Avg Rcpts/Msg", "Avg Ext Rcpts/Msg", "Gap Mean (s)", "Gap CV"], "float64"),
+}
+
+_FILE_NAME_RE = re.compile(r'[^0-9A-Za-z]+')
+
+
+def is_parquet_available() -> bool:
+    return pa is not None
+
+
+def report_file_name(report_name: str) -> str:
+    # "MFrom + Message ID" -> "MFrom_Message_ID"
+    return _FILE_NAME_RE.sub('_', report_name).strip('_') or 'report'
+
+
+def parquet_column_types(headers: List[str], batch: List[list]) -> List[str]:
+    """
+    The Parquet type (int64, float64 or string) of each column of a report.
+
+    Metric columns have a fixed type. Any other column is float64 when the first batch only
+    holds numbers, since a later batch may hold floats where the first held integers, and
+    string otherwise, which includes a column that is blank in the first batch.
+    """
+    types = []
+    for i, header in enumerate(headers):
+        if header in _PARQUET_COLUMN_TYPES:
+            types.append(_PARQUET_COLUMN_TYPES[header])
+            continue
+        values = {type(row[i]) for row in batch if row[i] is not None}
+        types.append("float64" if values and values <= {int, float} else "string")
+    return types
+
+
+class CSVReportWriter(ReportWriter):
+    @property
+    def extension(self) -> str:
+        return ".csv"
+
+    def write(self, path: str, rows: Iterator[list]) -> int:
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        # The header is not a data row
+        return max(count - 1, 0)
+
+
+class JSONLReportWriter(ReportWriter):
+    """
+    One JSON object per data row, keyed by the report headers.
+    """
+
+    @property
+    def extension(self) -> str:
+        return ".jsonl"
+
+    def write(self, path: str, rows: Iterator[list]) -> int:
+        count = 0
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            headers = [str(h) for h in next(rows, [])]
+            for row in rows:
+                f.write(encode(dict(zip(headers, row))))
+                f.write("\n")
+                count += 1
+        return count
+
+
+class ParquetReportWriter(ReportWriter):
+    """
+    Writes row groups of batch_rows rows, so memory use does not grow with the report.
+
+    Column types come from parquet_column_types, the schema is fixed by the first batch.
+    Blank cells (None) are stored as nulls.
+    """
+
+    def __init__(self, batch_rows: int = PARQUET_BATCH_ROWS):
+        if not is_parquet_available():
+            raise ImportError("Parquet output requires pyarrow, install it with: pip install senderstats[parquet]")
+        self.__batch_rows = batch_rows
+
+    @property
+    def extension(self) -> str:
+        return ".parquet"
+
+    @staticmethod
+    def __column_array(values, column_type) -> Any:
+        if column_type == pa.string():
+            values = [None if v is None else str(v) for v in values]
+        return pa.array(values, type=column_type)
+
+    def write(self, path: str, rows: Iterator[list]) -> int:
+        headers = [str(h) for h in next(rows, [])]
+        writer = None
+        count = 0
+        try:
+            while True:
+                batch = list(islice(rows, self.__batch_rows))
+                if not batch:
+                    break
+                columns = list(zip(*batch))
+                if writer is None:
+                    types = parquet_column_types(headers, batch)
+                    schema = pa.schema([(h, getattr(pa, t)()) for h, t in zip(headers, types)])
+                    writer = pq.ParquetWriter(path, schema)
+                arrays = [self.__column_array(c, field.type) for c, field in zip(columns, schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(batch)
+
+            if writer is None:
+                # No data rows, keep the columns so the file can still be read
+                schema = pa.schema([(h, pa.string()) for h in headers])
+                writer = pq.ParquetWriter(path, schema)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+
+_REPORT_WRITERS = {
+    'csv': CSVReportWriter,
+    'jsonl': JSONLReportWriter,
+    'parquet': ParquetReportWriter,
+}
+
+
+class PipelineProcessorFileReport:
+    """
+    Writes each report to its own file in output_dir, e.g. Envelope_Senders.csv.
+
+    Rows are streamed from the processors to the files without being collected. Unlike
+    the Excel report there is no summary sheet, consumers aggregate the rows themselves.
+    """
+
+    def __init__(self, output_dir: str, pipeline_manager: PipelineManager, output_format: str,
+                 partial_run: Optional[PartialRun] = None):
+        if output_format not in _REPORT_WRITERS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        self.__output_dir = output_dir
+        self.__writer: ReportWriter = _REPORT_WRITERS[output_format]()
+        self.__pipeline_manager = pipeline_manager
+        self.__days = len(self.__pipeline_manager.get_processor_manager().date_processor.get_date_counter())
+        self.__partial_run = partial_run
+        self.__files: Dict[str, int] = {}
+
+    def get_files(self) -> Dict[str, int]:
+        """Files written so far with their number of data rows."""
+        return self.__files
+
+    def __report(self, processor: Any) -> None:
+        if isinstance(processor, Reportable):
+            sketch = getattr(processor, "sketch", None)
+            for report_name, data_generator in processor.report(self.__days):
+                path = os.path.join(self.__output_dir, report_file_name(report_name) + self.__writer.extension)
+                self.__files[path] = self.__writer.write(path, iter(data_generator))
+                if sketch is not None:
+                    # There is no summary sheet to state the bound on
+                    print(f"{report_name}: {sketch_bound_note(sketch)}")
+
+    def generate(self):
+        print()
+        print("Generating report, please wait.")
+
+        os.makedirs(self.__output_dir, exist_ok=True)
+
+        # Consumers of a partial run must be able to tell it apart from a complete one
+        partial_path = os.path.join(self.__output_dir, PARTIAL_RUN_FILE)
+        if self.__partial_run is not None:
+            with open(partial_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    'partial_files': self.__partial_run.partial_files,
+                    'unprocessed_files': self.__partial_run.unprocessed_files,
+                }, f, indent=2)
+        elif os.path.exists(partial_path):
+            os.remove(partial_path)
+
+        for proc in self.__pipeline_manager.get_active_processors():
+            self.__report(proc)
+
+    def close(self):
+        print()
+        print_list_with_title("Please see report files:", list(self.__files))
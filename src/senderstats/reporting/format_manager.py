@@ -52,6 +52,16 @@ class FormatManager:
             "hidden": True,     # IMPORTANT
         })
 
+        # Partial report marker
+        self.warning_header_format = self.create_format({
+            "bold": True,
+            "align": "center",
+            "valign": "vcenter",
+            "font_color": "#9C0006",
+            "bg_color": "#FFC7CE",
+            "border": 1,
+        })
+
         # Editable input cells (threshold + dropdown) - NOT hidden
         self.input_value_format = self.create_format({
             "align": "right",
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Iterable, List, Optional, Sequence, Tuple
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 from xlsxwriter import Workbook
+from xlsxwriter.utility import xl_col_to_name
 from xlsxwriter.worksheet import Worksheet
 
+from senderstats.common.agg.report import sketch_bound_note
 from senderstats.common.defaults import DEFAULT_THRESHOLD
 from senderstats.common.utils import prepare_string_for_excel
 from senderstats.interfaces.reportable import Reportable
+from senderstats.processing.interrupt_handler import PartialRun
 from senderstats.processing.pipeline_manager import PipelineManager
 from senderstats.reporting.format_manager import FormatManager
+from senderstats.reporting.threshold_distribution import TableSummary, TableSummaryCollector
 
 
 @dataclass(frozen=True)
@@ -19,20 +24,133 @@ class ReportContext:
     formats: FormatManager
     days: int
     with_probability: bool
+    partial_run: Optional[PartialRun] = None
+    # constant_memory workbook: rows are flushed as written, no tables or autofit
+    streaming: bool = False
+
+
+# Rows per worksheet including the header, larger reports continue on another sheet
+EXCEL_MAX_ROWS = 1048576
+_EXCEL_MAX_SHEET_NAME = 31
+
+# Rows sampled per column to size columns when autofit is unavailable
+WIDTH_SAMPLE_ROWS = 1000
+_MIN_COLUMN_WIDTH = 8
+_MAX_COLUMN_WIDTH = 80
+_FORMULA_COLUMN_WIDTH = 18
+
+
+class ColumnWidthEstimator:
+    """
+    Estimates column widths from the cells seen so far, a cheap stand-in for autofit.
+    """
+
+    def __init__(self):
+        self.__widths = {}
+
+    def add(self, col: int, value: Any) -> None:
+        if isinstance(value, float):
+            length = len(f"{value:.2f}")
+        else:
+            length = len(str(value))
+        if length > self.__widths.get(col, 0):
+            self.__widths[col] = length
+
+    def add_row(self, row: Sequence[Any]) -> None:
+        for col, value in enumerate(row):
+            self.add(col, value)
+
+    def apply(self, sheet: Worksheet, min_width: int = _MIN_COLUMN_WIDTH, skip: Iterable[int] = ()) -> None:
+        skip = set(skip)
+        for col, length in self.__widths.items():
+            if col in skip:
+                continue
+            sheet.set_column(col, col, min(max(length + 2, min_width), _MAX_COLUMN_WIDTH))
+
+
+class RowOrderedSheet:
+    """
+    Records cell writes and replays them in row order.
+
+    constant_memory worksheets silently drop writes to rows before the current row,
+    the summary sheets are written out of order, so they are buffered through this.
+    Their size is bounded by the number of reports, not by the data.
+    """
+
+    _CELL_METHODS = ('write', 'write_string', 'write_number', 'write_formula', 'merge_range', 'data_validation')
+
+    def __init__(self, sheet: Worksheet):
+        self.__sheet = sheet
+        self.__calls = []
+        self.__widths = ColumnWidthEstimator()
+        self.__fixed_columns = set()
+
+    def __getattr__(self, name: str):
+        if name not in self._CELL_METHODS:
+            return getattr(self.__sheet, name)
+
+        def record(row: int, col: int, *args, **kwargs):
+            self.__calls.append((row, name, col, args, kwargs))
+            # Like autofit, merged cells do not count towards the width
+            if name in ('write', 'write_string', 'write_number') and args:
+                value = args[0]
+                if not (isinstance(value, str) and value.startswith("=")):
+                    self.__widths.add(col, value)
+            elif name == 'write_formula':
+                self.__widths.add(col, " " * _FORMULA_COLUMN_WIDTH)
+
+        return record
+
+    def set_column(self, first_col: int, last_col: int, *args, **kwargs):
+        self.__fixed_columns.update(range(first_col, last_col + 1))
+        return self.__sheet.set_column(first_col, last_col, *args, **kwargs)
+
+    def autofit(self) -> None:
+        self.__widths.apply(self.__sheet, skip=self.__fixed_columns)
+
+    def flush(self) -> None:
+        # Sort is stable, so writes within a row keep their order
+        for row, name, col, args, kwargs in sorted(self.__calls, key=lambda call: call[0]):
+            getattr(self.__sheet, name)(row, col, *args, **kwargs)
+        self.__calls = []
+
+
+def part_sheet_name(sheet_name: str, part: int) -> str:
+    """
+    Name of the sheet holding part N of a report that exceeds the row limit of one sheet.
+    """
+    if part == 1:
+        return sheet_name
+    suffix = f" ({part})"
+    return sheet_name[:_EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+
+
+def part_table_name(table_name: str, part: int) -> str:
+    return table_name if part == 1 else f"{table_name}_{part}"
+
+
+class DistRanges(NamedTuple):
+    """Absolute ranges of one cumulative distribution block on the _Dist sheet."""
+    thresholds: str
+    messages: str
+    total_bytes: str
+    delivery_bytes: str
 
 
 class ExcelFormulas:
+    """
+    Summary formulas. Threshold figures are exact lookups into the precomputed cumulative
+    distributions (see ThresholdDistribution), totals are written as values, so nothing
+    depends on the (large) data tables and nothing is volatile.
+    """
+
     def __init__(self, *, days: int):
         self._days = days
 
     @staticmethod
-    def _col(table_cell: str, col_name: str) -> str:
-        # INDIRECT($B$16&"[Messages]")
-        return f'INDIRECT({table_cell}&"[{col_name}]")'
-
-    @staticmethod
-    def _sumif(cond_rng: str, threshold_cell: str, data_rng: str) -> str:
-        return f'SUMIF({cond_rng},">="&{threshold_cell},{data_rng})'
+    def _lookup(dist: DistRanges, rng: str, threshold_cell: str) -> str:
+        # Thresholds are sorted descending, MATCH(-1) finds the smallest threshold >= the input
+        return f'IFERROR(INDEX({rng},MATCH({threshold_cell},{dist.thresholds},-1)),0)'
 
     @staticmethod
     def format_bytes(numeric_expr: str) -> str:
@@ -56,85 +174,41 @@ class ExcelFormulas:
         # (value)/days*30
         return f'(({numeric_expr}))/{self._days}*30'
 
-    def conditional_bytes_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Messages Per Day")
-        data = self._col(table_cell, "Total Bytes")
-        return f'={self._sumif(cond, threshold_cell, data)}'
-
-    def conditional_messages_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Messages Per Day")
-        data = self._col(table_cell, "Messages")
-        return f'=ROUNDUP({self._sumif(cond, threshold_cell, data)},0)'
-
-    def conditional_avg_kb_display(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Messages Per Day")
-        bytes_rng = self._col(table_cell, "Total Bytes")
-        msgs_rng = self._col(table_cell, "Messages")
-        sum_bytes = self._sumif(cond, threshold_cell, bytes_rng)
-        sum_msgs = self._sumif(cond, threshold_cell, msgs_rng)
-        return f'=ROUNDUP(({sum_bytes})/({sum_msgs})/1024,0)&" KB"'
-
-    def conditional_pct_of_total_display(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Messages Per Day")
-        msgs = self._col(table_cell, "Messages")
-        num = self._sumif(cond, threshold_cell, msgs)
-        den = f'SUM({msgs})'
-        return f'=ROUNDUP(({num})/({den})*100,1)&"%"'
-
-    def total_bytes_raw(self, *, table_cell: str) -> str:
-        return f'=SUM({self._col(table_cell, "Total Bytes")})'
-
-    def total_messages_raw(self, *, table_cell: str) -> str:
-        return f'=SUM({self._col(table_cell, "Messages")})'
-
-    def total_avg_kb_display(self, *, table_cell: str) -> str:
-        sum_bytes = f'SUM({self._col(table_cell, "Total Bytes")})'
-        sum_msgs = f'SUM({self._col(table_cell, "Messages")})'
-        return f'=ROUNDUP(({sum_bytes})/({sum_msgs})/1024,0)&" KB"'
-
-    def conditional_delivery_bytes_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Messages Per Day")
-        data = self._col(table_cell, "Delivery Bytes")
-        return f'={self._sumif(cond, threshold_cell, data)}'
-
-    def total_delivery_bytes_raw(self, *, table_cell: str) -> str:
-        return f'=SUM({self._col(table_cell, "Delivery Bytes")})'
-
-    def prob_bytes_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Autonomy Score (%)")
-        data = self._col(table_cell, "Total Bytes")
-        return f'={self._sumif(cond, threshold_cell, data)}'
-
-    def prob_messages_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Autonomy Score (%)")
-        data = self._col(table_cell, "Messages")
-        return f'=ROUNDUP({self._sumif(cond, threshold_cell, data)},0)'
-
-    def prob_delivery_bytes_raw(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Autonomy Score (%)")
-        data = self._col(table_cell, "Delivery Bytes")
-        return f'={self._sumif(cond, threshold_cell, data)}'
-
-    def prob_avg_kb_display(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Autonomy Score (%)")
-        bytes_rng = self._col(table_cell, "Total Bytes")
-        msgs_rng = self._col(table_cell, "Messages")
-        sum_bytes = self._sumif(cond, threshold_cell, bytes_rng)
-        sum_msgs = self._sumif(cond, threshold_cell, msgs_rng)
-        return f'=IF(({sum_msgs})=0,"",ROUNDUP(({sum_bytes})/({sum_msgs})/1024,0)&" KB")'
-
-    def prob_pct_of_total_display(self, *, table_cell: str, threshold_cell: str) -> str:
-        cond = self._col(table_cell, "Autonomy Score (%)")
-        msgs_rng = self._col(table_cell, "Messages")
-        num = self._sumif(cond, threshold_cell, msgs_rng)
-        den = f'SUM({msgs_rng})'
-        return f'=IF(({den})=0,"",ROUNDUP(({num})/({den})*100,1)&"%")'
+    def conditional_bytes_raw(self, *, dist: DistRanges, threshold_cell: str) -> str:
+        return f'={self._lookup(dist, dist.total_bytes, threshold_cell)}'
+
+    def conditional_messages_raw(self, *, dist: DistRanges, threshold_cell: str) -> str:
+        return f'=ROUNDUP({self._lookup(dist, dist.messages, threshold_cell)},0)'
+
+    def conditional_delivery_bytes_raw(self, *, dist: DistRanges, threshold_cell: str) -> str:
+        return f'={self._lookup(dist, dist.delivery_bytes, threshold_cell)}'
+
+    @staticmethod
+    def avg_kb_display(*, bytes_cell: str, msgs_cell: str) -> str:
+        return f'=ROUNDUP(({bytes_cell})/({msgs_cell})/1024,0)&" KB"'
+
+    @staticmethod
+    def pct_of_total_display(*, msgs_cell: str, total_msgs_cell: str) -> str:
+        return f'=ROUNDUP(({msgs_cell})/({total_msgs_cell})*100,1)&"%"'
+
+    # Probabilistic figures are blank instead of an error when nothing matches
+
+    @staticmethod
+    def prob_avg_kb_display(*, bytes_cell: str, msgs_cell: str) -> str:
+        return f'=IF(({msgs_cell})=0,"",ROUNDUP(({bytes_cell})/({msgs_cell})/1024,0)&" KB")'
+
+    @staticmethod
+    def prob_pct_of_total_display(*, msgs_cell: str, total_msgs_cell: str) -> str:
+        return f'=IF(({total_msgs_cell})=0,"",ROUNDUP(({msgs_cell})/({total_msgs_cell})*100,1)&"%")'
 
 
 class ExcelSheetWriter:
-    def __init__(self, ctx: ReportContext, *, table_style: str = "Table Style Medium 9"):
+    def __init__(self, ctx: ReportContext, *, table_style: str = "Table Style Medium 9",
+                 max_rows: int = EXCEL_MAX_ROWS):
         self._ctx = ctx
         self._table_style = table_style
+        # Includes the header row, which is repeated on every part
+        self._max_rows = max_rows
 
     @staticmethod
     def sanitize_table_name(name: str) -> str:
@@ -152,27 +226,74 @@ class ExcelSheetWriter:
         rows: Iterable[Sequence[Any]],
         create_table: bool,
         table_name: str,
-    ) -> None:
+    ) -> TableSummary:
+        """
+        Write a report to its sheet. Reports larger than the Excel row limit continue on
+        "<sheet> (2)", "<sheet> (3)", ... with tables named "<table>_2", "<table>_3", ...
+
+        :return: The tables written (one per sheet) with the totals the Summary sheet needs.
+        """
+        summary = TableSummary()
+        rows = iter(rows)
+        headers = next(rows, None)
+        if headers is None:
+            self._ctx.workbook.add_worksheet(sheet_name)
+            return summary
+
+        collector = None
+        if create_table and TableSummaryCollector.supports(headers):
+            collector = TableSummaryCollector(headers, summary)
+
+        part = 1
+        while True:
+            part_table = part_table_name(table_name, part)
+            more = self.__write_part(part_sheet_name(sheet_name, part), headers, rows, create_table, part_table,
+                                     collector)
+            summary.parts.append(part_table)
+            if more is None:
+                return summary
+            # Put back the row that did not fit
+            rows = chain((more,), rows)
+            part += 1
+
+    def __write_part(
+        self,
+        sheet_name: str,
+        headers: Sequence[Any],
+        rows: Iterator[Sequence[Any]],
+        create_table: bool,
+        table_name: str,
+        collector: Optional[TableSummaryCollector],
+    ) -> Optional[Sequence[Any]]:
         fm = self._ctx.formats
+        streaming = self._ctx.streaming
         sheet = self._ctx.workbook.add_worksheet(sheet_name)
+        widths = ColumnWidthEstimator()
 
+        overflow = None
         r_index = 0
-        headers: Optional[Sequence[Any]] = None
+        for row in chain((headers,), rows):
+            if r_index == self._max_rows:
+                overflow = row
+                break
 
-        for row in rows:
-            cell_format = fm.data_cell_format
-            if r_index == 0:
-                cell_format = fm.header_format
-                headers = row
+            cell_format = fm.header_format if r_index == 0 else fm.data_cell_format
+            if collector is not None and r_index > 0:
+                collector.add(row)
+            if streaming and r_index <= WIDTH_SAMPLE_ROWS:
+                widths.add_row(row)
 
             for c_index, value in enumerate(row):
                 if isinstance(value, (int, float)):
                     sheet.write_number(r_index, c_index, value, cell_format)
+                elif value is None:
+                    sheet.write_blank(r_index, c_index, None, cell_format)
                 else:
                     sheet.write_string(r_index, c_index, prepare_string_for_excel(value), cell_format)
             r_index += 1
 
-        if create_table and r_index > 0 and headers:
+        # constant_memory workbooks cannot have tables
+        if create_table and headers and not streaming:
             num_rows = r_index
             num_cols = len(headers)
             sheet.add_table(0, 0, num_rows - 1, num_cols - 1, {
@@ -181,7 +302,13 @@ class ExcelSheetWriter:
                 "style": self._table_style,
             })
 
-        sheet.autofit()
+        if streaming:
+            sheet.freeze_panes(1, 0)
+            widths.apply(sheet)
+        else:
+            sheet.autofit()
+
+        return overflow
 
 
 class SummarySheetBuilder:
@@ -192,14 +319,44 @@ class SummarySheetBuilder:
         self._cell_threshold = "Summary!$B$20"  # row 19, col 1
         self._cell_prob_threshold = "Summary!$E$20"
         self._cell_selected_table = "Summary!$B$21"  # row 20, col 1
+        self._buffered_sheets: List[RowOrderedSheet] = []
+        self._sheets: Dict[str, Any] = {}
+
+    def add_sheets(self) -> None:
+        """
+        Create the summary sheets ahead of the data sheets so they come first in the
+        workbook. Their content is written by build() once the data sheets exist.
+        """
+        # Visible Summary sheet FIRST (we'll stash the dropdown list on it)
+        self._sheets["Summary"] = self.__add_sheet("Summary")
 
+        # Hidden _SummaryCalc sheet: one row per table
+        calc = self._sheets["_SummaryCalc"] = self.__add_sheet("_SummaryCalc")
+        calc.hide()  # or calc.set_hidden(2) for very hidden
+
+        # Hidden _ProbCalc sheet (only when probability enabled)
+        if self._ctx.with_probability:
+            pcalc = self._sheets["_ProbCalc"] = self.__add_sheet("_ProbCalc")
+            pcalc.hide()
+
+        # Hidden _Dist sheet: cumulative totals per threshold the calc sheets look up
+        dist = self._sheets["_Dist"] = self.__add_sheet("_Dist")
+        dist.hide()
+
+    def build(self, *, tables: Dict[str, TableSummary], sketch_notes: Optional[Dict[str, str]] = None) -> None:
+        """
+        :param tables: Table names with the totals collected while their rows were written.
+        :param sketch_notes: Report names with the error bound of their Max Messages column.
+        """
+        if not self._sheets:
+            self.add_sheets()
+
+        table_names = list(tables)
 
-    def build(self, *, table_names: List[str]) -> None:
         # Pick a default
         default_selection = table_names[0] if table_names else ""
 
-        # Visible Summary sheet FIRST (we'll stash the dropdown list on it)
-        summary = self._ctx.workbook.add_worksheet("Summary")
+        summary = self._sheets["Summary"]
 
 
         list_col = 50
@@ -217,22 +374,68 @@ class SummarySheetBuilder:
         # Hide the list column
         summary.set_column(list_col, list_col, None, None, {"hidden": True})
 
-        # Hidden _SummaryCalc sheet: one row per table
-        calc = self._ctx.workbook.add_worksheet("_SummaryCalc")
-        calc.hide()  # or calc.set_hidden(2) for very hidden
-        self._write_summary_calc(calc, table_names)
+        per_day_ranges, autonomy_ranges = self._write_distributions(self._sheets["_Dist"], tables)
+
+        self._write_summary_calc(self._sheets["_SummaryCalc"], tables, per_day_ranges)
 
-        # Hidden _ProbCalc sheet (only when probability enabled)
         if self._ctx.with_probability:
-            pcalc = self._ctx.workbook.add_worksheet("_ProbCalc")
-            pcalc.hide()
-            self._write_prob_calc(pcalc, table_names)
+            self._write_prob_calc(self._sheets["_ProbCalc"], tables, autonomy_ranges)
 
         # Now write the Summary content (labels, validations, formulas)
-        self._write_summary_sheet(summary, default_selection=default_selection)
-
-
-    def _write_summary_calc(self, calc: Worksheet, table_names: List[str]) -> None:
+        self._write_summary_sheet(summary, default_selection=default_selection, sketch_notes=sketch_notes or {})
+
+        for sheet in self._buffered_sheets:
+            sheet.flush()
+        self._buffered_sheets = []
+        self._sheets = {}
+
+    def __add_sheet(self, name: str):
+        sheet = self._ctx.workbook.add_worksheet(name)
+        if self._ctx.streaming:
+            sheet = RowOrderedSheet(sheet)
+            self._buffered_sheets.append(sheet)
+        return sheet
+
+    def _write_distributions(
+            self,
+            dist_sheet: Worksheet,
+            tables: Dict[str, TableSummary],
+    ) -> Tuple[List[DistRanges], List[DistRanges]]:
+        """
+        Write one block of four columns (threshold, messages, bytes, delivery bytes) per table
+        and metric. Blocks only hold the distinct whole values of the metric, not one row per key.
+        """
+        fm = self._ctx.formats
+        per_day_ranges, autonomy_ranges = [], []
+        col = 0
+        for table_name, table in tables.items():
+            blocks = [("Messages Per Day", table.per_day, per_day_ranges)]
+            if self._ctx.with_probability:
+                blocks.append(("Autonomy Score (%)", table.autonomy, autonomy_ranges))
+
+            for metric, distribution, ranges in blocks:
+                dist_sheet.write_string(0, col, f"{table_name} {metric}", fm.header_format)
+                for c, h in enumerate(("Threshold", "Messages", "Total Bytes", "Delivery Bytes")):
+                    dist_sheet.write_string(1, col + c, h, fm.header_format)
+
+                rows = distribution.cumulative()
+                for r, values in enumerate(rows, start=2):
+                    for c, value in enumerate(values):
+                        dist_sheet.write_number(r, col + c, value, fm.data_cell_format)
+
+                # An empty block still gets a (blank) one row range, the lookup then returns 0
+                first, last = 3, max(len(rows) + 2, 3)
+                ranges.append(DistRanges(*(
+                    f"_Dist!${xl_col_to_name(col + c)}${first}:${xl_col_to_name(col + c)}${last}"
+                    for c in range(4)
+                )))
+                col += 5
+
+        dist_sheet.autofit()
+        return per_day_ranges, autonomy_ranges
+
+    def _write_summary_calc(self, calc: Worksheet, tables: Dict[str, TableSummary],
+                            ranges: List[DistRanges]) -> None:
         fm = self._ctx.formats
         fx = self._fx
 
@@ -256,82 +459,86 @@ class SummarySheetBuilder:
         for c, h in enumerate(headers):
             calc.write_string(0, c, h, fm.header_format)
 
-        for i, table_name in enumerate(table_names, start=1):
+        for i, ((table_name, table), dist) in enumerate(zip(tables.items(), ranges), start=1):
             r = i  # row 0 is header
             calc.write_string(r, 0, table_name, fm.data_cell_format)
-            table_cell = f"$A{r + 1}"  # Excel row is 1-based
+            row = r + 1  # Excel row is 1-based
 
             # ---- Conditional (threshold-based) ----
 
             # B: Conditional bytes raw
             calc.write_formula(
                 r, 1,
-                fx.conditional_bytes_raw(table_cell=table_cell, threshold_cell=self._cell_threshold),
+                fx.conditional_bytes_raw(dist=dist, threshold_cell=self._cell_threshold),
                 fm.data_cell_format
             )
             # C: Conditional bytes display
-            calc.write_formula(r, 2, fx.format_bytes(f"_SummaryCalc!$B{r + 1}"), fm.data_cell_format)
+            calc.write_formula(r, 2, fx.format_bytes(f"_SummaryCalc!$B{row}"), fm.data_cell_format)
 
             # D: Conditional messages raw
             calc.write_formula(
                 r, 3,
-                fx.conditional_messages_raw(table_cell=table_cell, threshold_cell=self._cell_threshold),
+                fx.conditional_messages_raw(dist=dist, threshold_cell=self._cell_threshold),
                 fm.data_cell_format
             )
 
             # E: Conditional avg size (KB) display
             calc.write_formula(
                 r, 4,
-                fx.conditional_avg_kb_display(table_cell=table_cell, threshold_cell=self._cell_threshold),
+                fx.avg_kb_display(bytes_cell=f"_SummaryCalc!$B{row}", msgs_cell=f"_SummaryCalc!$D{row}"),
                 fm.data_cell_format
             )
 
             # F: Conditional percent of total display
             calc.write_formula(
                 r, 5,
-                fx.conditional_pct_of_total_display(table_cell=table_cell, threshold_cell=self._cell_threshold),
+                fx.pct_of_total_display(msgs_cell=f"_SummaryCalc!$D{row}", total_msgs_cell=f"_SummaryCalc!$L{row}"),
                 fm.data_cell_format
             )
 
             # ---- Monthly (threshold-based, scaled) ----
 
             # G: Monthly conditional bytes display (scale raw bytes)
-            monthly_bytes_expr = fx.monthly_scale(f"_SummaryCalc!$B{r + 1}")
+            monthly_bytes_expr = fx.monthly_scale(f"_SummaryCalc!$B{row}")
             calc.write_formula(r, 6, fx.format_bytes(monthly_bytes_expr), fm.data_cell_format)
 
             # N: Monthly conditional delivery bytes display (scale conditional delivery bytes)
             cond_deliv_raw_expr = fx.conditional_delivery_bytes_raw(
-                table_cell=table_cell,
+                dist=dist,
                 threshold_cell=self._cell_threshold
             )[1:]  # strip leading "=" to embed in expression
             monthly_deliv_expr = fx.monthly_scale(f"({cond_deliv_raw_expr})")
             calc.write_formula(r, 13, fx.format_bytes(monthly_deliv_expr), fm.data_cell_format)
 
             # H: Monthly conditional msgs raw (scale msgs)
-            monthly_msgs_expr = fx.monthly_scale(f"_SummaryCalc!$D{r + 1}")
+            monthly_msgs_expr = fx.monthly_scale(f"_SummaryCalc!$D{row}")
             calc.write_formula(r, 7, f"={monthly_msgs_expr}", fm.data_cell_format)
 
             # I: Monthly avg KB display (avg isn't scaled by days)
-            calc.write_formula(r, 8, f"=_SummaryCalc!$E{r + 1}", fm.data_cell_format)
+            calc.write_formula(r, 8, f"=_SummaryCalc!$E{row}", fm.data_cell_format)
 
             # ---- Totals (whole dataset, not threshold-based) ----
 
             # J: Total bytes raw
-            calc.write_formula(r, 9, fx.total_bytes_raw(table_cell=table_cell), fm.data_cell_format)
+            calc.write_number(r, 9, table.total_bytes, fm.data_cell_format)
             # K: Total bytes display
-            calc.write_formula(r, 10, fx.format_bytes(f"_SummaryCalc!$J{r + 1}"), fm.data_cell_format)
+            calc.write_formula(r, 10, fx.format_bytes(f"_SummaryCalc!$J{row}"), fm.data_cell_format)
             # L: Total messages raw
-            calc.write_formula(r, 11, fx.total_messages_raw(table_cell=table_cell), fm.data_cell_format)
+            calc.write_number(r, 11, table.messages, fm.data_cell_format)
             # M: Total avg KB display
-            calc.write_formula(r, 12, fx.total_avg_kb_display(table_cell=table_cell), fm.data_cell_format)
+            calc.write_formula(
+                r, 12,
+                fx.avg_kb_display(bytes_cell=f"_SummaryCalc!$J{row}", msgs_cell=f"_SummaryCalc!$L{row}"),
+                fm.data_cell_format
+            )
 
             # O: Total delivery bytes display
-            total_deliv_raw_expr = fx.total_delivery_bytes_raw(table_cell=table_cell)[1:]  # strip leading "="
-            calc.write_formula(r, 14, fx.format_bytes(total_deliv_raw_expr), fm.data_cell_format)
+            calc.write_formula(r, 14, fx.format_bytes(str(table.delivery_bytes)), fm.data_cell_format)
 
         calc.autofit()
 
-    def _write_prob_calc(self, calc: Worksheet, table_names: List[str]) -> None:
+    def _write_prob_calc(self, calc: Worksheet, tables: Dict[str, TableSummary],
+                         ranges: List[DistRanges]) -> None:
         fm = self._ctx.formats
         fx = self._fx
 
@@ -346,66 +553,69 @@ class SummarySheetBuilder:
             "MonthlyProbMsgsRaw",    # H
             "MonthlyProbAvgKBDisp",  # I
             "MonthlyProbDelivDisp",  # J
+            "TotalMsgsRaw",          # K
         ]
         for c, h in enumerate(headers):
             calc.write_string(0, c, h, fm.header_format)
 
-        for i, table_name in enumerate(table_names, start=1):
+        for i, ((table_name, table), dist) in enumerate(zip(tables.items(), ranges), start=1):
             r = i
             calc.write_string(r, 0, table_name, fm.data_cell_format)
-            table_cell = f"$A{r + 1}"  # 1-based row
+            row = r + 1  # 1-based row
 
             # B: Prob bytes raw
             calc.write_formula(
                 r, 1,
-                fx.prob_bytes_raw(table_cell=table_cell, threshold_cell=self._cell_prob_threshold),
+                fx.conditional_bytes_raw(dist=dist, threshold_cell=self._cell_prob_threshold),
                 fm.data_cell_format
             )
             # C: Prob bytes display
-            calc.write_formula(r, 2, fx.format_bytes(f"_ProbCalc!$B{r + 1}"), fm.data_cell_format)
+            calc.write_formula(r, 2, fx.format_bytes(f"_ProbCalc!$B{row}"), fm.data_cell_format)
 
             # D: Prob messages raw
             calc.write_formula(
                 r, 3,
-                fx.prob_messages_raw(table_cell=table_cell, threshold_cell=self._cell_prob_threshold),
+                fx.conditional_messages_raw(dist=dist, threshold_cell=self._cell_prob_threshold),
                 fm.data_cell_format
             )
 
             # E: Prob avg size KB display
             calc.write_formula(
                 r, 4,
-                fx.prob_avg_kb_display(table_cell=table_cell, threshold_cell=self._cell_prob_threshold),
+                fx.prob_avg_kb_display(bytes_cell=f"_ProbCalc!$B{row}", msgs_cell=f"_ProbCalc!$D{row}"),
                 fm.data_cell_format
             )
 
-            # F: Prob % of total bytes display
+            # F: Prob % of total messages display
             calc.write_formula(
                 r, 5,
-                fx.prob_pct_of_total_display(table_cell=table_cell, threshold_cell=self._cell_prob_threshold),
+                fx.prob_pct_of_total_display(msgs_cell=f"_ProbCalc!$D{row}", total_msgs_cell=f"_ProbCalc!$K{row}"),
                 fm.data_cell_format
             )
 
             # G: Monthly prob bytes display
-            monthly_bytes_expr = fx.monthly_scale(f"_ProbCalc!$B{r + 1}")
+            monthly_bytes_expr = fx.monthly_scale(f"_ProbCalc!$B{row}")
             calc.write_formula(r, 6, fx.format_bytes(monthly_bytes_expr), fm.data_cell_format)
 
             # H: Monthly prob msgs raw
-            monthly_msgs_expr = fx.monthly_scale(f"_ProbCalc!$D{r + 1}")
+            monthly_msgs_expr = fx.monthly_scale(f"_ProbCalc!$D{row}")
             calc.write_formula(r, 7, f"={monthly_msgs_expr}", fm.data_cell_format)
 
             # I: Monthly prob avg KB display (same as E)
-            calc.write_formula(r, 8, f"=_ProbCalc!$E{r + 1}", fm.data_cell_format)
+            calc.write_formula(r, 8, f"=_ProbCalc!$E{row}", fm.data_cell_format)
 
             # J: Monthly prob delivery bytes display
-            cond_deliv_raw_expr = fx.prob_delivery_bytes_raw(
-                table_cell=table_cell,
+            cond_deliv_raw_expr = fx.conditional_delivery_bytes_raw(
+                dist=dist,
                 threshold_cell=self._cell_prob_threshold
             )[1:]  # strip '='
             monthly_deliv_expr = fx.monthly_scale(f"({cond_deliv_raw_expr})")
             calc.write_formula(r, 9, fx.format_bytes(monthly_deliv_expr), fm.data_cell_format)
 
-        calc.autofit()
+            # K: Total messages raw
+            calc.write_number(r, 10, table.messages, fm.data_cell_format)
 
+        calc.autofit()
 
     @staticmethod
     def _index_match(sheet_name: str, selected_table_cell: str, return_col_letter: str) -> str:
@@ -418,7 +628,8 @@ class SummarySheetBuilder:
         )
 
 
-    def _write_summary_sheet(self, summary: Worksheet, *, default_selection: str) -> None:
+    def _write_summary_sheet(self, summary: Worksheet, *, default_selection: str,
+                             sketch_notes: Dict[str, str]) -> None:
         fm = self._ctx.formats
         days = self._ctx.days
 
@@ -538,55 +749,98 @@ class SummarySheetBuilder:
                 summary.write_string(legend_r + i, legend_c, rng, fm.summary_label_format)
                 summary.write_string(legend_r + i, legend_c + 1, label, fm.summary_value_format)
 
+        if self._ctx.partial_run is not None:
+            self._write_partial_marker(summary, self._ctx.partial_run)
+
+        if sketch_notes:
+            # Right of the partial marker when there is one
+            self._write_sketch_notes(summary, sketch_notes, col=9 if self._ctx.partial_run is not None else 6)
+
         summary.autofit()
 
+    def _write_partial_marker(self, summary: Worksheet, partial_run: PartialRun) -> None:
+        fm = self._ctx.formats
+        col = 6  # G, right of the probabilistic block
+
+        summary.merge_range(0, col, 0, col + 1, "PARTIAL REPORT - Processing Was Interrupted", fm.warning_header_format)
+        summary.merge_range(1, col, 1, col + 1, "Figures only include data processed before the interrupt.",
+                            fm.summary_label_format)
+
+        r = 3
+        for label, files in (("Partially Processed", partial_run.partial_files),
+                             ("Not Processed", partial_run.unprocessed_files)):
+            summary.write_string(r, col, label, fm.summary_label_format)
+            for f in files or ["None"]:
+                summary.write_string(r, col + 1, prepare_string_for_excel(f), fm.summary_value_format)
+                r += 1
+            r += 1
+
+    def _write_sketch_notes(self, summary: Worksheet, sketch_notes: Dict[str, str], *, col: int) -> None:
+        fm = self._ctx.formats
+
+        summary.merge_range(0, col, 0, col + 1, "Sketch Error Bounds (--sketch-keys)", fm.grouped_header_format)
+        for r, (report_name, note) in enumerate(sketch_notes.items(), start=1):
+            summary.write_string(r, col, report_name, fm.summary_label_format)
+            summary.write_string(r, col + 1, note, fm.summary_value_format)
+
 
 class PipelineProcessorReport:
-    def __init__(self, output_file: str, pipeline_manager: PipelineManager, with_probability: bool):
+    def __init__(self, output_file: str, pipeline_manager: PipelineManager, with_probability: bool,
+                 partial_run: Optional[PartialRun] = None, streaming: bool = False):
         self.__threshold = DEFAULT_THRESHOLD
         self.__output_file = output_file
-        self.__workbook = Workbook(output_file)
+        self.__workbook = Workbook(output_file, {"constant_memory": streaming})
         self.__format_manager = FormatManager(self.__workbook)
         self.__pipeline_manager = pipeline_manager
         self.__days = len(self.__pipeline_manager.get_processor_manager().date_processor.get_date_counter())
         self.__with_probability = with_probability
-        self._ctx = ReportContext(self.__workbook, self.__format_manager, self.__days, self.__with_probability)
+        self._ctx = ReportContext(self.__workbook, self.__format_manager, self.__days, self.__with_probability,
+                                  partial_run, streaming)
+        if partial_run is not None:
+            self.__workbook.set_properties({
+                "title": "Partial report",
+                "comments": "Processing was interrupted, not all input files were processed.",
+            })
         self._writer = ExcelSheetWriter(self._ctx)
         self._summary_builder = SummarySheetBuilder(self._ctx, threshold=self.__threshold)
+        self.__sketch_notes: Dict[str, str] = {}
 
     def close(self):
         self.__workbook.close()
         print()
         print("Please see report: {}".format(self.__output_file))
 
-    def __collect_table_names(self) -> List[str]:
-        data_tables: List[str] = []
-        for proc in self.__pipeline_manager.get_active_processors():
-            if isinstance(proc, Reportable) and getattr(proc, "create_data_table", False):
-                for report_name, _data_generator in proc.report(self.__days):
-                    data_tables.append(self._writer.sanitize_table_name(report_name))
-        return data_tables
+    def create_sizing_summary(self, tables: Dict[str, TableSummary]):
+        self._summary_builder.build(tables=tables, sketch_notes=self.__sketch_notes)
 
-    def create_sizing_summary(self):
-        table_names = self.__collect_table_names()
-        self._summary_builder.build(table_names=table_names)
-
-    def __report(self, processor: Any) -> None:
+    def __report(self, processor: Any) -> Dict[str, TableSummary]:
+        tables: Dict[str, TableSummary] = {}
         if isinstance(processor, Reportable):
+            create_table = getattr(processor, "create_data_table", False)
+            sketch = getattr(processor, "sketch", None)
             for report_name, data_generator in processor.report(self.__days):
+                if sketch is not None:
+                    self.__sketch_notes[report_name] = sketch_bound_note(sketch)
                 table_name = self._writer.sanitize_table_name(report_name)
-                self._writer.write_report_sheet(
+                table = self._writer.write_report_sheet(
                     sheet_name=report_name,
                     rows=data_generator,
-                    create_table=getattr(processor, "create_data_table", False),
+                    create_table=create_table,
                     table_name=table_name,
                 )
+                if create_table and table.parts:
+                    tables[table_name] = table
+        return tables
 
     def generate(self):
         print()
         print("Generating report, please wait.")
 
-        self.create_sizing_summary()
+        # Summary sheets come first, but their content is collected while the data sheets are written
+        self._summary_builder.add_sheets()
 
+        tables: Dict[str, TableSummary] = {}
         for proc in self.__pipeline_manager.get_active_processors():
-            self.__report(proc)
+            tables.update(self.__report(proc))
+
+        self.create_sizing_summary(tables)
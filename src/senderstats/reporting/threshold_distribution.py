@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import floor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# (threshold, messages, total bytes, delivery bytes), thresholds in descending order
+CumulativeRow = Tuple[int, int, int, int]
+
+
+class ThresholdDistribution:
+    """
+    Messages, bytes and delivery bytes of the rows at or above each integer threshold of
+    a metric, i.e. what SUMIF(metric, ">="&threshold, ...) returns for whole thresholds.
+
+    Rows are bucketed by the floor of the metric, so the size is bounded by the number of
+    distinct whole values instead of the number of rows.
+    """
+
+    def __init__(self):
+        self.__buckets: Dict[int, List[int]] = {}
+
+    def add(self, value: Any, messages: int, total_bytes: int, delivery_bytes: int) -> None:
+        # Blank cells are never matched by SUMIF
+        if not isinstance(value, (int, float)):
+            return
+        key = floor(value)
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            self.__buckets[key] = [messages, total_bytes, delivery_bytes]
+        else:
+            bucket[0] += messages
+            bucket[1] += total_bytes
+            bucket[2] += delivery_bytes
+
+    def cumulative(self) -> List[CumulativeRow]:
+        """
+        Running totals from the highest threshold down. For a threshold T the answer is the
+        row with the smallest threshold >= T, which is what MATCH(T, thresholds, -1) finds.
+        """
+        rows = []
+        messages = total_bytes = delivery_bytes = 0
+        for key in sorted(self.__buckets, reverse=True):
+            m, b, d = self.__buckets[key]
+            messages += m
+            total_bytes += b
+            delivery_bytes += d
+            rows.append((key, messages, total_bytes, delivery_bytes))
+        return rows
+
+    def at_least(self, threshold: float) -> Tuple[int, int, int]:
+        """Totals of the rows whose metric is >= threshold, for checking the lookup tables."""
+        for key, messages, total_bytes, delivery_bytes in reversed(self.cumulative()):
+            if key >= threshold:
+                return messages, total_bytes, delivery_bytes
+        return 0, 0, 0
+
+
+@dataclass
+class TableSummary:
+    """
+    Totals and threshold distributions of one data table, collected while its rows are written.
+    """
+    parts: List[str] = field(default_factory=list)
+    messages: int = 0
+    total_bytes: int = 0
+    delivery_bytes: int = 0
+    per_day: ThresholdDistribution = field(default_factory=ThresholdDistribution)
+    autonomy: ThresholdDistribution = field(default_factory=ThresholdDistribution)
+
+
+class TableSummaryCollector:
+    """
+    Feeds report rows into a TableSummary, the headers decide which cells are read.
+    """
+
+    def __init__(self, headers: Sequence[Any], summary: Optional[TableSummary] = None):
+        index = {str(h): i for i, h in enumerate(headers)}
+        self.summary = summary or TableSummary()
+        self.__messages = index["Messages"]
+        self.__bytes = index["Total Bytes"]
+        self.__delivery = index["Delivery Bytes"]
+        self.__per_day = index["Messages Per Day"]
+        self.__autonomy = index.get("Autonomy Score (%)")
+
+    @staticmethod
+    def supports(headers: Sequence[Any]) -> bool:
+        names = {str(h) for h in headers}
+        return {"Messages", "Total Bytes", "Delivery Bytes", "Messages Per Day"} <= names
+
+    def add(self, row: Sequence[Any]) -> None:
+        s = self.summary
+        messages = row[self.__messages] or 0
+        total_bytes = row[self.__bytes] or 0
+        delivery_bytes = row[self.__delivery] or 0
+        s.messages += messages
+        s.total_bytes += total_bytes
+        s.delivery_bytes += delivery_bytes
+        s.per_day.add(row[self.__per_day], messages, total_bytes, delivery_bytes)
+        if self.__autonomy is not None:
+            s.autonomy.add(row[self.__autonomy], messages, total_bytes, delivery_bytes)
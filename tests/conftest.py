@@ -0,0 +1,41 @@
+import csv
+
+import pytest
+
+# Smart Search columns the tests write, with the value a row gets when it does not set one.
+# The header-from address defaults to the sender.
+SMART_SEARCH_COLUMNS = {
+    'Date': ('date', "2024-03-01T10:00:00.000+0000"),
+    'Sender': ('sender', ""),
+    'Header_From': ('hfrom', None),
+    'Header_Return-Path': ('rpath', ""),
+    'Message_ID': ('msgid', ""),
+    'Message_Size': ('size', 1000),
+    'Subject': ('subject', "Hello"),
+    'Sender_IP_Address': ('ip', "10.0.0.1"),
+}
+
+
+@pytest.fixture
+def write_smart_search_csv(tmp_path):
+    """
+    Write a Smart Search CSV to tmp_path and return its path.
+
+    Rows are dicts keyed by date, sender, hfrom, rpath, msgid, size, subject and ip.
+    """
+
+    def write(rows, name: str = "in.csv") -> str:
+        path = tmp_path / name
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(SMART_SEARCH_COLUMNS)
+            for row in rows:
+                values = []
+                for key, default in SMART_SEARCH_COLUMNS.values():
+                    if default is None:
+                        default = row.get('sender', "")
+                    values.append(row.get(key, default))
+                writer.writerow(values)
+        return str(path)
+
+    return write
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from senderstats.common.agg.aggregator import KeyedAggregator
+from senderstats.common.agg.message import MessageAgg, RunningStats, TopKNormalizedPatterns
+from senderstats.processing.snapshot_manager import SnapshotManager
+
+
+def make_messages(n: int, start: datetime, seed: int) -> list[tuple]:
+    rnd = random.Random(seed)
+    out = []
+    d = start
+    for _ in range(n):
+        d += timedelta(seconds=rnd.randint(1, 600))
+        subj = rnd.choice(["invoice", "reset", "report", "hello", "news"])
+        out.append((rnd.randint(100, 50000), subj, subj, rnd.random() < 0.1, d, rnd.randint(1, 4)))
+    return out
+
+
+def feed(agg: MessageAgg, messages: list[tuple]) -> MessageAgg:
+    for msgsz, subject, snorm, is_resp, d, rcpts in messages:
+        agg.add_message(msgsz, subject, snorm, is_resp, d, rcpt_count=rcpts)
+    return agg
+
+
+@pytest.mark.parametrize("split", [0, 1, 17, 250, 499, 500])
+def test_running_stats_merge_matches_sequential(split):
+    rnd = random.Random(split)
+    values = [rnd.uniform(0, 1e6) for _ in range(500)]
+
+    full = RunningStats()
+    for v in values:
+        full.add(v)
+
+    left, right = RunningStats(), RunningStats()
+    for v in values[:split]:
+        left.add(v)
+    for v in values[split:]:
+        right.add(v)
+    left.merge(right)
+
+    assert left.n == full.n
+    assert left.mean == pytest.approx(full.mean, rel=1e-12)
+    assert left.M2 == pytest.approx(full.M2, rel=1e-9)
+
+
+def test_topk_merge_sums_counts_and_keeps_k():
+    a = TopKNormalizedPatterns(k=3)
+    b = TopKNormalizedPatterns(k=3)
+    for s in ["x"] * 5 + ["y"] * 2 + ["z"]:
+        a.add(s, s.upper())
+    for s in ["y"] * 4 + ["w"] * 3 + ["v"]:
+        b.add(s, s)
+
+    a.merge(b)
+
+    assert len(a.patterns) == 3
+    assert [(k, e.count) for k, e in a.top_items(3)] == [("y", 6), ("x", 5), ("w", 3)]
+    # First-seen sample is kept
+    assert a.patterns["y"].sample == "Y"
+
+
+def test_message_agg_merge_disjoint_ranges_matches_single_pass():
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    msgs = make_messages(400, start, seed=7)
+
+    full = feed(MessageAgg(), msgs)
+    merged = feed(MessageAgg(), msgs[:150])
+    merged.merge(feed(MessageAgg(), msgs[150:]))
+
+    assert merged.messages == full.messages
+    assert merged.total_bytes_original == full.total_bytes_original
+    assert merged.total_recipients == full.total_recipients
+    assert merged.total_recipients_bytes == full.total_recipients_bytes
+    assert merged.responses == full.responses
+    assert merged.first_date == full.first_date
+    assert merged.last_date == full.last_date
+    assert merged.gap_stats.n == full.gap_stats.n
+    assert merged.gap_stats.mean == pytest.approx(full.gap_stats.mean)
+    assert merged.size_stats.std() == pytest.approx(full.size_stats.std())
+    assert {k: e.count for k, e in merged.norm_patterns.patterns.items()} == \
+           {k: e.count for k, e in full.norm_patterns.patterns.items()}
+
+
+def test_message_agg_merge_reversed_order():
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    msgs = make_messages(100, start, seed=3)
+
+    full = feed(MessageAgg(), msgs)
+    merged = feed(MessageAgg(), msgs[60:])
+    merged.merge(feed(MessageAgg(), msgs[:60]))
+
+    assert merged.first_date == full.first_date
+    assert merged.last_date == full.last_date
+    assert merged.gap_stats.n == full.gap_stats.n
+    assert merged.gap_stats.mean == pytest.approx(full.gap_stats.mean)
+
+
+def test_keyed_aggregator_state_round_trip(tmp_path):
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    agg = KeyedAggregator(agg_factory=MessageAgg)
+    feed(agg.get("a@example.com"), make_messages(50, start, seed=1))
+    feed(agg.get("b@example.com"), make_messages(20, start, seed=2))
+
+    path = str(tmp_path / "run.snap")
+    SnapshotManager.save(path, {"sample_subject": True}, {"mfrom": agg.get_state()})
+    snapshot = SnapshotManager.load(path)
+
+    restored = KeyedAggregator(agg_factory=MessageAgg)
+    restored.merge_state(snapshot.state["mfrom"])
+
+    assert snapshot.options == {"sample_subject": True}
+    assert restored.get_state() == agg.get_state()
+
+
+def test_snapshot_rejects_incompatible_options(tmp_path):
+    a, b = str(tmp_path / "a.snap"), str(tmp_path / "b.snap")
+    SnapshotManager.save(a, {"sample_subject": True}, {})
+    SnapshotManager.save(b, {"sample_subject": False}, {})
+
+    with pytest.raises(ValueError):
+        SnapshotManager.merge_options([SnapshotManager.load(a), SnapshotManager.load(b)])
+
+
+def test_snapshot_rejects_foreign_file(tmp_path):
+    path = tmp_path / "junk.snap"
+    path.write_bytes(b"not a snapshot at all")
+
+    with pytest.raises(ValueError):
+        SnapshotManager.load(str(path))
+
+
+def test_snapshot_rejects_different_filters(tmp_path):
+    a, b, c = (str(tmp_path / name) for name in ("a.snap", "b.snap", "c.snap"))
+    SnapshotManager.save(a, {"exclude_domains": ["Example.com", "b.org"]}, {})
+    SnapshotManager.save(b, {"exclude_domains": ["b.org", "example.com"]}, {})
+    SnapshotManager.save(c, {"exclude_domains": ["b.org"]}, {})
+    SnapshotManager.merge_options([SnapshotManager.load(a), SnapshotManager.load(b)])
+    with pytest.raises(ValueError, match="exclude_domains"):
+        SnapshotManager.merge_options([SnapshotManager.load(a), SnapshotManager.load(c)])
+
+
+def test_truncated_snapshot_raises_value_error(tmp_path):
+    path = tmp_path / "a.snap"
+    SnapshotManager.save(str(path), {}, {"mfrom": {str(i): i for i in range(1000)}})
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+    with pytest.raises(ValueError, match="Corrupt snapshot"):
+        SnapshotManager.load(str(path))
@@ -0,0 +1,73 @@
+import os
+
+from senderstats.processing.aggregate_cache import AggregateCache
+
+
+def write_input(tmp_path, name="in.csv", body="a,b\n1,2\n"):
+    path = tmp_path / name
+    path.write_text(body)
+    return str(path)
+
+
+def test_cache_hit_after_put(tmp_path):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    input_file = write_input(tmp_path)
+    key = cache.key_for(input_file, cache.config_hash({"sample_subject": False}))
+
+    assert cache.get(key) is None
+    cache.put(key, {"sample_subject": False}, {"processors": {"mfrom": [("a@b.com", 1)]}})
+
+    assert cache.get(key) == {"processors": {"mfrom": [("a@b.com", 1)]}}
+    assert (cache.get_hits(), cache.get_misses()) == (1, 1)
+
+
+def test_cache_key_changes_with_options_and_file(tmp_path):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024)
+    input_file = write_input(tmp_path)
+    h1 = cache.config_hash({"sample_subject": False})
+    h2 = cache.config_hash({"sample_subject": True})
+    key = cache.key_for(input_file, h1)
+
+    assert key != cache.key_for(input_file, h2)
+
+    write_input(tmp_path, body="a,b\n1,2\n3,4\n")
+    assert key != cache.key_for(input_file, h1)
+
+
+def test_content_key_ignores_path_and_mtime(tmp_path):
+    cache = AggregateCache(str(tmp_path / "cache"), 1024 * 1024, key_mode="content")
+    a = write_input(tmp_path, "a.csv")
+    b = write_input(tmp_path, "b.csv")
+    os.utime(b, (0, 0))
+    h = cache.config_hash({})
+
+    assert cache.key_for(a, h) == cache.key_for(b, h)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache_dir = tmp_path / "cache"
+    state = {"processors": {"mfrom": [(f"user{i}@example.com", i) for i in range(100)]}}
+
+    AggregateCache(str(cache_dir), 10 * 1024 * 1024).put("first", {}, state)
+    entry_size = os.path.getsize(cache_dir / "first.snap")
+    os.utime(cache_dir / "first.snap", (0, 0))
+
+    cache = AggregateCache(str(cache_dir), entry_size * 3 // 2)
+    cache.put("second", {}, state)
+
+    assert os.listdir(cache_dir) == ["second.snap"]
+    assert cache.clear() == 1
+
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = AggregateCache(str(cache_dir), 1024 * 1024)
+    key = cache.key_for(write_input(tmp_path), cache.config_hash({}))
+    cache.put(key, {}, {"processors": {"mfrom": [(f"s{i}@b.com", i) for i in range(1000)]}})
+
+    entry = next(cache_dir.iterdir())
+    entry.write_bytes(entry.read_bytes()[:entry.stat().st_size // 2])
+
+    assert cache.get(key) is None
+    assert cache.get_misses() == 1
+    assert not entry.exists()
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from senderstats.common.agg import metrics as metrics_module
+from senderstats.common.agg.message import MessageAgg
+from senderstats.common.agg.metrics import compute_message_agg_metrics, compute_message_agg_metrics_batch
+
+
+def make_aggs() -> list:
+    rnd = random.Random(11)
+    aggs = [MessageAgg()]
+    for i in range(300):
+        agg = MessageAgg()
+        patterns = rnd.choice((1, 3, 10, 100))
+        for _ in range(rnd.randint(1, 200)):
+            # Empty subjects are not tracked and end up in the entropy tail
+            normalized = "" if rnd.random() < 0.1 else f"subject {rnd.randint(0, patterns)}"
+            agg.add_message(rnd.randint(100, 9000), normalized, normalized, rnd.random() < 0.1, None)
+        aggs.append(agg)
+    return aggs
+
+
+def test_batch_metrics_match_the_per_key_code():
+    pytest.importorskip("numpy")
+    aggs = make_aggs()
+    for agg, batch in zip(aggs, compute_message_agg_metrics_batch(aggs, days=3.0, report_top_n=5)):
+        scalar = compute_message_agg_metrics(agg, days=3.0, report_top_n=5)
+        assert batch.top_items == scalar.top_items
+        for name in ("top_mass", "top3_mass", "top1_ratio", "entropy"):
+            assert getattr(batch, name) == pytest.approx(getattr(scalar, name), rel=1e-12, abs=1e-12), name
+        assert (batch.total_messages, batch.messages_per_day, batch.reply_ratio, batch.gap_cv) == \
+               (scalar.total_messages, scalar.messages_per_day, scalar.reply_ratio, scalar.gap_cv)
+
+
+def test_batch_metrics_fall_back_to_the_per_key_code(monkeypatch):
+    monkeypatch.setattr(metrics_module, "np", None)
+    aggs = make_aggs()[:20]
+    assert compute_message_agg_metrics_batch(aggs, days=2.0, report_top_n=3) == \
+           [compute_message_agg_metrics(agg, days=2.0, report_top_n=3) for agg in aggs]
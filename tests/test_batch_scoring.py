@@ -0,0 +1,53 @@
+import itertools
+import random
+
+import pytest
+
+from senderstats.common.agg import batch_scoring
+from senderstats.common.agg.batch_scoring import compute_sender_scores_batch
+from senderstats.common.agg.scoring import compute_sender_scores_and_label
+
+FIELDS = ("total_messages", "messages_per_day", "reply_ratio", "top_mass", "top3_mass", "top1_ratio", "ent")
+
+
+def sample_inputs() -> list:
+    # Label and cap boundaries plus random senders
+    grid = list(itertools.product(
+        (0, 1, 24, 25, 500),
+        (0.0, 0.5, 1.0, 19.99, 20.0, 60.0, 150.0),
+        (0.0, 0.02, 0.3, 0.4, 1.0),
+        (0.0, 0.95, 1.0),
+    ))
+    rows = [(n, rpd, rr, t1, t1, t1, 1.0 - t1) for n, rpd, rr, t1 in grid]
+
+    rnd = random.Random(7)
+    for _ in range(2000):
+        t1 = rnd.random()
+        t3 = min(1.0, t1 + rnd.random() * 0.3)
+        rows.append((rnd.randint(0, 5000), rnd.expovariate(0.05), rnd.random() * 0.5,
+                     min(1.0, t3 + rnd.random() * 0.2), t3, t1, rnd.random()))
+    return rows
+
+
+def batch_for(rows: list) -> list:
+    return compute_sender_scores_batch(**{f: [r[i] for r in rows] for i, f in enumerate(FIELDS)})
+
+
+def test_batch_scores_match_the_scalar_code():
+    pytest.importorskip("numpy")
+    rows = sample_inputs()
+    for row, batch in zip(rows, batch_for(rows)):
+        scalar = compute_sender_scores_and_label(**dict(zip(FIELDS, row)))
+        assert batch.label == scalar.label, row
+        for name in ("p_template", "p_volume", "p_app_like", "p_human", "p_final", "p_rank", "sort_score"):
+            assert getattr(batch, name) == pytest.approx(getattr(scalar, name), rel=1e-12, abs=1e-12), (name, row)
+
+
+def test_batch_scores_fall_back_to_the_scalar_code(monkeypatch):
+    monkeypatch.setattr(batch_scoring, "np", None)
+    rows = sample_inputs()[:50]
+    assert batch_for(rows) == [compute_sender_scores_and_label(**dict(zip(FIELDS, row))) for row in rows]
+
+
+def test_empty_batch():
+    assert batch_for([]) == []
@@ -0,0 +1,95 @@
+import pytest
+
+from senderstats.core.mappers import CSVMapper
+from senderstats.data import csv_data_source
+from senderstats.data.csv_data_source import CSVDataSource
+
+
+def write_csv(tmp_path, name, rows):
+    path = tmp_path / name
+    lines = ["Sender,Message_Size,Subject"] + [f'{s},{n},"{subj}"' for s, n, subj in rows]
+    path.write_bytes(("\ufeff" + "\r\n".join(lines) + "\r\n").encode("utf-8"))
+    return str(path)
+
+
+def new_source(files, track_offsets=True):
+    return CSVDataSource(files, CSVMapper({'mfrom': 'Sender', 'msgsz': 'Message_Size', 'subject': 'Subject'}),
+                         track_offsets=track_offsets)
+
+
+def values(messages):
+    return [(m.mfrom, m.msgsz, m.subject) for m in messages]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    a = write_csv(tmp_path, "a.csv", [(f"a{i}@example.com", i, f"line\r\nbreak {i}") for i in range(10)])
+    b = write_csv(tmp_path, "b.csv", [(f"b{i}@example.com", i, f"subject {i} é€") for i in range(10)])
+    return [a, b]
+
+
+@pytest.mark.parametrize("stop", [0, 3, 9, 10, 14, 19])
+def test_resume_continues_after_last_row(inputs, stop):
+    expected = values(new_source(inputs, track_offsets=False).read_data())
+
+    source = new_source(inputs)
+    reader = source.read_data()
+    consumed = [next(reader) for _ in range(stop + 1)]
+    progress = source.get_progress()
+
+    resumed = new_source(inputs)
+    resumed.resume(progress)
+
+    assert values(consumed) + values(resumed.read_data()) == expected
+
+
+def test_resume_rejects_changed_file(inputs, tmp_path):
+    source = new_source(inputs)
+    reader = source.read_data()
+    for _ in range(12):
+        next(reader)
+    progress = source.get_progress()
+
+    write_csv(tmp_path, "a.csv", [("changed@example.com", 1, "x")])
+
+    with pytest.raises(ValueError):
+        new_source(inputs).resume(progress)
+
+
+def test_text_mode_splits_bare_carriage_returns(tmp_path):
+    path = tmp_path / "cr.csv"
+    path.write_bytes(b"Sender,Message_Size,Subject\ra@example.com,1,x\rb@example.com,2,y\r")
+
+    assert values(new_source([str(path)], track_offsets=False).read_data()) == [
+        ("a@example.com", 1, "x"), ("b@example.com", 2, "y")]
+
+
+@pytest.mark.parametrize("newline", [b"\r", b"\n", b"\r\n"])
+def test_checkpointed_reader_splits_every_line_ending(tmp_path, newline):
+    path = tmp_path / "in.csv"
+    rows = [b"Sender,Message_Size,Subject", b"a@example.com,1,x", b'b@example.com,2,"two' + newline + b'lines"',
+            b"c@example.com,3,z"]
+    path.write_bytes(newline.join(rows) + newline)
+
+    expected = [("a@example.com", 1, "x"), ("b@example.com", 2, "two\nlines"), ("c@example.com", 3, "z")]
+    assert values(new_source([str(path)], track_offsets=False).read_data()) == expected
+
+    source = new_source([str(path)])
+    reader = source.read_data()
+    first = next(reader)
+    resumed = new_source([str(path)])
+    resumed.resume(source.get_progress())
+    assert values([first]) + values(resumed.read_data()) == expected
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 7])
+def test_line_endings_split_across_chunks(inputs, monkeypatch, chunk):
+    monkeypatch.setattr(csv_data_source, "_READ_CHUNK", chunk)
+    expected = values(new_source(inputs, track_offsets=False).read_data())
+
+    source = new_source(inputs)
+    reader = source.read_data()
+    consumed = [next(reader) for _ in range(5)]
+    resumed = new_source(inputs)
+    resumed.resume(source.get_progress())
+    assert values(consumed) + values(resumed.read_data()) == expected
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from senderstats.cli_args import parse_ingest_arguments
+from senderstats.data.columnar_store import ColumnarReader, ColumnarWriter, is_columnar_file
+from senderstats.data.message_data import MessageData
+from senderstats.processing.ingest_manager import IngestManager
+
+FIELDS = ['mfrom', 'rcpts', 'msgsz', 'date']
+
+
+def message(mfrom, rcpts, msgsz, date):
+    m = MessageData()
+    m.mfrom, m.rcpts, m.msgsz, m.date = mfrom, rcpts, msgsz, date
+    return m
+
+
+ROWS = [
+    ('a@example.com', ['x@y.com', 'z@y.com'], 1200,
+     datetime(2024, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)),
+    ('b@example.com', [], -1,
+     datetime(2024, 3, 1, 9, 0, tzinfo=timezone(timedelta(hours=-5)))),
+    ('a@example.com', ['x@y.com'], 2 ** 40,
+     datetime(1999, 12, 31, 23, 59, 59, 999999)),
+    ('ünïcode@exämple.com', ['ß@y.com'], 0,
+     datetime(2024, 3, 2, 0, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))),
+]
+
+
+def write_store(path):
+    writer = ColumnarWriter(FIELDS)
+    for row in ROWS:
+        writer.add(message(*row))
+    writer.write(str(path), {'mappings': {'mfrom': 'Sender'}})
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    path = write_store(tmp_path / "in.ssc")
+
+    reader = ColumnarReader(path)
+    rows = list(reader.iter_rows())
+
+    assert is_columnar_file(path)
+    assert reader.get_row_count() == len(ROWS)
+    assert reader.header['mappings'] == {'mfrom': 'Sender'}
+    assert rows == ROWS
+    for (_, _, _, stored), (_, _, _, original) in zip(rows, ROWS):
+        assert stored.utcoffset() == original.utcoffset()
+
+
+def test_reads_only_requested_fields(tmp_path):
+    path = write_store(tmp_path / "in.ssc")
+
+    assert list(ColumnarReader(path).iter_rows(['msgsz', 'mfrom'])) == [(r[2], r[0]) for r in ROWS]
+
+
+def test_missing_field_and_foreign_file(tmp_path):
+    path = write_store(tmp_path / "in.ssc")
+    with pytest.raises(ValueError):
+        list(ColumnarReader(path).iter_rows(['subject']))
+
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("Sender,Date\n")
+    assert not is_columnar_file(str(csv_path))
+    with pytest.raises(ValueError):
+        ColumnarReader(str(csv_path))
+
+
+def test_ingest_skips_rows_with_unparsable_dates(tmp_path):
+    source = tmp_path / "in.csv"
+    source.write_text("Date,Sender,Message_Size\n"
+                      "2024-03-01T10:00:00.000+0000,a@example.com,100\n"
+                      ",b@example.com,200\n"
+                      "yesterday,,not-a-size\n"
+                      "2024-03-01T11:00:00.000+0000,c@example.com,300\n")
+    out = tmp_path / "out.ssc"
+    ingest = IngestManager(parse_ingest_arguments(["-i", str(source), "-o", str(out)]))
+
+    assert ingest.ingest() == 2
+    assert ingest.get_skipped_rows() == 2
+    assert [row[0] for row in ColumnarReader(str(out)).iter_rows(['mfrom'])] == ["a@example.com", "c@example.com"]
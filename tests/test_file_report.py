@@ -0,0 +1,88 @@
+import csv
+import json
+
+import pytest
+
+from senderstats.cli import create_report
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.interrupt_handler import PartialRun
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+from senderstats.reporting.file_report import (CSVReportWriter, JSONLReportWriter, PARTIAL_RUN_FILE,
+                                               ParquetReportWriter, parquet_column_types, report_file_name)
+
+ROWS = [["MFrom", "Messages", "Avg Msg Size", "Messages Per Day"],
+        ["a@example.com", 3, 1234.5678901234567, 1.5],
+        ["Other (2 keys)", 7, 10.0, None]]
+
+
+def test_csv_writer_keeps_full_precision(tmp_path):
+    path = tmp_path / "r.csv"
+    assert CSVReportWriter().write(str(path), iter(ROWS)) == 2
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[1] == ["a@example.com", "3", "1234.5678901234567", "1.5"]
+    assert rows[2][3] == ""
+
+
+def test_jsonl_writer_writes_one_object_per_row(tmp_path):
+    path = tmp_path / "r.jsonl"
+    assert JSONLReportWriter().write(str(path), iter(ROWS)) == 2
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == [dict(zip(ROWS[0], row)) for row in ROWS[1:]]
+
+
+def test_parquet_writer_types_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "r.parquet"
+    rows = [ROWS[0]] + [[f"s{i}@example.com", i, float(i), i / 2] for i in range(10)] + ROWS[2:]
+    assert ParquetReportWriter(batch_rows=4).write(str(path), iter(rows)) == 11
+
+    table = pq.read_table(str(path))
+    assert [str(t) for t in table.schema.types] == ["string", "int64", "double", "double"]
+    assert table.to_pylist()[-1] == dict(zip(ROWS[0], ROWS[2]))
+
+
+def test_parquet_column_types_do_not_depend_on_the_first_batch():
+    headers = ["MFrom", "Messages", "Avg Msg Size", "Messages Per Day", "Max Messages", "Count", "Notes"]
+    # A first batch with only the Other row, whose averages are whole numbers and rates blank
+    batch = [["Other (2 keys)", 7, 10, None, None, 3, None]]
+    assert parquet_column_types(headers, batch) == ["string", "int64", "float64", "float64", "int64", "float64",
+                                                    "string"]
+    assert parquet_column_types(["Date", "Messages"], []) == ["string", "int64"]
+
+
+def test_report_file_name():
+    assert report_file_name("MFrom + Message ID") == "MFrom_Message_ID"
+    assert report_file_name("Envelope Senders") == "Envelope_Senders"
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl"])
+def test_file_report_writes_one_file_per_report(tmp_path, write_smart_search_csv, output_format):
+    input_file = write_smart_search_csv(
+        {'date': f"2024-03-0{d}T10:00:00.000+0000", 'sender': f"user{i}@example.com", 'size': 1000 + i, 'subject': "Hi"}
+        for d in (1, 2) for i in range(5))
+    output_dir = tmp_path / "out"
+
+    config = ConfigManager(parse_arguments(["-i", input_file, "-o", str(output_dir), "--gen-hfrom",
+                                            "--output-format", output_format]))
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+
+    report = create_report(config, pipeline_manager, PartialRun([], [input_file]))
+    report.generate()
+    report.close()
+
+    names = sorted(p.name for p in output_dir.iterdir())
+    assert names == sorted([f"Envelope_Senders.{output_format}", f"Header_From.{output_format}",
+                            f"Hourly_Metrics.{output_format}", PARTIAL_RUN_FILE])
+    assert list(report.get_files().values()) == [5, 5, 2]
+
+
+def test_non_xlsx_output_must_be_a_directory():
+    with pytest.raises(SystemExit):
+        parse_arguments(["-i", "in.csv", "-o", "out.xlsx", "--output-format", "csv"])
+    with pytest.raises(SystemExit):
+        parse_arguments(["-i", "in.csv", "-o", "out"])
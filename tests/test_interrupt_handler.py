@@ -0,0 +1,27 @@
+import os
+import signal
+
+import pytest
+
+from senderstats.processing.interrupt_handler import InterruptHandler, PartialRun
+
+
+def test_first_interrupt_requests_stop_second_aborts():
+    with InterruptHandler() as interrupt:
+        signal.raise_signal(signal.SIGINT)
+        assert interrupt.requested
+
+        with pytest.raises(KeyboardInterrupt):
+            signal.raise_signal(signal.SIGINT)
+
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_partial_run_from_progress():
+    files = ["a.csv", "b.csv", "c.csv", "d.csv"]
+    progress = {
+        'completed': [{'path': os.path.abspath("a.csv")}, {'path': os.path.abspath("c.csv")}],
+        'current': {'path': os.path.abspath("d.csv"), 'position': 100},
+    }
+
+    assert PartialRun.from_progress(files, progress) == PartialRun(["d.csv"], ["b.csv"])
@@ -0,0 +1,48 @@
+from senderstats.cli_args import parse_arguments
+from senderstats.common.agg.aggregator import KeyedAggregator
+from senderstats.common.agg.memory import measure_aggregator
+from senderstats.common.agg.message import MessageAgg
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.memory_report import MemoryReport
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+
+
+def test_patterns_are_measured_per_key():
+    plain, subjects = KeyedAggregator(agg_factory=MessageAgg), KeyedAggregator(agg_factory=MessageAgg)
+    for i in range(100):
+        plain.get(f"user{i}@example.com").add_message(1000, "", "", False, None)
+        for j in range(10):
+            subject = f"Invoice {i} {j}"
+            subjects.get(f"user{i}@example.com").add_message(1000, subject, subject, False, None)
+
+    plain_memory, subjects_memory = measure_aggregator(plain), measure_aggregator(subjects)
+    assert plain_memory.keys == subjects_memory.keys == 100
+    assert plain_memory.key_bytes == subjects_memory.key_bytes > 0
+    assert subjects_memory.pattern_bytes > plain_memory.pattern_bytes
+    assert subjects_memory.total_bytes == int(100 * subjects_memory.bytes_per_key)
+
+
+def test_memory_is_recorded_at_file_boundaries(tmp_path, write_smart_search_csv):
+    files = [write_smart_search_csv(({'sender': f"user{n}{i}@example.com", 'hfrom': "a@example.com"}
+                                     for i in range(10 * n)), f"in{n}.csv")
+             for n in (1, 2)]
+
+    config = ConfigManager(parse_arguments(["-i", *files, "-o", str(tmp_path / "out.xlsx"), "--gen-hfrom",
+                                            "--memory-trace"]))
+    pipeline_manager = PipelineManager(config)
+    data_source_manager = DataSourceManager(config)
+    memory_report = MemoryReport(pipeline_manager, trace=config.memory_trace)
+    data_source_manager.get_data_source().add_file_listener(memory_report.file_completed)
+    PipelineProcessor(data_source_manager, pipeline_manager).process_data()
+    memory_report.measure()
+
+    # Input files are processed in no particular order
+    first, second = memory_report.file_snapshots
+    first_senders = 10 if config.input_files[0] == files[0] else 20
+    assert first['keys'] == {'MFromProcessor': first_senders, 'HFromProcessor': 1}
+    assert second['keys'] == {'MFromProcessor': 30, 'HFromProcessor': 1}
+    assert second['input_bytes'] > first['input_bytes']
+    assert second['top_allocations'] and second['traced_bytes'] > 0
+    assert memory_report.to_dict()['aggregators']['MFromProcessor']['keys'] == 30
@@ -0,0 +1,62 @@
+import time
+
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.metrics_exporter import MetricsExporter
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+
+
+def samples(text: str) -> dict:
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+            if not line.startswith('#')}
+
+
+def test_metrics_file_is_written_periodically_and_at_the_end(tmp_path, write_smart_search_csv):
+    path = write_smart_search_csv({'sender': f"user{i}@{'pphosted.com' if i < 3 else 'example.com'}",
+                                   'hfrom': "a@example.com"} for i in range(10))
+    metrics_file = tmp_path / "senderstats.prom"
+    config = ConfigManager(parse_arguments(["-i", path, "-o", str(tmp_path / "out.xlsx"),
+                                            "--metrics-file", str(metrics_file)]))
+    pipeline_manager = PipelineManager(config)
+    processor = PipelineProcessor(DataSourceManager(config), pipeline_manager)
+    exporter = MetricsExporter(str(metrics_file), pipeline_manager, processor.get_rows_read, interval=0.01)
+    exporter.start()
+    time.sleep(0.1)
+    assert samples(metrics_file.read_text())['senderstats_run_finished'] == 0
+
+    processor.process_data()
+    assert exporter.finish()
+
+    text = metrics_file.read_text()
+    assert text.endswith("# EOF\n")
+    values = samples(text)
+    assert values['senderstats_rows_total'] == 10
+    assert values['senderstats_excluded_messages_total{filter="exclude_domain"}'] == 3
+    # Stages are only timed with --stage-timing
+    assert pipeline_manager.get_stage_timer() is None
+    assert not any(name.startswith('senderstats_stage_') for name in values)
+    assert values['senderstats_run_finished'] == 1
+    assert 'senderstats_cache_hits_total' not in values
+    assert not (tmp_path / "senderstats.prom.tmp").exists()
+
+
+def test_stage_metrics_with_stage_timing(tmp_path, write_smart_search_csv):
+    path = write_smart_search_csv({'sender': f"user{i}@example.com", 'hfrom': "a@example.com"} for i in range(5))
+    config = ConfigManager(parse_arguments(["-i", path, "-o", str(tmp_path / "out.xlsx"),
+                                            "--metrics-file", str(tmp_path / "m.prom"), "--stage-timing"]))
+    pipeline_manager = PipelineManager(config)
+    processor = PipelineProcessor(DataSourceManager(config), pipeline_manager)
+    processor.process_data()
+
+    values = samples(MetricsExporter(str(tmp_path / "m.prom"), pipeline_manager, processor.get_rows_read).render())
+    assert values['senderstats_rows_total'] == 5
+    assert values['senderstats_stage_rows_total{stage="MFromProcessor",kind="Processor"}'] == 5
+
+
+def test_unwritable_metrics_file_does_not_raise(tmp_path, capsys):
+    config = ConfigManager(parse_arguments(["-i", "in.csv", "-o", str(tmp_path / "out.xlsx")]))
+    exporter = MetricsExporter(str(tmp_path / "missing" / "m.prom"), PipelineManager(config), lambda: 0)
+    assert not exporter.finish()
+    assert "Unable to write metrics" in capsys.readouterr().out
@@ -8,6 +8,7 @@ from statistics import median
 
 import pytest
 
+from senderstats.common.address_parser import parse_email_details_tuple
 from senderstats.common.mid_parser import MIDParser
 from senderstats.common.tld_parser import get_default_tld_parser
 
@@ -91,6 +92,38 @@ def msgids() -> list[str]:
     return gen_message_ids(1_000_000)
 
 
+def reference_parse(tld, mid: str) -> tuple[str, str, str, str]:
+    # Address parser and splitter without the <local@host> fast path or the cache
+    _, _, domain = parse_email_details_tuple(mid)
+    if not domain:
+        return "", "", "", ""
+    if ':' in domain or '[' in domain or ']' in domain or '.' not in domain or MIDParser.is_ipv4_fast(domain):
+        return domain, "", "", ""
+    return tld.split_host_extended_unchecked(domain.rstrip('.').lower())
+
+
+def test_fast_path_and_cache_match_address_parser():
+    tld = get_default_tld_parser()
+    rnd = random.Random(7)
+    odd = [
+        "".join(rnd.choice('ab@<>. "\n[]:-_Z1!\t') for _ in range(rnd.randint(0, 12)))
+        for _ in range(20_000)
+    ]
+    items = gen_message_ids(20_000) + odd + ["<a@b@c.example.com>", "<x y@mail.example.com>", "<@a@example.com>",
+                                             "<a\n@example.com>", "<a@exa mple.com>", "<a@example.com.>"]
+
+    parser = MIDParser(tld, cache_size=64)
+    for mid in items + items:
+        assert parser.parse(mid) == reference_parse(tld, mid), mid
+
+
+def test_host_cache_is_bounded():
+    parser = MIDParser(get_default_tld_parser(), cache_size=8)
+    for i in range(20):
+        assert parser.parse(f"<id{i}@mail{i}.example.co.uk>") == (f"mail{i}", "", "example.co.uk", "co.uk")
+        assert len(parser._hosts) <= 8
+
+
 @dataclass(frozen=True)
 class Perf:
     name: str
@@ -0,0 +1,20 @@
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+
+
+def test_all_reports_without_subjects(tmp_path, write_smart_search_csv):
+    path = write_smart_search_csv({'sender': "app@example.com", 'rpath': "app@example.com",
+                                   'msgid': f"<{i}@mail.example.com>", 'subject': f"Invoice {i}"} for i in range(5))
+    config = ConfigManager(parse_arguments(["-i", path, "-o", str(tmp_path / "out.xlsx"), "--gen-hfrom",
+                                            "--gen-rpath", "--gen-alignment", "--gen-msgid"]))
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+
+    reports = {name: list(rows) for processor in pipeline_manager.get_active_processors()
+               for name, rows in processor.report(1)}
+    for name in ("Envelope Senders", "Header From", "Return Path", "MFrom + HFrom", "MFrom + Message ID"):
+        matches = [rows for report, rows in reports.items() if report.startswith(name)]
+        assert matches and len(matches[0]) == 2, name
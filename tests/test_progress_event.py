@@ -0,0 +1,61 @@
+import io
+
+from senderstats.cli_args import parse_arguments
+from senderstats.common.progress_line import ProgressLine
+from senderstats.data import progress_event
+from senderstats.data.progress_event import ProgressTracker
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_updates_are_throttled_and_rates_smoothed(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progress_event.time, "perf_counter", clock)
+    events = []
+    tracker = ProgressTracker(total_bytes=1000, listener=events.append, interval=1.0, smoothing=0.5)
+
+    tracker.update("a.csv", 1, 1, rows=0, bytes_read=0)
+    clock.now = 0.5
+    tracker.update("a.csv", 1, 1, rows=50, bytes_read=50)
+    assert not events
+
+    clock.now = 1.0
+    tracker.update("a.csv", 1, 1, rows=100, bytes_read=100)
+    clock.now = 2.0
+    tracker.update("a.csv", 1, 1, rows=400, bytes_read=400)
+
+    first, second = events
+    assert (first.rows_per_second, first.eta_seconds) == (100.0, 9.0)
+    assert second.bytes_per_second == 200.0
+    assert second.eta_seconds == 3.0
+    assert second.fraction == 0.4
+
+
+def test_csv_data_source_reports_progress_of_all_files(tmp_path, write_smart_search_csv):
+    files = [write_smart_search_csv(({'sender': f"user{i}@example.com", 'hfrom': "a@example.com"} for i in range(2000)),
+                                    f"in{n}.csv")
+             for n in (1, 2)]
+
+    config = ConfigManager(parse_arguments(["-i", *files, "-o", str(tmp_path / "out.xlsx")]))
+    data_source = DataSourceManager(config).get_data_source()
+    events = []
+    data_source.add_progress_listener(events.append, interval=0)
+    assert sum(1 for _ in data_source.read_data()) == 4000
+
+    done = [event for event in events if event.file_done]
+    assert [event.file_index for event in done] == [1, 2]
+    assert done[-1].rows == 4000 and done[-1].fraction == 1.0
+
+    output = io.StringIO()
+    render = ProgressLine(output)
+    render(events[0])
+    render(done[-1])
+    assert "rows/s" in output.getvalue() and output.getvalue().endswith("\r")
@@ -0,0 +1,77 @@
+import pytest
+
+from senderstats.common.psl_trie import MappedTrieNodes, compile_rules, main, parse_rules
+from senderstats.common.tld_parser import TLDParser, get_default_tld_parser
+
+PSL = """// ===BEGIN ICANN DOMAINS===
+com
+uk
+co.uk
+
+// Wildcard with an exception
+*.ck
+!www.ck
+github.io extra text after the rule is ignored
+"""
+
+HOSTS = ["example.com", "a.b.example.co.uk", "foo.bar.ck", "www.ck", "a.www.ck", "user.github.io", "co.uk",
+         "localhost", "example.org", "x.example.com."]
+
+
+def raw_nodes(rules):
+    # The dict schema TLDParser is constructed from
+    nodes = [{"c": {}, "r": False, "e": False}]
+    for rule in rules:
+        exception = rule.startswith("!")
+        cur = 0
+        for label in reversed(rule.lstrip("!").split(".")):
+            if label not in nodes[cur]["c"]:
+                nodes.append({"c": {}, "r": False, "e": False})
+                nodes[cur]["c"][label] = len(nodes) - 1
+            cur = nodes[cur]["c"][label]
+        nodes[cur]["e" if exception else "r"] = True
+    return nodes
+
+
+def test_parse_rules_skips_comments_and_trailing_text():
+    assert parse_rules(PSL) == ["com", "uk", "co.uk", "*.ck", "!www.ck", "github.io"]
+
+
+def test_binary_trie_splits_like_the_dict_trie(tmp_path):
+    rules = parse_rules(PSL)
+    path = tmp_path / "psl.bin"
+    path.write_bytes(compile_rules(rules))
+
+    mapped, reference = TLDParser.load_trie(str(path)), TLDParser(raw_nodes(rules))
+    for host in HOSTS:
+        assert mapped.split_host_extended_safe(host) == reference.split_host_extended_safe(host)
+    assert mapped.split_host_batch_safe(HOSTS) == reference.split_host_batch_safe(HOSTS)
+
+    assert mapped.split_host_safe("foo.bar.ck") == ("", "foo.bar.ck", "bar.ck")
+
+
+def test_nodes_are_decoded_on_first_access():
+    nodes = MappedTrieNodes(compile_rules(parse_rules(PSL)))
+    assert dict.__len__(nodes) == 0
+    children, is_rule, has_star, is_exception = nodes[0]
+    assert set(children) == {"com", "uk", "ck", "io"} and not is_rule
+    assert nodes[children["ck"]][2] is True
+    assert dict.__len__(nodes) == 2
+    with pytest.raises(IndexError):
+        nodes[len(nodes)]
+
+
+def test_invalid_file_is_rejected():
+    with pytest.raises(ValueError):
+        MappedTrieNodes(b"PKL!" + bytes(28))
+
+
+def test_builder_and_default_trie(tmp_path):
+    dat, out = tmp_path / "public_suffix_list.dat", tmp_path / "psl.bin"
+    dat.write_text(PSL, encoding="utf-8")
+    main([str(dat), "-o", str(out)])
+    assert TLDParser.load_trie(str(out)).split_host_safe("a.b.example.co.uk") == ("a.b", "example.co.uk", "co.uk")
+
+    parser = get_default_tld_parser()
+    assert isinstance(parser.nodes, MappedTrieNodes)
+    assert parser.split_host_extended_safe("mail.corp.example.com.au") == ("mail", "corp", "example.com.au", "com.au")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from senderstats.common.agg.message import MessageAgg
+from senderstats.common.agg.report import KeyedAggReport, RowSelection
+
+
+def make_items(n: int, seed: int) -> list[tuple[str, MessageAgg]]:
+    rnd = random.Random(seed)
+    items = []
+    for i in range(n):
+        agg = MessageAgg()
+        for _ in range(rnd.randint(1, 40)):
+            agg.add_message(rnd.randint(100, 50000), "", "", False, None, rcpt_count=rnd.randint(1, 3))
+        items.append((f"sender{i}@example.com", agg))
+    return items
+
+
+def rows_for(items, selection: RowSelection) -> list[list]:
+    reporter = KeyedAggReport[str](
+        title="Envelope Senders",
+        key_columns=["MFrom"],
+        key_to_cells=lambda k: [k],
+        report_top_n=50,
+        sample_subject=False,
+        with_probability=False,
+        debug=False,
+        row_selection=selection,
+    )
+    (_, rows), = reporter.report(items, days=2.0)
+    return list(rows)[1:]
+
+
+def column_total(rows: list[list], col: int) -> int:
+    return sum(row[col] for row in rows)
+
+
+def test_default_selection_keeps_first_seen_order():
+    items = make_items(50, seed=1)
+    rows = rows_for(items, RowSelection())
+    assert [row[0] for row in rows] == [key for key, _ in items]
+
+
+@pytest.mark.parametrize("top", [1, 7, 49, 50, 80])
+def test_top_n_matches_full_sort_and_other_keeps_totals(top):
+    items = make_items(50, seed=top)
+    rows = rows_for(items, RowSelection(sort_by="bytes", top=top))
+
+    expected = sorted(items, key=lambda kv: kv[1].total_bytes_original, reverse=True)[:top]
+    listed = rows[:len(expected)]
+    assert [row[4] for row in listed] == [agg.total_bytes_original for _, agg in expected]
+
+    if top < len(items):
+        other = rows[-1]
+        assert other[0] == f"Other ({len(items) - top} keys)"
+        assert other[3] is None
+    else:
+        assert len(rows) == len(items)
+
+    assert column_total(rows, 1) == sum(agg.messages for _, agg in items)
+    assert column_total(rows, 4) == sum(agg.total_bytes_original for _, agg in items)
+    assert column_total(rows, 5) == sum(agg.total_recipients for _, agg in items)
+    assert column_total(rows, 6) == sum(agg.total_recipients_bytes for _, agg in items)
+
+
+def test_min_messages_folds_low_volume_keys():
+    items = make_items(60, seed=3)
+    rows = rows_for(items, RowSelection(min_messages=20))
+
+    kept = [key for key, agg in items if agg.messages >= 20]
+    assert [row[0] for row in rows[:-1]] == kept
+    assert rows[-1][0] == f"Other ({len(items) - len(kept)} keys)"
+    assert column_total(rows, 1) == sum(agg.messages for _, agg in items)
+
+
+def test_top_defaults_to_message_order():
+    items = make_items(30, seed=4)
+    rows = rows_for(items, RowSelection(top=5))
+    assert [row[1] for row in rows[:5]] == sorted((agg.messages for _, agg in items), reverse=True)[:5]
+
+
+def test_score_sort_requires_probability():
+    with pytest.raises(ValueError):
+        rows_for([], RowSelection(sort_by="score"))
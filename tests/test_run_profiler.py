@@ -0,0 +1,60 @@
+import cProfile
+import pstats
+
+import pytest
+
+from senderstats.cli_args import parse_arguments
+from senderstats.interfaces import Processor
+from senderstats.processing.run_profiler import RunProfiler, collapsed_stacks
+
+
+def leaf():
+    return sum(range(20000))
+
+
+def branch():
+    return [leaf() for _ in range(5)]
+
+
+class CountingProcessor(Processor[int]):
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+
+    def execute(self, data: int) -> None:
+        self.rows += 1
+        leaf()
+
+
+def test_collapsed_stacks_follow_the_call_graph():
+    profile = cProfile.Profile()
+    profile.enable()
+    branch()
+    profile.disable()
+
+    lines = collapsed_stacks(pstats.Stats(profile))
+    stacks = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in lines}
+    leaf_stacks = [stack for stack in stacks if stack.split(';')[-1].endswith(':leaf')]
+    assert leaf_stacks and all(':branch;' in stack for stack in leaf_stacks)
+    assert all(weight > 0 for weight in stacks.values())
+
+
+def test_sampled_phase_profiles_some_rows_and_restores_the_pipeline(tmp_path):
+    processor = CountingProcessor()
+    profiler = RunProfiler(str(tmp_path / "profile"), sample_every=4)
+    with profiler.phase('ingest', processor):
+        for i in range(20):
+            processor.handle(i)
+
+    assert processor.rows == 20
+    assert 'handle' not in vars(processor)
+    stats = pstats.Stats(str(tmp_path / "profile" / "ingest.pstats"))
+    execute_calls = [nc for (_, _, name), (_, nc, _, _, _) in stats.stats.items() if name == 'execute']
+    assert execute_calls == [5]
+    assert (tmp_path / "profile" / "ingest.collapsed").read_text()
+
+
+@pytest.mark.parametrize("options", [["--cache-dir", "cache"], ["--two-pass", "--sample-subject"]])
+def test_sampling_requires_the_main_pipeline(options):
+    with pytest.raises(SystemExit):
+        parse_arguments(["-i", "in.csv", "-o", "out.xlsx", "--profile", "profile", "--profile-sample", "10", *options])
@@ -0,0 +1,63 @@
+import re
+import zipfile
+
+import pytest
+from xlsxwriter import Workbook
+
+from senderstats.reporting.format_manager import FormatManager
+from senderstats.reporting.pipeline_processor_report import (ExcelSheetWriter, ReportContext, SummarySheetBuilder,
+                                                             part_sheet_name)
+
+HEADERS = ["MFrom", "Messages", "Avg Msg Size", "Messages Per Day", "Total Bytes", "Total Recipients",
+           "Delivery Bytes"]
+
+
+def write_split_report(path, rows: int, streaming: bool):
+    workbook = Workbook(path, {"constant_memory": streaming})
+    ctx = ReportContext(workbook, FormatManager(workbook), 2, False, streaming=streaming)
+    builder = SummarySheetBuilder(ctx, threshold=100)
+    builder.add_sheets()
+
+    data = [HEADERS] + [[f"user{i}@example.com", 2, 1000.0, 1.0, 2000, 2, 2000] for i in range(rows)]
+    table = ExcelSheetWriter(ctx, max_rows=4).write_report_sheet(
+        sheet_name="Envelope Senders", rows=iter(data), create_table=True, table_name="EnvelopeSenders")
+
+    builder.build(tables={"EnvelopeSenders": table})
+    workbook.close()
+    return table.parts
+
+
+def sheet_rows(z: zipfile.ZipFile, index: int) -> list:
+    sheet = z.read(f"xl/worksheets/sheet{index}.xml").decode()
+    return re.findall(r'<row r="(\d+)"', sheet)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_rows_beyond_the_limit_continue_on_new_sheets(tmp_path, streaming):
+    path = str(tmp_path / "split.xlsx")
+    parts = write_split_report(path, rows=10, streaming=streaming)
+
+    # 3 data rows fit below the header of each part
+    assert parts == ["EnvelopeSenders", "EnvelopeSenders_2", "EnvelopeSenders_3", "EnvelopeSenders_4"]
+
+    with zipfile.ZipFile(path) as z:
+        workbook = z.read("xl/workbook.xml").decode()
+        calc = z.read("xl/worksheets/sheet2.xml").decode()
+        # Summary, _SummaryCalc and _Dist come first
+        assert [len(sheet_rows(z, i)) for i in (4, 5, 6, 7)] == [4, 4, 4, 2]
+
+    for name in ("Envelope Senders", "Envelope Senders (2)", "Envelope Senders (3)", "Envelope Senders (4)"):
+        assert f'name="{name}"' in workbook
+    # Totals on the summary add up every part
+    assert re.search(r'<c r="L2"[^>]*><v>20</v>', calc)
+
+
+def test_report_within_the_limit_is_not_split(tmp_path):
+    assert write_split_report(str(tmp_path / "fits.xlsx"), rows=3, streaming=False) == ["EnvelopeSenders"]
+
+
+def test_part_sheet_names_fit_the_excel_limit():
+    name = "MFrom + Message ID + Something Long"
+    assert part_sheet_name(name, 1) == name
+    assert part_sheet_name(name, 12) == "MFrom + Message ID + Somet (12)"
+    assert len(part_sheet_name(name, 12)) == 31
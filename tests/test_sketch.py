@@ -0,0 +1,111 @@
+import math
+import random
+import re
+import zipfile
+from collections import Counter
+
+from senderstats.cli_args import parse_arguments
+from senderstats.common.agg.message import MessageAgg
+from senderstats.common.agg.report import KeyedAggReport, sketch_bound_note
+from senderstats.common.agg.sketch import CountMinSketch, SketchAggregator
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+from senderstats.reporting.pipeline_processor_report import PipelineProcessorReport
+
+
+def stream(n: int, seed: int) -> list:
+    # A few heavy senders and a long tail of one-off senders
+    rnd = random.Random(seed)
+    return [f"app{rnd.randint(0, 9)}@corp.com" if rnd.random() < 0.3 else f"user{rnd.randint(0, 10 ** 6)}@example.com"
+            for _ in range(n)]
+
+
+def aggregate(keys: list, max_keys: int) -> SketchAggregator:
+    aggregator = SketchAggregator(agg_factory=MessageAgg, max_keys=max_keys)
+    for i, key in enumerate(keys):
+        aggregator.get(key).add_message(1000 + i % 7, "", "", False, None)
+    return aggregator
+
+
+def test_count_min_never_undercounts():
+    keys = stream(20000, 1)
+    sketch = CountMinSketch(width=1024)
+    for key in keys:
+        sketch.add(key)
+    counts = Counter(keys)
+    assert all(sketch.estimate(key) >= count for key, count in counts.items())
+    assert sketch.total == len(keys)
+
+
+def test_heavy_hitters_are_exact_and_totals_are_kept():
+    keys = stream(20000, 2)
+    aggregator = aggregate(keys, max_keys=50)
+    counts = Counter(keys)
+
+    assert len(aggregator.data) < 100
+    for i in range(10):
+        key = f"app{i}@corp.com"
+        assert counts[key] - 1 <= aggregator.data[key].messages <= counts[key]
+        assert aggregator.messages_upper_bound(key) >= counts[key]
+
+    tracked = sum(agg.messages for agg in aggregator.data.values())
+    assert tracked + aggregator.evicted.messages == len(keys)
+    assert aggregator.evictions > 0
+
+
+def test_state_round_trip_merges_sketches():
+    first, second = stream(5000, 3), stream(5000, 4)
+    merged = aggregate(first, max_keys=50)
+    merged.merge_state(aggregate(second, max_keys=50).get_state())
+
+    counts = Counter(first + second)
+    assert merged.sketch.total == len(first) + len(second)
+    assert all(merged.messages_upper_bound(key) >= counts[key] for key in merged.data)
+    assert sum(agg.messages for agg in merged.data.values()) + merged.evicted.messages == len(first) + len(second)
+
+
+def test_report_shows_bounds_and_evicted_totals():
+    keys = stream(5000, 5)
+    aggregator = aggregate(keys, max_keys=20)
+    reporter = KeyedAggReport[str](title="Envelope Senders", key_columns=["MFrom"], key_to_cells=lambda k: [k],
+                                   report_top_n=50, sample_subject=False, with_probability=False, debug=False)
+    (_, rows), = reporter.report(aggregator.items(), days=1.0, sketch=aggregator)
+    header, *rows = list(rows)
+
+    assert header[-1] == "Max Messages"
+    *rows, other = rows
+    assert other[0] == f"Other (0 keys, {aggregator.evictions} evictions)"
+    assert sum(row[1] for row in rows) + other[1] == len(keys)
+    assert all(row[-1] >= row[1] for row in rows)
+
+
+def test_bound_note_states_the_count_min_guarantee():
+    keys = stream(5000, 5)
+    aggregator = aggregate(keys, max_keys=20)
+    sketch = aggregator.sketch
+    assert sketch.overcount_bound() == math.ceil(math.e / sketch.width * len(keys))
+
+    note = sketch_bound_note(aggregator)
+    assert note.startswith(f"Max Messages overcounts by at most {sketch.overcount_bound():,} messages")
+    assert f"width {sketch.width:,}, depth 4, N = {len(keys):,} messages" in note
+
+
+def test_bound_note_is_on_the_summary_sheet(tmp_path, write_smart_search_csv):
+    input_file = write_smart_search_csv({'sender': f"user{i % 50}@example.com"} for i in range(200))
+    output_file = str(tmp_path / "out.xlsx")
+    config = ConfigManager(parse_arguments(["-i", input_file, "-o", output_file, "--sketch-keys", "10"]))
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+    report = PipelineProcessorReport(config.output_file, pipeline_manager, config.with_probability)
+    report.generate()
+    report.close()
+
+    with zipfile.ZipFile(output_file) as z:
+        strings = re.findall(r"<si><t[^>]*>(.*?)</t></si>", z.read("xl/sharedStrings.xml").decode())
+        sheets = {name: z.read(name).decode() for name in z.namelist() if name.startswith("xl/worksheets/sheet")}
+    note = next(i for i, string in enumerate(strings) if string.startswith("Max Messages overcounts"))
+    cell = f'<c r="[A-Z]+[0-9]+"[^>]*t="s"[^>]*><v>{note}</v>'
+    # Only on the Summary sheet, the data sheets end with the Other row
+    assert [name for name, xml in sheets.items() if re.search(cell, xml)] == ["xl/worksheets/sheet1.xml"]
@@ -0,0 +1,77 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from senderstats.cli_args import parse_arguments
+from senderstats.common.agg.aggregator import KeyedAggregator
+from senderstats.common.agg.memory import measure_aggregator
+from senderstats.common.agg.message import MessageAgg
+from senderstats.common.agg.spill import MemoryBudget, SpillingAggregator
+
+
+def stream(n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [(f"user{rnd.randint(0, 500)}@example.com", f"Invoice {rnd.randint(0, 20)}",
+             datetime(2024, 3, 1) + timedelta(minutes=i))
+            for i in range(n)]
+
+
+def aggregate(aggregator, messages, spill_every=0):
+    for i, (key, subject, date) in enumerate(messages):
+        aggregator.get(key).add_message(1000 + i % 7, subject, subject, False, date)
+        if spill_every and i % spill_every == spill_every - 1:
+            aggregator.budget.check()
+    return aggregator
+
+
+def test_spilled_aggregates_match_in_memory_aggregation(tmp_path):
+    messages = stream(5000, 1)
+    expected = dict(aggregate(KeyedAggregator(agg_factory=MessageAgg), messages).items())
+
+    budget = MemoryBudget(1, spill_dir=str(tmp_path))
+    spilling = aggregate(SpillingAggregator(agg_factory=MessageAgg, budget=budget), messages, spill_every=700)
+    assert budget.spills == 7 and budget.spilled_bytes > 0
+    assert spilling.spilled_records > len(spilling.data)
+    assert measure_aggregator(spilling).spilled_records == spilling.spilled_records
+
+    merged = dict(spilling.items())
+    assert merged.keys() == expected.keys()
+    for key, agg in expected.items():
+        assert merged[key].messages == agg.messages
+        assert merged[key].total_bytes_original == agg.total_bytes_original
+        assert (merged[key].first_date, merged[key].last_date) == (agg.first_date, agg.last_date)
+        assert merged[key].norm_patterns.patterns.keys() == agg.norm_patterns.patterns.keys()
+    assert sorted(spilling.get_state()) == sorted(KeyedAggregator(agg_factory=MessageAgg, data=merged).get_state())
+
+
+def test_budget_spills_the_largest_aggregator_only(tmp_path):
+    budget = MemoryBudget(0, spill_dir=str(tmp_path))
+    small = aggregate(SpillingAggregator(agg_factory=MessageAgg, budget=budget), stream(10, 2))
+    large = aggregate(SpillingAggregator(agg_factory=MessageAgg, budget=budget), stream(2000, 3))
+    budget.max_bytes = large.estimated_bytes()
+    budget.check()
+
+    assert budget.spills == 1
+    assert not large.data and small.data
+
+
+def test_cleanup_removes_partition_files(tmp_path):
+    budget = MemoryBudget(1, spill_dir=str(tmp_path))
+    aggregate(SpillingAggregator(agg_factory=MessageAgg, budget=budget), stream(100, 4), spill_every=50)
+    assert os.listdir(tmp_path)
+    budget.cleanup()
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("options", [
+    ["--max-memory", "0"],
+    ["--max-memory", "100", "--sketch-keys", "10"],
+    ["--max-memory", "100", "--checkpoint", "run.ckpt"],
+    ["--max-memory", "100", "--save-snapshot", "run.snap"],
+    ["--max-memory", "100", "--cache-dir", "cache"],
+])
+def test_invalid_max_memory_options(options):
+    with pytest.raises(SystemExit):
+        parse_arguments(["-i", "in.csv", "-o", "out.xlsx", *options])
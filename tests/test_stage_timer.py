@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+from senderstats.processing.run_manifest import RunManifest
+
+
+@pytest.fixture
+def input_file(write_smart_search_csv):
+    # 20 messages, 5 of them from an excluded domain
+    return write_smart_search_csv({'date': f"2024-03-01T10:{i:02d}:00.000+0000",
+                                   'sender': f"user{i}@{'pphosted.com' if i % 4 == 0 else 'example.com'}",
+                                   'hfrom': f"user{i}@example.com", 'subject': f"Hello {i}"} for i in range(20))
+
+
+def run(input_file, tmp_path, *options) -> PipelineManager:
+    args = parse_arguments(["-i", input_file, "-o", str(tmp_path / "out.xlsx"), "--gen-hfrom", "--sample-subject",
+                            *options])
+    config = ConfigManager(args)
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+    return pipeline_manager
+
+
+def test_stages_count_rows_in_and_out(input_file, tmp_path):
+    pipeline_manager = run(input_file, tmp_path, "--stage-timing", "--stage-timing-sample", "1")
+    stages = {stage.name: stage for stage in pipeline_manager.get_stage_timer().get_stages()}
+
+    assert stages["ExcludeEmptySenderFilter"].rows_in == 20
+    assert (stages["ExcludeDomainFilter"].rows_in, stages["ExcludeDomainFilter"].rows_out) == (20, 15)
+    assert stages["MFromProcessor"].kind == "Processor"
+    assert stages["DateProcessor"].rows_out == 15
+    assert all(stage.sampled_rows == stage.rows_in for stage in stages.values())
+    # Wrapping handlers leaves the chain intact
+    assert len(pipeline_manager.get_active_processors()) == 3
+    assert pipeline_manager.get_processor_manager().mfrom_processor.get_state()
+
+
+def test_only_sampled_rows_are_timed(input_file, tmp_path):
+    pipeline_manager = run(input_file, tmp_path, "--stage-timing", "--stage-timing-sample", "8")
+    head = pipeline_manager.get_stage_timer().get_stages()[0]
+    assert (head.rows_in, head.sampled_rows) == (20, 3)
+    assert head.estimated_seconds >= 0
+
+
+def test_run_manifest(input_file, tmp_path):
+    args = parse_arguments(["-i", input_file, "-o", str(tmp_path / "out.xlsx"), "--stage-timing"])
+    config = ConfigManager(args)
+    manifest = RunManifest(config)
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+
+    path = tmp_path / "manifest.json"
+    manifest.write(str(path), pipeline_manager)
+    data = json.loads(path.read_text())
+
+    assert data["input_files"][0]["size"] > 0
+    assert data["filters"]["exclude_domain"] == 5
+    assert data["stage_timing"]["stages"][0]["rows_in"] == 20
+    assert not data["interrupted"]
+
+
+def test_stage_timing_is_off_by_default(input_file, tmp_path):
+    assert run(input_file, tmp_path).get_stage_timer() is None
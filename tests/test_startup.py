@@ -0,0 +1,69 @@
+import json
+import subprocess
+import sys
+import time
+from statistics import median
+
+import pytest
+
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.transform_manager import TransformManager
+
+# Modules --help must not load, the report writers, parsers and the pipeline
+HEAVY_MODULES = ["xlsxwriter", "regex", "ciso8601", "numpy", "importlib.metadata",
+                 "senderstats.processing.pipeline_manager", "senderstats.common.tld_parser"]
+
+# Share of the cost of loading the pipeline that senderstats --help may take, both on top of
+# starting the interpreter. Relative, so the budget holds on slow and busy machines alike.
+STARTUP_BUDGET = 0.5
+
+HELP = """
+import contextlib, io, json, sys
+sys.argv = ["senderstats", "--help"]
+from senderstats.cli import main
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+# What --help would load if the imports were not deferred
+PIPELINE = ("import senderstats.cli, senderstats.processing.pipeline_manager, "
+            "senderstats.reporting.pipeline_processor_report")
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+def test_help_does_not_load_the_pipeline():
+    loaded = set(json.loads(run_python(HELP)))
+    assert [m for m in HEAVY_MODULES if m in loaded] == []
+
+
+def test_public_suffix_list_only_for_message_id_report(tmp_path):
+    args = ["-i", str(tmp_path / "in.csv"), "-o", str(tmp_path / "out.xlsx")]
+    assert TransformManager(ConfigManager(parse_arguments(args))).msgid_transform is None
+    assert TransformManager(ConfigManager(parse_arguments([*args, "--gen-msgid"]))).msgid_transform is not None
+
+
+def time_python(code: str, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run_python(code)
+        samples.append(time.perf_counter() - start)
+    return median(samples)
+
+
+@pytest.mark.perf
+def test_perf_startup():
+    interpreter = time_python("pass", rounds=7)
+    help_time = time_python(HELP, rounds=7)
+    pipeline = time_python(PIPELINE, rounds=7)
+    print(f"test_perf_startup: interpreter {interpreter * 1000:.1f} ms | --help {help_time * 1000:.1f} ms | "
+          f"pipeline {pipeline * 1000:.1f} ms")
+    assert help_time - interpreter < STARTUP_BUDGET * (pipeline - interpreter)
@@ -0,0 +1,47 @@
+import re
+import zipfile
+
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+from senderstats.reporting.pipeline_processor_report import PipelineProcessorReport
+
+
+def build_report(tmp_path, write_smart_search_csv, streaming: bool) -> str:
+    input_file = write_smart_search_csv(
+        {'date': f"2024-03-0{d}T10:00:00.000+0000", 'sender': f"user{i}@example.com", 'size': 1000 + i, 'subject': "Hi"}
+        for d in (1, 2) for i in range(30))
+    output_file = str(tmp_path / ("streaming.xlsx" if streaming else "default.xlsx"))
+
+    args = ["-i", input_file, "-o", output_file, "--gen-hfrom", "--sample-subject"]
+    config = ConfigManager(parse_arguments(args + (["--streaming-report"] if streaming else [])))
+    pipeline_manager = PipelineManager(config)
+    PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+
+    report = PipelineProcessorReport(config.output_file, pipeline_manager, config.with_probability,
+                                     streaming=config.streaming_report)
+    report.generate()
+    report.close()
+    return output_file
+
+
+def test_streaming_report_has_no_tables_or_volatile_formulas(tmp_path, write_smart_search_csv):
+    with zipfile.ZipFile(build_report(tmp_path, write_smart_search_csv, streaming=True)) as z:
+        names = z.namelist()
+        calc = z.read("xl/worksheets/sheet2.xml").decode()
+
+    assert not [n for n in names if n.startswith("xl/tables/")]
+    assert "INDIRECT" not in calc
+    assert "MATCH(Summary!$B$20,_Dist!$A$3:$A$3,-1)" in calc
+
+
+def test_streaming_summary_matches_default_layout(tmp_path, write_smart_search_csv):
+    def summary_cells(path):
+        with zipfile.ZipFile(path) as z:
+            sheet = z.read("xl/worksheets/sheet1.xml").decode()
+        return re.findall(r'<c r="([A-Z]+\d+)"', sheet)
+
+    assert sorted(summary_cells(build_report(tmp_path, write_smart_search_csv, streaming=True))) == \
+           sorted(summary_cells(build_report(tmp_path, write_smart_search_csv, streaming=False)))
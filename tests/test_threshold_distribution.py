@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from senderstats.reporting.threshold_distribution import TableSummaryCollector, ThresholdDistribution
+
+HEADERS = ["MFrom", "Messages", "Avg Msg Size", "Messages Per Day", "Total Bytes", "Total Recipients",
+           "Delivery Bytes", "Autonomy Score (%)", "Label"]
+
+
+def sumif(rows, col, threshold):
+    # What Excel's SUMIF(col, ">="&threshold, ...) returns, blanks never match
+    matched = [r for r in rows if isinstance(r[col], (int, float)) and r[col] >= threshold]
+    return sum(r[1] for r in matched), sum(r[4] for r in matched), sum(r[6] for r in matched)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cumulative_lookup_matches_sumif(seed):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(300):
+        messages = rnd.randint(1, 500)
+        rows.append([f"s{i}", messages, 1.0, messages / rnd.choice([1, 3, 7, 30]), messages * 1000,
+                     messages, messages * 2000, round(rnd.random() * 100, 2), "x"])
+    rows.append(["Other (5 keys)", 12, 1.0, None, 12000, 12, 24000, None, None])
+
+    collector = TableSummaryCollector(HEADERS)
+    for row in rows:
+        collector.add(row)
+    summary = collector.summary
+
+    assert summary.messages == sum(r[1] for r in rows)
+    for threshold in [0, 1, 2, 5, 17, 100, 499, 500, 501, 10000]:
+        assert summary.per_day.at_least(threshold) == sumif(rows, 3, threshold)
+    for threshold in range(0, 102, 3):
+        assert summary.autonomy.at_least(threshold) == sumif(rows, 7, threshold)
+
+
+def test_cumulative_rows_are_descending_running_totals():
+    dist = ThresholdDistribution()
+    for value, messages in [(1.5, 1), (1.2, 2), (3.0, 4), (0.1, 8)]:
+        dist.add(value, messages, messages, messages)
+    assert dist.cumulative() == [(3, 4, 4, 4), (1, 7, 7, 7), (0, 15, 15, 15)]
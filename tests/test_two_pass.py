@@ -0,0 +1,67 @@
+import pytest
+
+from senderstats.cli_args import parse_arguments
+from senderstats.processing.config_manager import ConfigManager
+from senderstats.processing.data_source_manager import DataSourceManager
+from senderstats.processing.pipeline_manager import PipelineManager
+from senderstats.processing.pipeline_processor import PipelineProcessor
+from senderstats.processing.two_pass_pipeline_processor import TwoPassPipelineProcessor
+
+
+@pytest.fixture
+def input_file(write_smart_search_csv):
+    # Two days, app@ sends 10 messages per day and every user 1
+    rows = []
+    for day in (1, 2):
+        rows += [{'date': f"2024-03-0{day}T10:{i:02d}:00.000+0000", 'sender': "app@example.com", 'size': 1000 + i,
+                  'subject': f"Invoice {i}"} for i in range(10)]
+        rows += [{'date': f"2024-03-0{day}T11:00:00.000+0000", 'sender': f"user{i}@example.com", 'size': 500,
+                  'subject': "RE: hi"} for i in range(5)]
+    return write_smart_search_csv(rows)
+
+
+def report_rows(input_file, tmp_path, *options) -> dict:
+    args = parse_arguments(["-i", input_file, "-o", str(tmp_path / "out.xlsx"), "--gen-hfrom", "--gen-alignment",
+                            "--sample-subject", "--with-probability", *options])
+    config = ConfigManager(args)
+    pipeline_manager = PipelineManager(config)
+    if config.two_pass:
+        TwoPassPipelineProcessor(config, pipeline_manager).process_data()
+    else:
+        PipelineProcessor(DataSourceManager(config), pipeline_manager).process_data()
+
+    reports = {}
+    for processor in pipeline_manager.get_active_processors():
+        for name, rows in processor.report(2):
+            reports[name] = {str(row[0]): row for row in list(rows)[1:]}
+    return reports
+
+
+def test_significant_keys_match_a_single_pass(input_file, tmp_path):
+    single = report_rows(input_file, tmp_path)
+    two_pass = report_rows(input_file, tmp_path, "--two-pass", "--two-pass-min-per-day", "5")
+
+    assert single.keys() == two_pass.keys()
+    for name in ("Envelope Senders", "Header From", "MFrom + HFrom (Alignment)"):
+        assert single[name]["app@example.com"] == two_pass[name]["app@example.com"]
+        # Low volume keys keep their totals but are not analyzed
+        user_single, user_two_pass = single[name]["user0@example.com"], two_pass[name]["user0@example.com"]
+        assert user_single[1:7] == user_two_pass[1:7]
+        assert user_single[-1] == "[2] RE: hi"
+        assert user_two_pass[-1] == ""
+    assert single["Hourly Metrics"] == two_pass["Hourly Metrics"]
+
+
+def test_zero_cutoff_analyzes_every_key(input_file, tmp_path):
+    assert report_rows(input_file, tmp_path) == report_rows(input_file, tmp_path, "--two-pass",
+                                                            "--two-pass-min-per-day", "0")
+
+
+@pytest.mark.parametrize("options", [
+    ["--two-pass"],
+    ["--two-pass", "--sample-subject", "--cache-dir", "cache"],
+    ["--two-pass", "--sample-subject", "--two-pass-min-per-day", "-1"],
+])
+def test_invalid_two_pass_options(options):
+    with pytest.raises(SystemExit):
+        parse_arguments(["-i", "in.csv", "-o", "out.xlsx", *options])